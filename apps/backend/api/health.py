@@ -2,6 +2,10 @@ from datetime import datetime, tzinfo
 from typing import Dict, Any
 from fastapi import APIRouter
 from config import settings
+from apps.backend.services.answer_service import AnswerStats
+from apps.backend.services.cache import CacheStats
+from apps.backend.services.embedding_service import EmbeddingServiceStats
+from libs.di.container import container
 
 HealthRouter = APIRouter(prefix="/health", tags=["Health"])
 
@@ -17,3 +21,49 @@ async def health_check() -> Dict[str, Any]:
         "service": "Personal Knowledge AI Backend",
         "version": "0.1.0",
     }
+
+
+@HealthRouter.get("/embeddings", summary="Embedding Health")
+async def embedding_health() -> EmbeddingServiceStats:
+    """
+    Health, adaptive concurrency limit and latency of each Ollama endpoint,
+    and how many embedding calls were coalesced with identical in-flight ones.
+    """
+    return container.embedding_service().stats()
+
+
+@HealthRouter.get("/query-embeddings", summary="Query Embedding Cache")
+async def query_embedding_cache_health() -> CacheStats:
+    """
+    Size and hit rate of the query embedding cache used by search.
+    """
+    return container.query_embedder().stats()
+
+
+@HealthRouter.get("/semantic-cache", summary="Semantic Result Cache")
+async def semantic_cache_health() -> Dict[str, CacheStats]:
+    """
+    Size, hit rate and invalidations of the caches of search results and
+    answers served for near-identical queries.
+    """
+    return {
+        "search": container.search_result_cache().stats(),
+        "answers": container.answer_result_cache().stats(),
+    }
+
+
+@HealthRouter.get("/answers", summary="Answer Latency")
+async def answer_health() -> AnswerStats:
+    """
+    Answers served, how many came from the semantic cache, and time to first
+    token over recent generated answers.
+    """
+    return container.answer_service().stats()
+
+
+@HealthRouter.get("/answer-cache", summary="Answer Cache")
+async def answer_cache_health() -> CacheStats:
+    """
+    Size, hit rate and evictions of the persistent cache of generated answers.
+    """
+    return await container.answer_cache().stats()
@@ -0,0 +1,53 @@
+import logging
+from typing import AsyncIterator, Union
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from apps.backend.api.v1.auth import get_current_user
+from apps.backend.services.answer_service import AnswerService
+from libs.di.container import container
+from libs.models.Answer import AnswerErrorEvent, AnswerRequest, AnswerResponse
+
+logger = logging.getLogger(__name__)
+
+AnswerRouter = APIRouter(
+    prefix="/v1/answer",
+    tags=["answer"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@AnswerRouter.post("", response_model=None)
+async def answer(request: AnswerRequest) -> Union[AnswerResponse, StreamingResponse]:
+    """
+    Answer a question from the notes, citing them as [number].
+
+    By default the response is a server-sent event stream: `token` events as
+    the model generates, then `references` for the cited notes and `done`
+    with timings, including time to first token. An `error` event ends the
+    stream if generation fails part-way.
+    """
+    answer_service: AnswerService = container.answer_service()
+    if not request.stream:
+        return await answer_service.answer(request)
+
+    async def sse() -> AsyncIterator[bytes]:
+        try:
+            async for event in answer_service.answer_events(request):
+                yield _sse_message(event.type, event.model_dump_json())
+        except Exception as e:
+            logger.error(f"Answer stream failed: {e}")
+            error = AnswerErrorEvent(detail="Answer generation failed")
+            yield _sse_message(error.type, error.model_dump_json())
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering, which would delay the first token
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_message(event: str, data: str) -> bytes:
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
@@ -0,0 +1,45 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from apps.backend.api.v1.auth import get_current_user
+from apps.backend.services.search_service import SearchService
+from libs.di.container import container
+from libs.models.Search import DocumentLinks, RelatedDocument
+from libs.storage.repositories.related_documents import RelatedDocumentRepository
+
+DocumentsRouter = APIRouter(
+    prefix="/v1/documents",
+    tags=["documents"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@DocumentsRouter.get("/{document_id}/related", response_model=List[RelatedDocument])
+async def related_documents(
+    document_id: str, limit: int = Query(10, ge=1, le=100)
+) -> List[RelatedDocument]:
+    """
+    Notes most similar to a note, best first.
+
+    Served from the precomputed neighbour graph kept up to date by
+    `scripts/build_related_documents.py`, so this is one indexed read. Empty
+    for unknown notes and for notes added since the job last ran.
+    """
+    related_repo: RelatedDocumentRepository = container.related_document_repo()
+    return related_repo.get_related(document_id, limit)
+
+
+@DocumentsRouter.get("/{document_id}/links", response_model=DocumentLinks)
+async def document_links(document_id: str) -> DocumentLinks:
+    """
+    Notes a note links to with wikilinks or markdown links, and notes
+    linking to it, from the link graph of the search index.
+    """
+    search_service: SearchService = container.search_service()
+    links = await search_service.document_links(document_id)
+    if links is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+        )
+    return links
@@ -0,0 +1,59 @@
+from typing import AsyncIterator, Union
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from apps.backend.api.v1.auth import get_current_user
+from apps.backend.services.search_service import SearchService
+from libs.di.container import container
+from libs.models.Search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchRequest,
+    SearchResponse,
+)
+
+SearchRouter = APIRouter(
+    prefix="/v1/search",
+    tags=["search"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@SearchRouter.post("", response_model=None)
+async def search(request: SearchRequest) -> Union[SearchResponse, StreamingResponse]:
+    """
+    Semantic search over note chunks, with optional metadata filters.
+
+    With `stream` set, the response is NDJSON: one `hit` event per first-stage
+    result as soon as vector retrieval finishes, a `rerank` event with the
+    final order if re-ranking ran, and a closing `done` event with timings
+    and any stages skipped to meet the latency budget.
+    """
+    search_service: SearchService = container.search_service()
+    if not request.stream:
+        return await search_service.search(request)
+
+    events = search_service.search_events(request)
+    # Loading the index, embedding the query and checking its dimension all
+    # happen before the first event, so their errors keep their status code
+    first = await anext(events)
+
+    async def ndjson() -> AsyncIterator[bytes]:
+        yield first.model_dump_json().encode("utf-8") + b"\n"
+        async for event in events:
+            yield event.model_dump_json().encode("utf-8") + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@SearchRouter.post("/batch", response_model=BatchSearchResponse)
+async def search_batch(request: BatchSearchRequest) -> BatchSearchResponse:
+    """
+    Top hits for up to 1000 queries in one call, e.g. for recall evaluations.
+
+    All queries are embedded in one batch and scored with a single matrix
+    product against the index. Results are in request order.
+    """
+    search_service: SearchService = container.search_service()
+    return await search_service.search_batch(request)
@@ -10,7 +10,10 @@ from fastapi.security import OAuth2PasswordBearer
 from contextlib import asynccontextmanager
 
 from apps.backend.api.health import HealthRouter
+from apps.backend.api.v1.answer import AnswerRouter
 from apps.backend.api.v1.auth import AuthRouter
+from apps.backend.api.v1.documents import DocumentsRouter
+from apps.backend.api.v1.search import SearchRouter
 from apps.backend.api.webhooks import WebhooksRouter
 from libs.storage.db import init_db
 from libs.di.container import container
@@ -29,7 +32,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         modules=[
             "apps.backend.api.health",
             "apps.backend.api.webhooks",
+            "apps.backend.api.v1.answer",
             "apps.backend.api.v1.auth",
+            "apps.backend.api.v1.documents",
+            "apps.backend.api.v1.search",
             "apps.backend.handler.github_handler",
             "apps.backend.services.document_service",
             "apps.backend.services.user",
@@ -51,6 +57,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     yield
 
+    container.search_service().close()
+
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -69,6 +77,9 @@ def create_app() -> FastAPI:
     )
 
     app.include_router(AuthRouter)
+    app.include_router(SearchRouter)
+    app.include_router(AnswerRouter)
+    app.include_router(DocumentsRouter)
     app.include_router(HealthRouter)
     app.include_router(WebhooksRouter)
 
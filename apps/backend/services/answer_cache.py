@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Iterable, Optional
+
+from apps.backend.services.cache import CacheStats
+from apps.backend.services.query_embedder import normalise_query
+from config import settings
+from libs.models.Answer import StoredAnswer
+from libs.storage.repositories.answer_cache import AnswerCacheRepository
+
+logger = logging.getLogger(__name__)
+
+
+def answer_cache_key(
+    model: str, question: str, chunk_hashes: Iterable[str], prompt: str = ""
+) -> str:
+    """Identity of an answer: model, prompt template, question and note contents.
+
+    Chunks are identified by content hash, so editing any note that fed the
+    context changes the key, while re-indexing unchanged notes does not. The
+    hashes are kept in context order, since the answer cites passages by
+    their position there.
+    """
+    parts = [model, prompt, normalise_query(question), list(chunk_hashes)]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Generated answers persisted in the database across restarts.
+
+    Entries are never stale, since the key covers the exact context the
+    answer was generated from; once the table grows past `max_entries` the
+    least recently used are evicted. Database calls run in a worker thread
+    so they never block the event loop. Database errors are logged and
+    treated as misses so the cache can never fail an answer.
+    """
+
+    def __init__(
+        self, repository: AnswerCacheRepository, max_entries: int = 10000
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.repository = repository
+        self.max_entries = max_entries
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_settings(cls, repository: AnswerCacheRepository) -> "AnswerCache":
+        return cls(repository, max_entries=settings.answer_cache_max_entries)
+
+    async def get(self, key: str) -> Optional[StoredAnswer]:
+        try:
+            answer = await asyncio.to_thread(self.repository.get, key)
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            answer = None
+
+        if answer is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return answer
+
+    async def put(self, answer: StoredAnswer) -> None:
+        try:
+            await asyncio.to_thread(self._store, answer)
+        except Exception as e:
+            logger.warning(f"Could not cache answer: {e}")
+
+    async def stats(self) -> CacheStats:
+        try:
+            size = await asyncio.to_thread(self.repository.count)
+        except Exception as e:
+            logger.warning(f"Could not count cached answers: {e}")
+            size = 0
+        return CacheStats(
+            size=size,
+            max_size=self.max_entries,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
+
+    def _store(self, answer: StoredAnswer) -> None:
+        self.repository.put(answer)
+        if self.repository.count() > self.max_entries:
+            self._evictions += self.repository.evict_least_recently_used(
+                self.max_entries
+            )
@@ -0,0 +1,311 @@
+import hashlib
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Deque, Dict, Hashable, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from apps.backend.services.answer_cache import AnswerCache, answer_cache_key
+from apps.backend.services.generation import OllamaGenerator
+from apps.backend.services.query_embedder import QueryEmbedder
+from apps.backend.services.search_service import SearchService
+from apps.backend.services.semantic_cache import SemanticCache
+from config import settings
+from libs.models.Answer import (
+    AnswerDoneEvent,
+    AnswerEvent,
+    AnswerReferencesEvent,
+    AnswerRequest,
+    AnswerResponse,
+    AnswerTimings,
+    AnswerTokenEvent,
+    Reference,
+    StoredAnswer,
+)
+from libs.models.Search import SearchRequest
+from libs.retrieval import ContextPassage, pack_context
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You answer questions about the user's own notes using only the numbered "
+    "notes provided. Cite the notes you rely on inline as [number]. If the "
+    "notes do not contain the answer, say so instead of guessing."
+)
+# Part of every answer cache key, so changing the prompt invalidates answers
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+NO_CONTEXT_ANSWER = "I couldn't find anything in your notes about that."
+TTFT_WINDOW = 256
+
+
+class AnswerStats(BaseModel):
+    answers: int
+    cached: int
+    time_to_first_token_p50_ms: Optional[float] = None
+    time_to_first_token_p95_ms: Optional[float] = None
+
+
+class AnswerService:
+    """Retrieval-augmented answers streamed from a local model.
+
+    Retrieved chunks are packed into the prompt up to a token budget, with
+    overlapping windows of the same note merged, and generated tokens are
+    passed on as soon as Ollama sends them. References follow the answer.
+    Notes linked to or from the retrieved ones are added after them, as far
+    as the budget allows.
+
+    Complete answers are stored in the semantic cache under their own scope,
+    so near-identical questions skip retrieval and generation until the
+    corpus changes. They are also persisted in the answer cache, keyed by
+    the exact retrieved context, which survives restarts and edits to notes
+    that did not contribute to the answer.
+    """
+
+    def __init__(
+        self,
+        search_service: SearchService,
+        query_embedder: QueryEmbedder,
+        semantic_cache: SemanticCache[AnswerResponse],
+        generator: OllamaGenerator,
+        answer_cache: Optional[AnswerCache] = None,
+    ) -> None:
+        self.search_service = search_service
+        self.query_embedder = query_embedder
+        self.semantic_cache = semantic_cache
+        self.generator = generator
+        self.answer_cache = answer_cache
+
+        self._answers = 0
+        self._cached = 0
+        self._ttft_ms: Deque[float] = deque(maxlen=TTFT_WINDOW)
+
+    async def answer(self, request: AnswerRequest) -> AnswerResponse:
+        parts: List[str] = []
+        references: List[Reference] = []
+        done: Optional[AnswerDoneEvent] = None
+
+        async for event in self.answer_events(request):
+            if isinstance(event, AnswerTokenEvent):
+                parts.append(event.text)
+            elif isinstance(event, AnswerReferencesEvent):
+                references = event.references
+            elif isinstance(event, AnswerDoneEvent):
+                done = event
+
+        if done is None:
+            raise RuntimeError("Answer stream ended without a done event")
+        return AnswerResponse(
+            question=request.question,
+            answer="".join(parts),
+            references=references,
+            timings=done.timings,
+            model=done.model,
+            cached=done.cached,
+        )
+
+    async def answer_events(self, request: AnswerRequest) -> AsyncIterator[AnswerEvent]:
+        started = time.perf_counter()
+        self._answers += 1
+
+        query_vector = await self.query_embedder.embed(request.question)
+        scope = self._cache_scope(request)
+        cached = self.semantic_cache.get(query_vector, scope)
+        if cached is not None:
+            self._cached += 1
+            async for event in self._replay(cached, started):
+                yield event
+            return
+
+        search = await self.search_service.search(
+            SearchRequest(
+                query=request.question, top_k=request.top_k, filters=request.filters
+            )
+        )
+        # Linked notes come after every retrieved hit, so they only use
+        # budget the retrieved chunks leave over
+        hits = search.hits + await self.search_service.linked_hits(
+            search.hits, query_vector, self._linked_notes(request), request.filters
+        )
+        passages = pack_context(
+            hits, request.context_tokens or settings.answer_context_tokens
+        )
+        references, prompt = self._build_prompt(request.question, passages)
+        retrieval_ms = self._elapsed_ms(started)
+
+        if not passages:
+            yield AnswerTokenEvent(text=NO_CONTEXT_ANSWER)
+            yield AnswerReferencesEvent(references=[])
+            yield AnswerDoneEvent(
+                timings=AnswerTimings(
+                    retrieval_ms=retrieval_ms, took_ms=self._elapsed_ms(started)
+                ),
+                model=self.generator.model,
+            )
+            return
+
+        hash_of = {hit.chunk_id: hit.content_hash for hit in hits}
+        chunk_hashes = [
+            hash_of[chunk_id] or chunk_id
+            for passage in passages
+            for chunk_id in passage.chunk_ids
+        ]
+        key = answer_cache_key(
+            self.generator.model, request.question, chunk_hashes, PROMPT_VERSION
+        )
+        stored = await self.answer_cache.get(key) if self.answer_cache else None
+        if stored is not None:
+            self._cached += 1
+            response = AnswerResponse(
+                question=request.question,
+                answer=stored.answer,
+                references=references,
+                timings=AnswerTimings(
+                    retrieval_ms=retrieval_ms, took_ms=self._elapsed_ms(started)
+                ),
+                model=stored.model,
+            )
+            self.semantic_cache.put(query_vector, scope, response)
+            async for event in self._replay(response, started):
+                yield event
+            return
+
+        parts: List[str] = []
+        ttft_ms: Optional[float] = None
+        prompt_tokens: Optional[int] = None
+        completion_tokens: Optional[int] = None
+        async for chunk in self.generator.stream(prompt, system=SYSTEM_PROMPT):
+            if chunk.text:
+                if ttft_ms is None:
+                    ttft_ms = self._elapsed_ms(started)
+                    self._ttft_ms.append(ttft_ms)
+                parts.append(chunk.text)
+                yield AnswerTokenEvent(text=chunk.text)
+            if chunk.done:
+                prompt_tokens = chunk.prompt_tokens
+                completion_tokens = chunk.completion_tokens
+
+        yield AnswerReferencesEvent(references=references)
+        timings = AnswerTimings(
+            retrieval_ms=retrieval_ms,
+            time_to_first_token_ms=ttft_ms,
+            took_ms=self._elapsed_ms(started),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        logger.info(
+            f"Answered in {timings.took_ms:.0f}ms (first token after "
+            f"{ttft_ms or 0:.0f}ms, retrieval {retrieval_ms:.0f}ms)"
+        )
+
+        answer = "".join(parts)
+        self.semantic_cache.put(
+            query_vector,
+            scope,
+            AnswerResponse(
+                question=request.question,
+                answer=answer,
+                references=references,
+                timings=timings,
+                model=self.generator.model,
+            ),
+        )
+        if self.answer_cache is not None:
+            await self.answer_cache.put(
+                StoredAnswer(
+                    key=key,
+                    model=self.generator.model,
+                    question=request.question,
+                    chunk_hashes=chunk_hashes,
+                    answer=answer,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    created_at=datetime.now(timezone.utc),
+                )
+            )
+        yield AnswerDoneEvent(timings=timings, model=self.generator.model)
+
+    def stats(self) -> AnswerStats:
+        ttft = np.fromiter(self._ttft_ms, dtype=np.float64)
+        return AnswerStats(
+            answers=self._answers,
+            cached=self._cached,
+            time_to_first_token_p50_ms=(
+                float(np.percentile(ttft, 50)) if ttft.size else None
+            ),
+            time_to_first_token_p95_ms=(
+                float(np.percentile(ttft, 95)) if ttft.size else None
+            ),
+        )
+
+    async def _replay(
+        self, cached: AnswerResponse, started: float
+    ) -> AsyncIterator[AnswerEvent]:
+        elapsed_ms = self._elapsed_ms(started)
+        yield AnswerTokenEvent(text=cached.answer)
+        yield AnswerReferencesEvent(references=cached.references)
+        yield AnswerDoneEvent(
+            timings=AnswerTimings(
+                retrieval_ms=elapsed_ms,
+                time_to_first_token_ms=elapsed_ms,
+                took_ms=elapsed_ms,
+            ),
+            model=cached.model,
+            cached=True,
+        )
+
+    @staticmethod
+    def _build_prompt(
+        question: str, passages: List[ContextPassage]
+    ) -> tuple[List[Reference], str]:
+        numbers: Dict[str, Reference] = {}
+        sections: List[str] = []
+        for passage in passages:
+            reference = numbers.get(passage.document_id)
+            if reference is None:
+                document = passage.document
+                reference = Reference(
+                    number=len(numbers) + 1,
+                    document_id=passage.document_id,
+                    title=document.title if document else None,
+                    file_path=document.file_path if document else None,
+                    chunk_ids=[],
+                    score=passage.score,
+                )
+                numbers[passage.document_id] = reference
+            reference.chunk_ids.extend(passage.chunk_ids)
+            reference.score = max(reference.score, passage.score)
+
+            heading = reference.title or reference.file_path or reference.document_id
+            sections.append(f"[{reference.number}] {heading}\n{passage.text}")
+
+        notes = "\n\n".join(sections)
+        prompt = f"Notes:\n\n{notes}\n\nQuestion: {question}\nAnswer:"
+        return list(numbers.values()), prompt
+
+    def _cache_scope(self, request: AnswerRequest) -> Hashable:
+        filters = (
+            request.filters.model_dump_json(exclude_none=True)
+            if request.filters is not None
+            else None
+        )
+        return (
+            "answer",
+            self.generator.model,
+            request.top_k,
+            request.context_tokens or settings.answer_context_tokens,
+            self._linked_notes(request),
+            filters,
+        )
+
+    @staticmethod
+    def _linked_notes(request: AnswerRequest) -> int:
+        if request.linked_notes is not None:
+            return request.linked_notes
+        return settings.answer_linked_notes
+
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 256
+
+
+class Priority(IntEnum):
+    """Scheduling class of a request; lower values are served first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class ConcurrencyStats(BaseModel):
+    limit: int
+    in_flight: int
+    waiting: int
+    waiting_interactive: int = 0
+    interactive_reserve: int = 0
+    successes: int
+    overloads: int
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
+    latency_target_ms: Optional[float] = None
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits in-flight requests with additive increase, multiplicative decrease.
+
+    Every successful request within the latency target grows the limit by
+    `1 / limit`, i.e. by one slot per round of requests. An overload (error
+    flagged by `is_overload`, or latency above `latency_tolerance` times the
+    best recent latency) multiplies it by `decrease_factor`, at most once per
+    typical request duration so a single burst of timeouts only backs off once.
+
+    Waiters are served in priority order, and BULK requests may only fill
+    `limit - interactive_reserve` slots. A query embedding therefore never
+    queues behind a backfill: it takes a reserved slot or the next one freed.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.5,
+        is_overload: Callable[[BaseException], bool] = lambda _: True,
+        interactive_reserve: int = 1,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.is_overload = is_overload
+        self.interactive_reserve = interactive_reserve
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiters: Dict[Priority, Deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in Priority
+        }
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._last_decrease = 0.0
+        self._successes = 0
+        self._overloads = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def capacity(self, priority: Priority) -> int:
+        """Slots that requests of this priority may occupy."""
+        if priority == Priority.INTERACTIVE:
+            return self.limit
+        return max(1, self.limit - self.interactive_reserve)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.BULK) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of a request."""
+        await self.acquire(priority)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            # Errors that are not overload signals (e.g. bad input) are ignored
+            overloaded = self.is_overload(e)
+            self.release(
+                time.perf_counter() - started if overloaded else None, overloaded
+            )
+            raise
+        except BaseException:
+            # Cancelled: free the slot without feeding the controller
+            self.release(None, overloaded=False)
+            raise
+        else:
+            self.release(time.perf_counter() - started, overloaded=False)
+
+    async def acquire(self, priority: Priority = Priority.BULK) -> None:
+        waiters = self._waiters[priority]
+        while self._in_flight >= self.capacity(priority) or any(
+            self._waiters[p] for p in Priority if p < priority
+        ):
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Woken up but cancelled before taking the slot: pass it on
+                    self._wake_waiters()
+                raise
+            finally:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+        self._in_flight += 1
+
+    def release(self, latency: Optional[float], overloaded: bool) -> None:
+        self._in_flight -= 1
+        if latency is not None:
+            self._record(latency, overloaded)
+        self._wake_waiters()
+
+    def latency_target(self) -> Optional[float]:
+        if len(self._latencies) < 8:
+            return None
+        return min(self._latencies) * self.latency_tolerance
+
+    def stats(self) -> ConcurrencyStats:
+        percentiles: list[Optional[float]] = [None, None, None]
+        if self._latencies:
+            percentiles = [
+                float(p) * 1000
+                for p in np.percentile(
+                    np.fromiter(self._latencies, float), [50, 95, 99]
+                )
+            ]
+        target = self.latency_target()
+        return ConcurrencyStats(
+            limit=self.limit,
+            in_flight=self._in_flight,
+            waiting=self.waiting,
+            waiting_interactive=len(self._waiters[Priority.INTERACTIVE]),
+            interactive_reserve=self.limit - self.capacity(Priority.BULK),
+            successes=self._successes,
+            overloads=self._overloads,
+            latency_p50_ms=percentiles[0],
+            latency_p95_ms=percentiles[1],
+            latency_p99_ms=percentiles[2],
+            latency_target_ms=target * 1000 if target is not None else None,
+        )
+
+    def _record(self, latency: float, overloaded: bool) -> None:
+        if not overloaded:
+            target = self.latency_target()
+            self._latencies.append(latency)
+            overloaded = target is not None and latency > target
+
+        if overloaded:
+            self._overloads += 1
+            self._decrease()
+        else:
+            self._successes += 1
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        typical_latency = float(np.median(self._latencies)) if self._latencies else 0.0
+        if now - self._last_decrease < typical_latency:
+            return
+
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        if self.limit != previous:
+            logger.info(f"Reduced concurrency limit from {previous} to {self.limit}")
+
+    def _wake_waiters(self) -> None:
+        woken = 0
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters and self._in_flight + woken < self.capacity(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    woken += 1
+            if waiters:
+                # Lower priorities wait until this class has been served
+                return
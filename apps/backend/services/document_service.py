@@ -1,5 +1,5 @@
 import datetime
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 import logging
 import uuid
@@ -8,6 +8,7 @@ from apps.backend.services.embedding_service import EmbeddingService
 from libs.models.documents import AnalysedDocument, EmbeddedChunk, TextChunk, Document
 from libs.storage.repositories.document import DocumentRepository
 from libs.pipeline.pipeline import DataPipeline
+from libs.pipeline.corpus import CorpusVersion
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +32,11 @@ class DocumentService:
         self,
         document_repo: DocumentRepository = Provide["Container.document_repo"],
         embedding_service: EmbeddingService = Provide["Container.embedding_service"],
+        corpus_version: Optional[CorpusVersion] = None,
     ) -> None:
         self.document_repo = document_repo
         self.embedding_service = embedding_service
+        self.corpus_version = corpus_version
         self.repo_base_path = Path.cwd()
 
     async def process_md_files(self, contents: List[str]) -> List[AnalysedDocument]:
@@ -73,7 +76,12 @@ class DocumentService:
             )
         ]
 
-        return [self.document_repo.create_document(doc) for doc in completed_documents]
+        stored = [
+            self.document_repo.create_document(doc) for doc in completed_documents
+        ]
+        if self.corpus_version is not None:
+            self.corpus_version.bump()
+        return stored
 
     async def sync_documents_removed_from_gh(self, files: List[str]) -> None:
         """
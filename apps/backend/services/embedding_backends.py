@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+from numpy.typing import NDArray
+
+from apps.backend.services.concurrency import AdaptiveConcurrencyLimiter, Priority
+from apps.backend.services.embedding_decoder import decode_embedding
+from apps.backend.services.embedding_router import (
+    EmbeddingRouter,
+    EndpointStats,
+    OllamaEndpoint,
+)
+from apps.backend.services.resilience import CircuitBreaker, CircuitState
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+WARM_UP_PROMPT = "warm up"
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether a failed request suggests Ollama is overloaded."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, httpx.TransportError)
+
+
+class EmbeddingBackend(ABC):
+    """Turns one text into an embedding vector for EmbeddingService."""
+
+    # How long the backend should keep the model loaded after each request
+    keep_alive: Optional[str] = None
+
+    @abstractmethod
+    async def embed(
+        self,
+        text: str,
+        model: str,
+        priority: Priority,
+        out: Optional[NDArray[np.float32]] = None,
+    ) -> NDArray[np.float32]:
+        """Embed `text`, writing the vector into `out` when it is given.
+
+        `out` is typically a row of a preallocated batch matrix; the vector
+        returned is then `out` itself.
+        """
+
+    async def warm_up(self, model: str) -> bool:
+        """Load the model ahead of traffic; True once it can serve requests."""
+        return True
+
+    @property
+    def state(self) -> CircuitState:
+        """CLOSED while the backend can take requests."""
+        return CircuitState.CLOSED
+
+    async def wait_until_available(self) -> None:
+        return None
+
+    def endpoint_stats(self) -> List[EndpointStats]:
+        return []
+
+    async def close(self) -> None:
+        return None
+
+
+class OllamaBackend(EmbeddingBackend):
+    """Embeddings from one or more Ollama instances over HTTP."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        router: EmbeddingRouter,
+        keep_alive: Optional[str] = None,
+        load_timeout: float = 120.0,
+    ) -> None:
+        self.client = client
+        self.router = router
+        self.keep_alive = keep_alive
+        self.load_timeout = load_timeout
+
+    @classmethod
+    def from_settings(cls) -> "OllamaBackend":
+        urls = [str(url) for url in settings.ollama_endpoints]
+        # Probes and warm-ups bypass the limiters, so leave room for them
+        max_connections = settings.ollama_max_connections or len(urls) * (
+            settings.embedding_max_concurrency + 2
+        )
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.ollama_timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=settings.ollama_keepalive_expiry,
+            ),
+        )
+        router = EmbeddingRouter([create_endpoint(url) for url in urls], client=client)
+        return cls(
+            client,
+            router,
+            keep_alive=settings.ollama_keep_alive,
+            load_timeout=settings.ollama_load_timeout,
+        )
+
+    async def embed(
+        self,
+        text: str,
+        model: str,
+        priority: Priority,
+        out: Optional[NDArray[np.float32]] = None,
+    ) -> NDArray[np.float32]:
+        endpoint = self.router.select()
+        async with endpoint.request(priority):
+            response = await self.client.post(
+                f"{endpoint.url}api/embeddings", json=self._payload(model, text)
+            )
+            response.raise_for_status()
+        return decode_embedding(response.content, out=out)
+
+    async def warm_up(self, model: str) -> bool:
+        """Load the model on every endpoint, applying the current keep_alive."""
+        results = await asyncio.gather(
+            *(
+                self._warm_up_endpoint(endpoint, model)
+                for endpoint in self.router.endpoints
+            )
+        )
+        return any(results)
+
+    @property
+    def state(self) -> CircuitState:
+        return self.router.state
+
+    async def wait_until_available(self) -> None:
+        await self.router.wait_until_available()
+
+    def endpoint_stats(self) -> List[EndpointStats]:
+        return self.router.stats()
+
+    async def close(self) -> None:
+        await self.router.close()
+        await self.client.aclose()
+
+    def _payload(self, model: str, text: str) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"model": model, "prompt": text}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    async def _warm_up_endpoint(self, endpoint: OllamaEndpoint, model: str) -> bool:
+        # Bypasses the limiter: a cold load would skew its latency baseline
+        try:
+            response = await self.client.post(
+                f"{endpoint.url}api/embeddings",
+                json=self._payload(model, WARM_UP_PROMPT),
+                timeout=self.load_timeout,
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Could not load {model} on {endpoint.url}: {e}")
+            return False
+
+        logger.info(f"Loaded {model} on {endpoint.url} (keep_alive={self.keep_alive})")
+        return True
+
+
+class HashEmbeddingBackend(EmbeddingBackend):
+    """Deterministic offline embeddings for tests and benchmarks.
+
+    Every lowercased word maps to a fixed pseudo-random vector seeded by a
+    hash of (model, word), and a text embeds to the normalised sum of its word
+    vectors. Results are identical across runs and machines, and texts sharing
+    words come out similar, so search can be exercised without a model.
+    """
+
+    def __init__(self, dimension: int = 768) -> None:
+        self.dimension = dimension
+        self._word_vector = lru_cache(maxsize=65536)(self._seeded_vector)
+
+    async def embed(
+        self,
+        text: str,
+        model: str,
+        priority: Priority,
+        out: Optional[NDArray[np.float32]] = None,
+    ) -> NDArray[np.float32]:
+        vector = self.embed_text(text, model)
+        if out is None:
+            return vector
+        out[:] = vector
+        return out
+
+    def embed_text(self, text: str, model: str) -> NDArray[np.float32]:
+        words = TOKEN_PATTERN.findall(text.lower()) or [text]
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in words:
+            vector += self._word_vector(model, word)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _seeded_vector(self, model: str, word: str) -> NDArray[np.float32]:
+        seed = hashlib.blake2b(f"{model}\0{word}".encode("utf-8"), digest_size=8)
+        rng = np.random.default_rng(int.from_bytes(seed.digest(), "little"))
+        vector = rng.standard_normal(self.dimension, dtype=np.float32)
+        vector.flags.writeable = False
+        return vector
+
+
+def create_endpoint(url: str) -> OllamaEndpoint:
+    return OllamaEndpoint(
+        url=url,
+        limiter=AdaptiveConcurrencyLimiter(
+            initial_limit=settings.embedding_initial_concurrency,
+            min_limit=settings.embedding_min_concurrency,
+            max_limit=settings.embedding_max_concurrency,
+            is_overload=is_overload_error,
+            interactive_reserve=settings.embedding_interactive_reserve,
+        ),
+        breaker=CircuitBreaker(
+            name=f"ollama {url}",
+            failure_threshold=settings.embedding_circuit_failure_threshold,
+            reset_timeout=settings.embedding_circuit_reset_timeout,
+        ),
+    )
+
+
+def create_embedding_backend() -> EmbeddingBackend:
+    """Backend selected by `settings.embedding_backend`."""
+    if settings.embedding_backend == "ollama":
+        return OllamaBackend.from_settings()
+    if settings.embedding_backend == "hash":
+        return HashEmbeddingBackend(dimension=settings.embedding_hash_dimension)
+    raise ValueError(f"Unknown embedding backend: {settings.embedding_backend}")
@@ -0,0 +1,46 @@
+from typing import Any, Callable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is not built for PyPy
+    import json
+
+    loads = json.loads
+
+
+def decode_embedding(
+    body: bytes, out: Optional[NDArray[np.float32]] = None, key: str = "embedding"
+) -> NDArray[np.float32]:
+    """Decode an Ollama embedding response straight into a float32 vector.
+
+    The body is parsed with orjson and the list of values is copied into `out`
+    (typically a row of a preallocated batch matrix) by NumPy in one C loop,
+    instead of converting every value to a Python float first.
+    """
+    data = loads(body)
+    embedding = data.get(key) if isinstance(data, dict) else None
+
+    if not embedding:
+        raise ValueError("No embedding returned from Ollama")
+    if not isinstance(embedding, list):
+        raise ValueError("Embedding returned is not a list")
+
+    if out is None:
+        out = np.empty(len(embedding), dtype=np.float32)
+    elif out.shape != (len(embedding),):
+        raise ValueError(
+            f"Embedding of length {len(embedding)} does not fit a row of "
+            f"shape {out.shape}"
+        )
+
+    try:
+        out[:] = embedding
+    except (TypeError, ValueError) as e:
+        raise ValueError("Embedding contains non-numeric values") from e
+    return out
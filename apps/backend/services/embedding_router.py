@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Sequence, Set
+
+import httpx
+from pydantic import BaseModel
+
+from apps.backend.services.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyStats,
+    Priority,
+)
+from apps.backend.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.2
+PROBE_POLL_INTERVAL = 0.5
+
+
+class EndpointStats(BaseModel):
+    url: str
+    state: CircuitState
+    requests: int
+    failures: int
+    ewma_latency_ms: Optional[float] = None
+    concurrency: ConcurrencyStats
+
+
+class OllamaEndpoint:
+    """One Ollama instance with its own concurrency limit and circuit breaker."""
+
+    def __init__(
+        self, url: str, limiter: AdaptiveConcurrencyLimiter, breaker: CircuitBreaker
+    ) -> None:
+        self.url = url
+        self.limiter = limiter
+        self.breaker = breaker
+        self.ewma_latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self._probe: Optional[asyncio.Task[None]] = None
+
+    @property
+    def load(self) -> float:
+        """Requests queued or in flight per concurrency slot, counting a new one."""
+        return (self.limiter.in_flight + self.limiter.waiting + 1) / self.limiter.limit
+
+    @asynccontextmanager
+    async def request(self, priority: Priority = Priority.BULK) -> AsyncIterator[None]:
+        """Hold a concurrency slot and feed the outcome to the circuit breaker."""
+        self.breaker.before_call()
+        self.requests += 1
+        try:
+            async with self.limiter.slot(priority):
+                # Queueing time is already reflected in `load`
+                started = time.perf_counter()
+                yield
+        except asyncio.CancelledError:
+            self.breaker.cancel_probe()
+            raise
+        except Exception as e:
+            if self.limiter.is_overload(e):
+                self.failures += 1
+                self.breaker.record_failure()
+            else:
+                # The instance answered (e.g. with a 4xx), so it is reachable
+                self.breaker.record_success()
+            raise
+
+        self._observe(time.perf_counter() - started)
+        self.breaker.record_success()
+
+    def stats(self) -> EndpointStats:
+        return EndpointStats(
+            url=self.url,
+            state=self.breaker.state,
+            requests=self.requests,
+            failures=self.failures,
+            ewma_latency_ms=(
+                self.ewma_latency * 1000 if self.ewma_latency is not None else None
+            ),
+            concurrency=self.limiter.stats(),
+        )
+
+    def _observe(self, latency: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += EWMA_ALPHA * (latency - self.ewma_latency)
+
+
+class EmbeddingRouter:
+    """Spreads embedding requests over several Ollama instances.
+
+    Each request goes to the healthy endpoint with the lowest expected wait:
+    its load (queued and in-flight requests per concurrency slot) times its
+    EWMA latency. Endpoints whose circuit opens are ejected; once their
+    cooldown passes they are probed in the background with a cheap
+    `api/version` call and rejoin the pool when it succeeds, so a flapping
+    node never receives real traffic as its probe.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[OllamaEndpoint],
+        client: httpx.AsyncClient,
+        probe_timeout: float = 5.0,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("EmbeddingRouter needs at least one endpoint")
+        self.endpoints: List[OllamaEndpoint] = list(endpoints)
+        self.client = client
+        self.probe_timeout = probe_timeout
+        self._probes: Set[asyncio.Task[None]] = set()
+
+    def select(self) -> OllamaEndpoint:
+        """Pick the least-loaded healthy endpoint, probing ejected ones."""
+        healthy = [e for e in self.endpoints if self._is_healthy(e)]
+        if not healthy:
+            raise CircuitOpenError("No healthy Ollama endpoint available")
+
+        known = [e.ewma_latency for e in healthy if e.ewma_latency is not None]
+        # Endpoints without samples yet are assumed to be as fast as the average
+        default_latency = sum(known) / len(known) if known else 1.0
+        return min(
+            healthy,
+            key=lambda e: (
+                e.load
+                * (e.ewma_latency if e.ewma_latency is not None else default_latency),
+                e.load,
+            ),
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        """CLOSED while any endpoint can take requests."""
+        states = {endpoint.breaker.state for endpoint in self.endpoints}
+        for state in (CircuitState.CLOSED, CircuitState.HALF_OPEN):
+            if state in states:
+                return state
+        return CircuitState.OPEN
+
+    async def wait_until_available(self) -> None:
+        """Sleep until at least one endpoint is healthy again."""
+        while not any(self._is_healthy(e) for e in self.endpoints):
+            delay = min(e.breaker.seconds_until_probe() for e in self.endpoints)
+            await asyncio.sleep(max(delay, PROBE_POLL_INTERVAL))
+
+    def stats(self) -> List[EndpointStats]:
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+    async def close(self) -> None:
+        for probe in self._probes:
+            probe.cancel()
+        await asyncio.gather(*self._probes, return_exceptions=True)
+
+    def _is_healthy(self, endpoint: OllamaEndpoint) -> bool:
+        state = endpoint.breaker.state
+        if state == CircuitState.HALF_OPEN and (
+            endpoint._probe is None or endpoint._probe.done()
+        ):
+            endpoint._probe = asyncio.create_task(self._run_probe(endpoint))
+            self._probes.add(endpoint._probe)
+            endpoint._probe.add_done_callback(self._probes.discard)
+        return state == CircuitState.CLOSED
+
+    async def _run_probe(self, endpoint: OllamaEndpoint) -> None:
+        # Bypasses the limiter so probe latencies do not skew its baseline
+        endpoint.breaker.before_call()
+        try:
+            response = await self.client.get(
+                f"{endpoint.url}api/version", timeout=self.probe_timeout
+            )
+            response.raise_for_status()
+        except asyncio.CancelledError:
+            endpoint.breaker.cancel_probe()
+            raise
+        except Exception as e:
+            if endpoint.limiter.is_overload(e):
+                endpoint.breaker.record_failure()
+                logger.warning(f"Ollama endpoint {endpoint.url} still unhealthy: {e}")
+                return
+
+        endpoint.breaker.record_success()
+        logger.info(f"Ollama endpoint {endpoint.url} rejoined the pool")
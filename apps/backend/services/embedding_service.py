@@ -1,81 +1,198 @@
-from datetime import datetime, timezone
-import os
-from typing import List
+import asyncio
+import hashlib
 import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+import numpy as np
+from libs.models.embeddings import Embedding, EmbeddingMatrix, EmbeddingsBatch
+from numpy.typing import NDArray
+from pydantic import BaseModel
 
-import httpx
-from libs.models.embeddings import Embedding, EmbeddingsBatch
+from apps.backend.services.concurrency import Priority
+from apps.backend.services.embedding_backends import (
+    EmbeddingBackend,
+    create_embedding_backend,
+    is_overload_error,
+)
+from apps.backend.services.embedding_router import EndpointStats
+from apps.backend.services.resilience import CircuitState, RetryPolicy
+from apps.backend.services.singleflight import SingleFlight, SingleFlightStats
 from config import settings
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_EMBEDDING_SIZE = 1536
-BASE_EMBEDDING = [0.0] * DEFAULT_EMBEDDING_SIZE
+
+class EmbeddingBatchError(Exception):
+    """Some texts of a batch could not be embedded.
+
+    `partial` holds the rows that did succeed, keyed by id, so callers can keep
+    them and queue only the failed ids for a later retry.
+    """
+
+    def __init__(
+        self, failed_ids: List[str], partial: Optional[EmbeddingMatrix]
+    ) -> None:
+        super().__init__(f"Failed to embed {len(failed_ids)} texts")
+        self.failed_ids = failed_ids
+        self.partial = partial
+
+
+class EmbeddingServiceStats(BaseModel):
+    endpoints: List[EndpointStats]
+    coalescing: SingleFlightStats
 
 
 class EmbeddingService:
-    def __init__(self) -> None:
-        self.base_url = settings.ollama_url
+    def __init__(self, backend: Optional[EmbeddingBackend] = None) -> None:
         self.model = settings.llm_embeddings_model
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.backend = backend if backend is not None else create_embedding_backend()
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.embedding_max_attempts,
+            base_delay=settings.embedding_retry_base_delay,
+            max_delay=settings.embedding_retry_max_delay,
+            is_retryable=is_overload_error,
+        )
+        self.single_flight: SingleFlight[NDArray[np.float32]] = SingleFlight()
 
-    async def generate_embedding(self, text: str) -> Embedding:
-        try:
-            response = await self.client.post(
-                f"{self.base_url}api/embeddings",
-                json={"model": self.model, "prompt": text},
-            )
-            response.raise_for_status()
+    async def generate_embedding(
+        self, text: str, priority: Priority = Priority.INTERACTIVE
+    ) -> Embedding:
+        vector = await self._request_embedding(text, priority)
+        return Embedding(
+            embedding=vector.tolist(),
+            embedding_model=self.model,
+            embedding_created_at=datetime.now(timezone.utc),
+        )
 
-            data = response.json()
-            embedding = data.get("embedding", [])
+    async def generate_multiple_embeddings(
+        self, texts: List[str], priority: Priority = Priority.BULK
+    ) -> EmbeddingsBatch:
+        matrix = await self.generate_embedding_matrix(texts, priority=priority)
+        return matrix.to_embeddings_batch()
 
-            if not embedding:
-                raise ValueError("No embedding returned from Ollama")
-            if not isinstance(embedding, list):
-                raise ValueError("Embedding returned is not a list")
-            try:
-                embedding_floats = [float(x) for x in embedding]
-            except Exception as conv_e:
-                logger.error(f"Failed to convert embedding values to float: {conv_e}")
-                raise ValueError("Embedding contains non-numeric values") from conv_e
-
-            logger.debug(f"Generated embedding of length {len(embedding)}")
-            return Embedding(
-                embedding=embedding_floats,
-                embedding_model=self.model,
-                embedding_created_at=datetime.now(timezone.utc),
-            )
-        except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            raise
+    async def generate_embedding_matrix(
+        self,
+        texts: List[str],
+        ids: Optional[Sequence[str]] = None,
+        priority: Priority = Priority.BULK,
+    ) -> EmbeddingMatrix:
+        """Embed texts into a single (n, d) float32 block, one row per text.
 
-    async def generate_multiple_embeddings(self, texts: List[str]) -> EmbeddingsBatch:
-        embeddings: List[Embedding] = []
+        The first text is embedded on its own to learn the dimension and
+        allocate the block; the rest then run concurrently up to the adaptive
+        limit, each response decoded straight into its own row. Raises
+        EmbeddingBatchError if any text could not be embedded after retries.
+        """
         batch_created_at = datetime.now(timezone.utc)
+        ids = list(ids) if ids is not None else [str(i) for i in range(len(texts))]
+        vectors: Optional[NDArray[np.float32]] = None
+        failed: List[int] = []
+        completed = 0
 
-        for i, text in enumerate(texts):
+        async def embed_row(i: int, text: str) -> None:
+            nonlocal vectors, completed
             try:
-                embedding = await self.generate_embedding(text)
-                embeddings.append(embedding)
+                if vectors is None:
+                    vector = await self._request_embedding(text, priority)
+                    if vectors is None:
+                        vectors = np.zeros(
+                            (len(texts), vector.shape[0]), dtype=np.float32
+                        )
+                    vectors[i] = vector
+                else:
+                    await self._request_embedding(text, priority, out=vectors[i])
 
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Processed {i + 1}/{len(texts)} embeddings")
+                completed += 1
+                if completed % 10 == 0:
+                    logger.info(f"Processed {completed}/{len(texts)} embeddings")
 
             except Exception as e:
                 logger.error(f"Error embedding text {i}: {e}")
-                embeddings.append(
-                    Embedding(
-                        embedding=BASE_EMBEDDING,
-                        embedding_model=self.model,
-                        embedding_created_at=datetime.now(timezone.utc),
-                    )
+                failed.append(i)
+
+        # The first response reveals the dimension, so the others can be
+        # decoded into their rows as they arrive
+        if texts:
+            await embed_row(0, texts[0])
+        await asyncio.gather(
+            *(embed_row(i, text) for i, text in enumerate(texts) if i > 0)
+        )
+
+        if failed:
+            failed_rows = set(failed)
+            succeeded = [i for i in range(len(texts)) if i not in failed_rows]
+            partial = (
+                EmbeddingMatrix(
+                    vectors=vectors[succeeded],
+                    ids=[ids[i] for i in succeeded],
+                    embedding_model=self.model,
+                    created_at=batch_created_at,
                 )
+                if vectors is not None
+                else None
+            )
+            raise EmbeddingBatchError([ids[i] for i in sorted(failed)], partial)
 
-        return EmbeddingsBatch(
-            embeddings=embeddings,
+        return EmbeddingMatrix(
+            vectors=(
+                vectors if vectors is not None else np.zeros((0, 0), dtype=np.float32)
+            ),
+            ids=ids,
+            embedding_model=self.model,
             created_at=batch_created_at,
         )
 
+    def stats(self) -> EmbeddingServiceStats:
+        return EmbeddingServiceStats(
+            endpoints=self.backend.endpoint_stats(),
+            coalescing=self.single_flight.stats(),
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        return self.backend.state
+
+    async def warm_up(self, keep_alive: Optional[str] = None) -> bool:
+        """Load the model ahead of traffic, optionally changing its keep_alive.
+
+        The keep_alive applies to every later request as well, so a negative
+        value pins the model in memory until it is reset.
+        """
+        if keep_alive is not None:
+            self.backend.keep_alive = keep_alive
+        return await self.backend.warm_up(self.model)
+
+    async def reset_keep_alive(self) -> None:
+        """Go back to the configured keep_alive so an idle model can unload."""
+        await self.warm_up(settings.ollama_keep_alive)
+
+    async def wait_until_available(self) -> None:
+        """Wait while the backend cannot take requests, e.g. all circuits open."""
+        await self.backend.wait_until_available()
+
+    async def _request_embedding(
+        self, text: str, priority: Priority, out: Optional[NDArray[np.float32]] = None
+    ) -> NDArray[np.float32]:
+        # Concurrent requests for the same text share one Ollama call, which
+        # runs in the most urgent lane of its callers
+        key = (self.model, hashlib.sha256(text.encode("utf-8")).digest())
+        try:
+            vector = await self.single_flight.do(
+                key,
+                lambda lane: self.retry_policy.run(
+                    lambda: self.backend.embed(text, self.model, lane, out=out)
+                ),
+                priority,
+            )
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            raise
+        if out is None or vector is out:
+            return vector
+        # Answered by a call another caller started
+        out[:] = vector
+        return out
+
     async def close(self) -> None:
-        await self.client.aclose()
+        await self.backend.close()
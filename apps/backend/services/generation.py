@@ -0,0 +1,90 @@
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from config import settings
+
+
+@dataclass(slots=True)
+class GenerationChunk:
+    """One streamed piece of a completion; the last one has `done` set."""
+
+    text: str
+    done: bool = False
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class OllamaGenerator:
+    """Streams completions from Ollama's /api/generate.
+
+    Ollama sends one JSON object per line as tokens are produced, so each
+    line is forwarded as soon as it is read rather than after the whole
+    completion. The read timeout only bounds the gap between lines, which
+    includes loading the model before the first token.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        model: str,
+        keep_alive: Optional[str] = None,
+    ) -> None:
+        self.client = client
+        self.url = url
+        self.model = model
+        self.keep_alive = keep_alive
+
+    @classmethod
+    def from_settings(cls) -> "OllamaGenerator":
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.ollama_load_timeout, connect=5.0),
+            limits=httpx.Limits(keepalive_expiry=settings.ollama_keepalive_expiry),
+        )
+        return cls(
+            client,
+            url=str(settings.ollama_generation_url or settings.ollama_url),
+            model=settings.llm_generation_model,
+            keep_alive=settings.ollama_keep_alive,
+        )
+
+    async def stream(
+        self, prompt: str, system: Optional[str] = None
+    ) -> AsyncIterator[GenerationChunk]:
+        payload: Dict[str, Any] = {"model": self.model, "prompt": prompt}
+        if system is not None:
+            payload["system"] = system
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+
+        async with self.client.stream(
+            "POST", f"{self.url}api/generate", json=payload
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                # Lines carry a token or two each, so the stdlib parser is fine
+                data = json.loads(line)
+                if "error" in data:
+                    raise RuntimeError(f"Ollama generation failed: {data['error']}")
+                if data.get("done"):
+                    yield GenerationChunk(
+                        text=data.get("response", ""),
+                        done=True,
+                        prompt_tokens=data.get("prompt_eval_count"),
+                        completion_tokens=data.get("eval_count"),
+                    )
+                    return
+                yield GenerationChunk(text=data.get("response", ""))
+
+        raise RuntimeError("Ollama closed the stream before the completion finished")
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,107 @@
+import re
+import unicodedata
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from apps.backend.services.cache import CacheStats, LRUCache
+from apps.backend.services.concurrency import Priority
+from apps.backend.services.embedding_service import EmbeddingService
+from config import settings
+
+WHITESPACE = re.compile(r"\s+")
+
+QueryKey = Tuple[str, str]
+EDGE_PUNCTUATION = " \t\n?!.,;:"
+
+
+def normalise_query(query: str) -> str:
+    """Cache key for a query: NFKC, case-folded, single-spaced, no end punctuation.
+
+    "What is Zettelkasten?" and "  what is zettelkasten " share an entry.
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    return WHITESPACE.sub(" ", text).strip(EDGE_PUNCTUATION)
+
+
+class QueryEmbedder:
+    """Embeds search queries, caching vectors by normalised query text.
+
+    This cache is separate from the ingestion dedup index: it is bounded,
+    expires entries and only holds short query texts, so repeated searches
+    skip Ollama entirely. Only the cache key is normalised; the model always
+    sees the query as typed by the first caller to miss. Cached vectors are
+    read-only float32 copies shared between callers.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_size: int = 1024,
+        ttl: float = 3600.0,
+    ) -> None:
+        self.embedding_service = embedding_service
+        self.cache: LRUCache[QueryKey, NDArray[np.float32]] = LRUCache(max_size, ttl)
+
+    @classmethod
+    def from_settings(cls, embedding_service: EmbeddingService) -> "QueryEmbedder":
+        return cls(
+            embedding_service,
+            max_size=settings.query_embedding_cache_size,
+            ttl=settings.query_embedding_cache_ttl,
+        )
+
+    async def embed(self, query: str) -> NDArray[np.float32]:
+        key = self._key(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        matrix = await self.embedding_service.generate_embedding_matrix(
+            [query], priority=Priority.INTERACTIVE
+        )
+        return self._store(key, matrix[0])
+
+    async def embed_many(
+        self, queries: Sequence[str], priority: Priority = Priority.BULK
+    ) -> NDArray[np.float32]:
+        """Embed queries into one (q, d) float32 block, one row per query.
+
+        Cached vectors are reused and the remaining distinct normalised
+        queries are embedded in a single batch, at bulk priority by default so
+        evaluation runs do not delay interactive searches.
+        """
+        keys = [self._key(query) for query in queries]
+        found: Dict[QueryKey, NDArray[np.float32]] = {}
+        missing: Dict[QueryKey, str] = {}
+        for key, query in zip(keys, queries):
+            cached = self.cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing.setdefault(key, query)
+
+        if missing:
+            matrix = await self.embedding_service.generate_embedding_matrix(
+                list(missing.values()), priority=priority
+            )
+            for row, key in enumerate(missing):
+                found[key] = self._store(key, matrix[row])
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> CacheStats:
+        return self.cache.stats()
+
+    def _key(self, query: str) -> QueryKey:
+        return (self.embedding_service.model, normalise_query(query))
+
+    def _store(self, key: QueryKey, row: NDArray[np.float32]) -> NDArray[np.float32]:
+        # Copied so the entry does not keep the whole batch matrix alive
+        vector = row.copy()
+        vector.flags.writeable = False
+        self.cache.put(key, vector)
+        return vector
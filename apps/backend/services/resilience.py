@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+import time
+from enum import Enum
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+
+class CircuitBreaker:
+    """Stops calls to a dependency after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast for `reset_timeout` seconds. It then half-opens and lets a single
+    probe through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == CircuitState.OPEN or (
+            state == CircuitState.HALF_OPEN and self._probe_in_flight
+        ):
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+        if state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if (
+            self._state == CircuitState.HALF_OPEN
+            or self._consecutive_failures >= self.failure_threshold
+        ):
+            if self._state != CircuitState.OPEN:
+                logger.warning(
+                    f"Circuit for {self.name} opened after "
+                    f"{self._consecutive_failures} consecutive failures"
+                )
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    def cancel_probe(self) -> None:
+        """Let another caller probe if the current probe was abandoned."""
+        self._probe_in_flight = False
+
+    def seconds_until_probe(self) -> float:
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    async def wait_until_available(self) -> None:
+        """Sleep while the circuit is open, e.g. to pause ingestion."""
+        while (delay := self.seconds_until_probe()) > 0:
+            await asyncio.sleep(delay)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for retryable errors."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        is_retryable: Callable[[BaseException], bool] = lambda _: True,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_retryable = is_retryable
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (starting at 1)."""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    async def run(self, operation: Callable[[], Awaitable[T]]) -> T:
+        attempt = 1
+        while True:
+            try:
+                return await operation()
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.debug(f"Retrying after {delay:.2f}s (attempt {attempt}): {e}")
+                await asyncio.sleep(delay)
+                attempt += 1
@@ -0,0 +1,454 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+from numpy.typing import NDArray
+
+from apps.backend.services.query_embedder import QueryEmbedder
+from apps.backend.services.semantic_cache import SemanticCache
+from config import settings
+from libs.models.Search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    BatchSearchResult,
+    DocumentLinks,
+    RankedChunk,
+    SearchDoneEvent,
+    SearchEvent,
+    SearchFilters,
+    SearchHit,
+    SearchHitEvent,
+    SearchRequest,
+    SearchRerankEvent,
+    SearchResponse,
+)
+from libs.pipeline.corpus import CorpusVersion
+from libs.retrieval import (
+    Candidates,
+    LexicalReranker,
+    MMRReranker,
+    Reranker,
+    ShardedVectorIndex,
+    VectorIndex,
+)
+from libs.retrieval.snapshot import (
+    IndexSnapshot,
+    StaleSnapshotError,
+    read_snapshot,
+    write_snapshot,
+)
+from libs.storage.repositories.document import DocumentRepository
+
+logger = logging.getLogger(__name__)
+
+STAGE_COST_ALPHA = 0.2
+
+
+class SearchService:
+    """Query embedding, vector retrieval and optional re-ranking stages.
+
+    Results are produced as events so the API can stream first-stage hits
+    before re-ranking finishes. Each re-ranking stage is skipped, and listed
+    as degraded, when the time spent so far plus the stage's typical cost
+    would exceed the request's latency budget. Only complete results are
+    stored in the semantic cache.
+
+    The in-memory index is reloaded from the database when the corpus
+    fingerprint changes, checked at most every few seconds. With
+    `search_shards` above 1 it is partitioned over that many worker
+    processes, so scoring uses more than one core.
+
+    With `search_snapshot_path` set, the index is opened from a
+    memory-mapped snapshot when the snapshot was built from the current
+    corpus, and otherwise built from the database and snapshotted for the
+    next worker or node.
+    """
+
+    def __init__(
+        self,
+        document_repo: DocumentRepository,
+        query_embedder: QueryEmbedder,
+        semantic_cache: SemanticCache[List[SearchHit]],
+        corpus_version: CorpusVersion,
+        rerankers: Optional[Sequence[Reranker]] = None,
+    ) -> None:
+        self.document_repo = document_repo
+        self.query_embedder = query_embedder
+        self.semantic_cache = semantic_cache
+        self.corpus_version = corpus_version
+        self.rerankers: List[Reranker] = (
+            list(rerankers) if rerankers is not None else self.default_rerankers()
+        )
+
+        self._index: Optional[VectorIndex] = None
+        self._fingerprint: Optional[Tuple[object, ...]] = None
+        self._checked_at = float("-inf")
+        self._reload_lock = asyncio.Lock()
+        self._stage_cost_ms: Dict[str, float] = {}
+        self._shard_executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def default_rerankers() -> List[Reranker]:
+        return [
+            LexicalReranker(weight=settings.search_lexical_weight),
+            MMRReranker(
+                lambda_=settings.search_mmr_lambda,
+                max_per_document=settings.search_max_chunks_per_document,
+            ),
+        ]
+
+    async def search(self, request: SearchRequest) -> SearchResponse:
+        hits: Dict[str, SearchHit] = {}
+        order: List[str] = []
+        done = SearchDoneEvent(took_ms=0.0)
+
+        async for event in self.search_events(request):
+            if isinstance(event, SearchHitEvent):
+                hits[event.hit.chunk_id] = event.hit
+                order.append(event.hit.chunk_id)
+            elif isinstance(event, SearchRerankEvent):
+                hits.update((hit.chunk_id, hit) for hit in event.hits)
+                order = [ranked.chunk_id for ranked in event.ranking]
+                for ranked in event.ranking:
+                    hits[ranked.chunk_id] = hits[ranked.chunk_id].model_copy(
+                        update={"score": ranked.score}
+                    )
+            else:
+                done = event
+
+        return SearchResponse(
+            query=request.query,
+            hits=[hits[chunk_id] for chunk_id in order],
+            took_ms=done.took_ms,
+            cached=done.cached,
+            degraded=done.degraded,
+        )
+
+    async def search_events(self, request: SearchRequest) -> AsyncIterator[SearchEvent]:
+        started = time.perf_counter()
+        budget_ms = request.latency_budget_ms or settings.search_latency_budget_ms
+
+        index = await self.get_index()
+        query_vector = await self.query_embedder.embed(request.query)
+        self._check_dimension(index, query_vector)
+
+        scope = self._cache_scope(request)
+        cached = self.semantic_cache.get(query_vector, scope)
+        if cached is not None:
+            for rank, hit in enumerate(cached):
+                yield SearchHitEvent(rank=rank, hit=hit)
+            yield SearchDoneEvent(took_ms=self._elapsed_ms(started), cached=True)
+            return
+
+        stages = self.rerankers if request.rerank else []
+        oversample = settings.search_rerank_oversample if stages else 1
+        if isinstance(index, ShardedVectorIndex):
+            # Wait for the shards off the event loop so queries overlap
+            candidates = await asyncio.to_thread(
+                self._retrieve, index, query_vector, request.top_k * oversample, request
+            )
+        else:
+            candidates = self._retrieve(
+                index, query_vector, request.top_k * oversample, request
+            )
+
+        hits = index.hits(candidates.head(request.top_k))
+        for rank, hit in enumerate(hits):
+            yield SearchHitEvent(rank=rank, hit=hit)
+
+        degraded: List[str] = []
+        reranked = False
+        for stage in stages:
+            expected_ms = self._stage_cost_ms.get(stage.name, 0.0)
+            if self._elapsed_ms(started) + expected_ms > budget_ms:
+                degraded.append(stage.name)
+                continue
+            candidates = self._run_stage(
+                stage, index, request, query_vector, candidates
+            )
+            reranked = True
+
+        if reranked:
+            final = index.hits(candidates.head(request.top_k))
+            streamed = {hit.chunk_id for hit in hits}
+            yield SearchRerankEvent(
+                ranking=[
+                    RankedChunk(chunk_id=hit.chunk_id, score=hit.score) for hit in final
+                ],
+                hits=[hit for hit in final if hit.chunk_id not in streamed],
+            )
+            hits = final
+
+        if not degraded:
+            self.semantic_cache.put(query_vector, scope, hits)
+        yield SearchDoneEvent(took_ms=self._elapsed_ms(started), degraded=degraded)
+
+    async def search_batch(self, request: BatchSearchRequest) -> BatchSearchResponse:
+        """Top hits for many queries, embedded in one batch and scored together.
+
+        Meant for evaluation and background jobs: queries are embedded at bulk
+        priority, the semantic cache is bypassed and re-ranking stages always
+        run, so results match an unhurried `search` of each query.
+        """
+        started = time.perf_counter()
+        index = await self.get_index()
+        query_vectors = await self.query_embedder.embed_many(request.queries)
+        embed_ms = self._elapsed_ms(started)
+        if len(index) == 0:
+            return BatchSearchResponse(
+                results=[
+                    BatchSearchResult(query=query, hits=[]) for query in request.queries
+                ],
+                took_ms=self._elapsed_ms(started),
+                embed_ms=embed_ms,
+                score_ms=0.0,
+            )
+        self._check_dimension(index, query_vectors[0])
+
+        scoring_started = time.perf_counter()
+        stages = self.rerankers if request.rerank else []
+        oversample = settings.search_rerank_oversample if stages else 1
+        batch = await asyncio.to_thread(
+            index.search_many,
+            query_vectors,
+            request.top_k * oversample,
+            request.filters,
+        )
+
+        results: List[BatchSearchResult] = []
+        for query, query_vector, candidates in zip(
+            request.queries, query_vectors, batch
+        ):
+            for stage in stages:
+                candidates = stage.rerank(
+                    index, query, query_vector, candidates, request.top_k
+                )
+            results.append(
+                BatchSearchResult(
+                    query=query, hits=index.hits(candidates.head(request.top_k))
+                )
+            )
+
+        return BatchSearchResponse(
+            results=results,
+            took_ms=self._elapsed_ms(started),
+            embed_ms=embed_ms,
+            score_ms=self._elapsed_ms(scoring_started),
+        )
+
+    async def linked_hits(
+        self,
+        hits: Sequence[SearchHit],
+        query_vector: NDArray[np.float32],
+        limit: int,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[SearchHit]:
+        """Best chunk of up to `limit` notes linked to or from the hits' notes.
+
+        Uses the link graph of the index, so it costs O(degree) of the hit
+        documents rather than another vector scan.
+        """
+        if limit <= 0 or not hits:
+            return []
+        index = await self.get_index()
+        self._check_dimension(index, query_vector)
+        documents = list(dict.fromkeys(hit.document_id for hit in hits))
+        candidates, sources = index.search_linked(
+            query_vector, documents, limit, filters
+        )
+        return [
+            hit.model_copy(update={"linked_from": index.documents[source].id})
+            for hit, source in zip(index.hits(candidates), sources)
+        ]
+
+    async def document_links(self, document_id: str) -> Optional[DocumentLinks]:
+        index = await self.get_index()
+        position = index.document_position(document_id)
+        if position is None:
+            return None
+        return DocumentLinks(
+            document_id=document_id,
+            links=[index.documents[i] for i in index.links.links(position)],
+            backlinks=[index.documents[i] for i in index.links.backlinks(position)],
+        )
+
+    async def get_index(self) -> VectorIndex:
+        """Current index, reloaded if the stored corpus has changed."""
+        now = time.monotonic()
+        if (
+            self._index is not None
+            and now - self._checked_at < settings.search_index_refresh_interval
+        ):
+            return self._index
+
+        async with self._reload_lock:
+            if self._index is not None and self._checked_at >= now:
+                return self._index
+
+            fingerprint = await asyncio.to_thread(
+                self.document_repo.get_corpus_fingerprint
+            )
+            self._checked_at = time.monotonic()
+            if self._index is None or fingerprint != self._fingerprint:
+                self._index = await asyncio.to_thread(self._load_index, fingerprint)
+                if self._fingerprint is not None:
+                    # Changed by another process, e.g. a separately run pipeline
+                    self.corpus_version.bump()
+                self._fingerprint = fingerprint
+        return self._index
+
+    def _load_index(self, fingerprint: Tuple[object, ...]) -> VectorIndex:
+        started = time.perf_counter()
+        snapshot = self._read_snapshot(fingerprint)
+        if snapshot is not None:
+            opened = self._build_index(snapshot)
+            logger.info(
+                f"Opened search index snapshot of {len(opened)} chunks in "
+                f"{self._elapsed_ms(started):.0f}ms"
+            )
+            return opened
+
+        matrix, chunks, documents = self.document_repo.get_search_corpus()
+        if matrix is None:
+            return VectorIndex.empty()
+
+        centroids = self.document_repo.get_document_centroids()
+        links = self.document_repo.get_document_links()
+        if settings.search_shards > 1:
+            index: VectorIndex = ShardedVectorIndex(
+                matrix,
+                chunks,
+                documents,
+                executor=self._executor(),
+                shards=settings.search_shards,
+                centroids=centroids,
+                links=links,
+            )
+        else:
+            index = VectorIndex(
+                matrix, chunks, documents, centroids=centroids, links=links
+            )
+        logger.info(
+            f"Loaded search index of {len(index)} chunks from {len(documents)} "
+            f"documents and {len(index.links)} links in "
+            f"{self._elapsed_ms(started):.0f}ms"
+        )
+
+        if settings.search_snapshot_path:
+            try:
+                write_snapshot(
+                    settings.search_snapshot_path,
+                    IndexSnapshot.from_index(index, links, fingerprint),
+                )
+            except OSError as e:
+                logger.warning(f"Could not write search index snapshot: {e}")
+        return index
+
+    def _read_snapshot(
+        self, fingerprint: Tuple[object, ...]
+    ) -> Optional[IndexSnapshot]:
+        """The configured snapshot, if it was built from this corpus."""
+        path = settings.search_snapshot_path
+        if not path:
+            return None
+        try:
+            return read_snapshot(path, fingerprint)
+        except (FileNotFoundError, StaleSnapshotError):
+            return None
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable search index snapshot: {e}")
+            return None
+
+    def _build_index(self, snapshot: IndexSnapshot) -> VectorIndex:
+        if len(snapshot.matrix) == 0:
+            return VectorIndex.empty()
+        if settings.search_shards > 1:
+            return ShardedVectorIndex(
+                snapshot.matrix,
+                snapshot.chunks,
+                snapshot.documents,
+                executor=self._executor(),
+                shards=settings.search_shards,
+                centroids=snapshot.centroids,
+                links=snapshot.links,
+            )
+        return snapshot.to_index()
+
+    def close(self) -> None:
+        """Stop the shard worker processes, if any were started."""
+        if self._shard_executor is not None:
+            self._shard_executor.shutdown(cancel_futures=True)
+            self._shard_executor = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._shard_executor is None:
+            # Spawned rather than forked: this process runs threads
+            self._shard_executor = ProcessPoolExecutor(
+                max_workers=settings.search_shards,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._shard_executor
+
+    @staticmethod
+    def _retrieve(
+        index: VectorIndex,
+        query_vector: NDArray[np.float32],
+        k: int,
+        request: SearchRequest,
+    ) -> Candidates:
+        coarse_documents = settings.search_coarse_documents
+        if coarse_documents and len(index.documents) > coarse_documents:
+            return index.search_coarse(
+                query_vector, k, coarse_documents, request.filters
+            )
+        return index.search(query_vector, k, request.filters)
+
+    def _run_stage(
+        self,
+        stage: Reranker,
+        index: VectorIndex,
+        request: SearchRequest,
+        query_vector: NDArray[np.float32],
+        candidates: Candidates,
+    ) -> Candidates:
+        started = time.perf_counter()
+        reranked = stage.rerank(
+            index, request.query, query_vector, candidates, request.top_k
+        )
+        cost_ms = self._elapsed_ms(started)
+        previous = self._stage_cost_ms.get(stage.name)
+        self._stage_cost_ms[stage.name] = (
+            cost_ms
+            if previous is None
+            else previous + STAGE_COST_ALPHA * (cost_ms - previous)
+        )
+        return reranked
+
+    def _cache_scope(self, request: SearchRequest) -> Hashable:
+        filters = (
+            request.filters.model_dump_json(exclude_none=True)
+            if request.filters is not None
+            else None
+        )
+        return ("search", request.top_k, request.rerank, filters)
+
+    @staticmethod
+    def _check_dimension(index: VectorIndex, query_vector: NDArray[np.float32]) -> None:
+        if len(index) and index.dimension != query_vector.shape[0]:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=(
+                    f"Search index was built with {index.embedding_model} "
+                    f"({index.dimension} dimensions); re-index to search with the "
+                    f"current embedding model"
+                ),
+            )
+
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return (time.perf_counter() - started) * 1000
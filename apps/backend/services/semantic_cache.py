@@ -0,0 +1,162 @@
+import time
+from typing import Any, Dict, Generic, Hashable, List, Optional, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from apps.backend.services.cache import CacheStats
+from config import settings
+from libs.pipeline.corpus import CorpusVersion
+
+V = TypeVar("V")
+
+EMPTY = -1
+
+
+class SemanticCache(Generic[V]):
+    """Reuses results of earlier queries whose embedding is close to a new one.
+
+    Unit-normalised query embeddings live in one preallocated (size, d)
+    float32 block, so a lookup is a single matrix-vector product. An entry
+    only matches if its cosine similarity reaches `threshold`, its scope
+    (e.g. endpoint, top_k and filters) equals the lookup's, and it was stored
+    at the current corpus version. Any document change bumps the version and
+    so invalidates every entry at once. The least recently used entry is
+    evicted when the cache is full.
+    """
+
+    def __init__(
+        self,
+        corpus_version: CorpusVersion,
+        max_size: int = 512,
+        threshold: float = 0.95,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.corpus_version = corpus_version
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+
+        self._vectors: Optional[NDArray[np.float32]] = None
+        self._values: List[Optional[V]] = [None] * max_size
+        self._versions = np.full(max_size, EMPTY, dtype=np.int64)
+        self._scopes = np.full(max_size, EMPTY, dtype=np.int64)
+        self._stored_at = np.zeros(max_size, dtype=np.float64)
+        self._last_used = np.zeros(max_size, dtype=np.float64)
+        self._scope_ids: Dict[Hashable, int] = {}
+        self._seen_version = corpus_version.value
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_settings(cls, corpus_version: CorpusVersion) -> "SemanticCache[V]":
+        return cls(
+            corpus_version,
+            max_size=settings.semantic_cache_size,
+            threshold=settings.semantic_cache_threshold,
+            ttl=settings.semantic_cache_ttl,
+        )
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._versions != EMPTY))
+
+    def get(self, vector: NDArray[np.float32], scope: Hashable) -> Optional[V]:
+        self._drop_stale_versions()
+        scope_id = self._scope_ids.get(scope)
+        query = self._unit(vector)
+        if scope_id is None or self._vectors is None or query is None:
+            self._misses += 1
+            return None
+        if query.shape[0] != self._vectors.shape[1]:
+            self._misses += 1
+            return None
+
+        now = time.monotonic()
+        if self.ttl is not None:
+            expired = (self._versions != EMPTY) & (now - self._stored_at > self.ttl)
+            if expired.any():
+                self._expirations += int(np.count_nonzero(expired))
+                self._clear(np.flatnonzero(expired))
+
+        candidates = np.flatnonzero(self._scopes == scope_id)
+        if candidates.size == 0:
+            self._misses += 1
+            return None
+
+        scores = self._vectors[candidates] @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self._misses += 1
+            return None
+
+        slot = int(candidates[best])
+        self._last_used[slot] = now
+        self._hits += 1
+        return self._values[slot]
+
+    def put(self, vector: NDArray[np.float32], scope: Hashable, value: V) -> None:
+        self._drop_stale_versions()
+        query = self._unit(vector)
+        if query is None:
+            return
+        if self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+            # First entry, or the embedding model changed dimension
+            self._vectors = np.zeros((self.max_size, query.shape[0]), np.float32)
+            self._clear(np.flatnonzero(self._versions != EMPTY))
+
+        empty = np.flatnonzero(self._versions == EMPTY)
+        if empty.size:
+            slot = int(empty[0])
+        else:
+            slot = int(np.argmin(self._last_used))
+            self._evictions += 1
+
+        now = time.monotonic()
+        self._vectors[slot] = query
+        self._values[slot] = value
+        self._versions[slot] = self.corpus_version.value
+        self._scopes[slot] = self._scope_ids.setdefault(scope, len(self._scope_ids))
+        self._stored_at[slot] = now
+        self._last_used[slot] = now
+
+    def clear(self) -> None:
+        self._clear(np.arange(self.max_size))
+        self._scope_ids.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self),
+            max_size=self.max_size,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+        )
+
+    def _drop_stale_versions(self) -> None:
+        if self.corpus_version.value == self._seen_version:
+            return
+        self._seen_version = self.corpus_version.value
+        stale = np.flatnonzero(self._versions != EMPTY)
+        self._invalidations += stale.size
+        self.clear()
+
+    def _clear(self, slots: NDArray[np.integer[Any]]) -> None:
+        self._versions[slots] = EMPTY
+        self._scopes[slots] = EMPTY
+        self._last_used[slots] = 0.0
+        for slot in slots:
+            self._values[slot] = None
+
+    @staticmethod
+    def _unit(vector: NDArray[np.float32]) -> Optional[NDArray[np.float32]]:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, TypeVar
+
+from pydantic import BaseModel
+
+from apps.backend.services.concurrency import Priority
+
+T = TypeVar("T")
+
+
+class SingleFlightStats(BaseModel):
+    calls: int = 0
+    deduplicated: int = 0
+    promoted: int = 0
+    in_flight: int = 0
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("result", "tasks", "priority", "waiters")
+
+    def __init__(self, result: "asyncio.Future[T]", priority: Priority) -> None:
+        self.result = result
+        self.tasks: List["asyncio.Task[T]"] = []
+        self.priority = priority
+        self.waiters = 0
+
+    def settle(self, task: "asyncio.Task[T]") -> None:
+        """Answer every waiter with the first task to succeed."""
+        if self.result.done():
+            return
+        pending = any(not other.done() for other in self.tasks)
+        if task.cancelled():
+            if not pending:
+                self.result.cancel()
+        elif (error := task.exception()) is not None:
+            # A promoted call may still succeed where the first one failed
+            if not pending:
+                self.result.set_exception(error)
+        else:
+            self.result.set_result(task.result())
+            self.cancel()
+
+    def cancel(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+
+class SingleFlight(Generic[T]):
+    """Shares one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the operation as a task; callers arriving while
+    it runs await the same call and get the same result or exception. When a
+    caller of a more urgent priority joins, the operation is started again
+    in its lane and whichever call succeeds first answers everyone, so a
+    query never waits behind a bulk request for the same text. A caller
+    being cancelled does not cancel the call for the others; the call is
+    only cancelled once nobody is waiting for it.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight[T]] = {}
+        self._calls = 0
+        self._deduplicated = 0
+        self._promoted = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        operation: Callable[[Priority], Awaitable[T]],
+        priority: Priority = Priority.BULK,
+    ) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.get_running_loop().create_future(), priority)
+            self._start(flight, operation, priority)
+            self._flights[key] = flight
+            flight.result.add_done_callback(lambda _: self._forget(key, flight))
+            self._calls += 1
+        else:
+            self._deduplicated += 1
+            if priority < flight.priority:
+                flight.priority = priority
+                self._start(flight, operation, priority)
+                self._promoted += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.result)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.result.done():
+                flight.cancel()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self._calls,
+            deduplicated=self._deduplicated,
+            promoted=self._promoted,
+            in_flight=len(self._flights),
+        )
+
+    @staticmethod
+    def _start(
+        flight: _Flight[T],
+        operation: Callable[[Priority], Awaitable[T]],
+        priority: Priority,
+    ) -> None:
+        task = asyncio.ensure_future(operation(priority))
+        flight.tasks.append(task)
+        task.add_done_callback(flight.settle)
+
+    def _forget(self, key: Hashable, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,68 @@
+"""Tests for the persistent cache of generated answers."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import pytest
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from apps.backend.services.answer_cache import AnswerCache, answer_cache_key
+from libs.models.Answer import StoredAnswer
+from libs.storage.repositories.answer_cache import AnswerCacheRepository
+from libs.storage.tables.answers import CachedAnswer
+from libs.storage.tables.base import Base
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.tables[CachedAnswer.__tablename__].create(engine)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+
+
+def stored(key: str, minutes: int) -> StoredAnswer:
+    return StoredAnswer(
+        key=key,
+        model="llama",
+        question="What is a zettel?",
+        chunk_hashes=["b", "a"],
+        answer="A note [1].",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc)
+        + timedelta(minutes=minutes),
+    )
+
+
+def test_key_follows_context_order() -> None:
+    key = answer_cache_key("llama", "What is a zettel?", ["a", "b"])
+    assert key == answer_cache_key("llama", "  what is a zettel ", ["a", "b"])
+    assert key != answer_cache_key("llama", "What is a zettel?", ["b", "a"])
+    assert key != answer_cache_key("mistral", "What is a zettel?", ["a", "b"])
+
+
+def test_least_recently_used_answers_are_evicted_past_the_limit(
+    session: Session,
+) -> None:
+    cache = AnswerCache(AnswerCacheRepository(session), max_entries=2)
+
+    async def run() -> None:
+        await cache.put(stored("first", 0))
+        await cache.put(stored("second", 1))
+        assert (await cache.stats()).evictions == 0
+
+        # Reading the first answer makes the second the least recently used
+        hit = await cache.get("first")
+        assert hit is not None and hit.chunk_hashes == ["b", "a"]
+        await cache.put(stored("third", 2))
+
+        assert await cache.get("second") is None
+        stats = await cache.stats()
+        assert (stats.size, stats.evictions, stats.hits, stats.misses) == (2, 1, 1, 1)
+
+    asyncio.run(run())
@@ -0,0 +1,118 @@
+"""Tests for the AIMD concurrency limiter and its priority scheduling."""
+
+import asyncio
+
+import pytest
+
+from apps.backend.services.concurrency import AdaptiveConcurrencyLimiter, Priority
+
+
+def complete(
+    limiter: AdaptiveConcurrencyLimiter, latency: float, overloaded: bool = False
+) -> None:
+    asyncio.run(limiter.acquire())
+    limiter.release(latency, overloaded)
+
+
+def test_limit_grows_by_about_one_slot_per_round_and_halves_on_overload() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8)
+    # 4 -> 4.25 -> 4.49 -> 4.71 -> 4.92 -> 5.12
+    for _ in range(5):
+        complete(limiter, 0.01)
+    assert limiter.limit == 5
+
+    complete(limiter, 0.01, overloaded=True)
+    assert limiter.limit == 2
+    assert limiter.stats().overloads == 1
+
+
+def test_limit_stays_within_bounds() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2, max_limit=3)
+    for _ in range(50):
+        complete(limiter, 0.01)
+    assert limiter.limit == 3
+
+    complete(limiter, 0.01, overloaded=True)
+    assert limiter.limit == 2
+
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=4)
+
+
+def test_errors_that_are_not_overloads_do_not_shrink_the_limit() -> None:
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=4, is_overload=lambda e: isinstance(e, TimeoutError)
+    )
+
+    async def fail() -> None:
+        async with limiter.slot():
+            raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(fail())
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_interactive_requests_are_served_before_queued_bulk_requests() -> None:
+    async def run() -> list[str]:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=2, max_limit=2, interactive_reserve=1
+        )
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def request(name: str, priority: Priority) -> None:
+            async with limiter.slot(priority):
+                order.append(name)
+                await release.wait()
+
+        # Bulk work may only fill limit - reserve slots
+        tasks = [asyncio.create_task(request("bulk-1", Priority.BULK))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("bulk-2", Priority.BULK)))
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 1 and limiter.waiting == 1
+
+        tasks.append(asyncio.create_task(request("query", Priority.INTERACTIVE)))
+        await asyncio.sleep(0)
+        assert order == ["bulk-1", "query"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["bulk-1", "query", "bulk-2"]
+
+
+def test_bulk_requests_leave_the_interactive_reserve_free() -> None:
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=3, max_limit=3, interactive_reserve=1
+    )
+    assert limiter.capacity(Priority.BULK) == 2
+    assert limiter.capacity(Priority.INTERACTIVE) == 3
+    assert limiter.stats().interactive_reserve == 1
+
+    # Bulk work always keeps at least one slot
+    small = AdaptiveConcurrencyLimiter(initial_limit=1, interactive_reserve=1)
+    assert small.capacity(Priority.BULK) == 1
+
+
+def test_cancelled_waiter_passes_its_slot_on() -> None:
+    async def run() -> None:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=1, max_limit=1, interactive_reserve=0
+        )
+        await limiter.acquire(Priority.INTERACTIVE)
+        first = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+        second = asyncio.create_task(limiter.acquire(Priority.BULK))
+        await asyncio.sleep(0)
+        assert limiter.waiting == 2
+
+        # Woken, then cancelled before it could take the slot
+        limiter.release(None, overloaded=False)
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1.0)
+        assert limiter.in_flight == 1 and limiter.waiting == 0
+
+    asyncio.run(run())
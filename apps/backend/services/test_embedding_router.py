@@ -0,0 +1,79 @@
+"""Tests for spreading embedding requests over several Ollama endpoints."""
+
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from apps.backend.services.concurrency import AdaptiveConcurrencyLimiter
+from apps.backend.services.embedding_router import EmbeddingRouter, OllamaEndpoint
+from apps.backend.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+def endpoint(url: str, reset_timeout: float = 30.0) -> OllamaEndpoint:
+    return OllamaEndpoint(
+        url,
+        AdaptiveConcurrencyLimiter(initial_limit=2, interactive_reserve=0),
+        CircuitBreaker(url, failure_threshold=1, reset_timeout=reset_timeout),
+    )
+
+
+def router(
+    endpoints: List[OllamaEndpoint], handler: httpx.MockTransport | None = None
+) -> EmbeddingRouter:
+    transport = handler or httpx.MockTransport(lambda _: httpx.Response(200))
+    return EmbeddingRouter(endpoints, httpx.AsyncClient(transport=transport))
+
+
+def test_select_prefers_the_lowest_expected_wait() -> None:
+    fast, slow = endpoint("http://fast/"), endpoint("http://slow/")
+    fast.ewma_latency, slow.ewma_latency = 0.05, 0.1
+    assert router([slow, fast]).select() is fast
+
+    # With both of its slots taken the fast node is now the longer wait
+    async def occupy() -> None:
+        await fast.limiter.acquire()
+        await fast.limiter.acquire()
+
+    asyncio.run(asyncio.wait_for(occupy(), timeout=1.0))
+    assert router([slow, fast]).select() is slow
+
+
+def test_failed_endpoint_is_ejected_until_its_probe_succeeds() -> None:
+    async def run() -> None:
+        healthy, flapping = endpoint("http://a/"), endpoint("http://b/", 0.0)
+        probes: List[str] = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            probes.append(str(request.url))
+            return httpx.Response(200, json={"version": "0.9"})
+
+        pool = router([healthy, flapping], httpx.MockTransport(handle))
+        flapping.breaker.record_failure()
+        assert flapping.breaker.state == CircuitState.HALF_OPEN
+
+        # Real traffic never goes to the half-open endpoint
+        assert pool.select() is healthy
+        await asyncio.gather(*pool._probes)
+        assert probes == ["http://b/api/version"]
+        assert flapping.stats().state == CircuitState.CLOSED
+        await pool.close()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+
+def test_select_fails_fast_when_every_endpoint_is_down() -> None:
+    only = endpoint("http://a/")
+    only.breaker.record_failure()
+    pool = router([only])
+    assert pool.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        pool.select()
+
+    with pytest.raises(ValueError):
+        router([])
@@ -0,0 +1,96 @@
+"""Tests for the query embedding cache."""
+
+import asyncio
+import time
+from typing import List, Optional
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from apps.backend.services.cache import LRUCache
+from apps.backend.services.concurrency import Priority
+from apps.backend.services.embedding_backends import HashEmbeddingBackend
+from apps.backend.services.embedding_service import EmbeddingService
+from apps.backend.services.query_embedder import QueryEmbedder, normalise_query
+
+
+class RecordingBackend(HashEmbeddingBackend):
+    def __init__(self) -> None:
+        super().__init__(dimension=8)
+        self.texts: List[str] = []
+
+    async def embed(
+        self,
+        text: str,
+        model: str,
+        priority: Priority,
+        out: Optional[NDArray[np.float32]] = None,
+    ) -> NDArray[np.float32]:
+        self.texts.append(text)
+        return await super().embed(text, model, priority, out)
+
+
+def test_lru_cache_evicts_least_recently_used_and_expires(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    lru: LRUCache[str, int] = LRUCache(max_size=2, ttl=10.0)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+
+    now[0] = 11.0
+    assert lru.get("c") is None
+    stats = lru.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations) == (
+        2,
+        2,
+        1,
+        1,
+    )
+    assert stats.hit_rate == 0.5
+
+
+def test_normalise_query_folds_case_spacing_and_end_punctuation() -> None:
+    assert normalise_query("  What is\tZETTELKASTEN? ") == "what is zettelkasten"
+    assert normalise_query("ﬁle notes.") == "file notes"
+
+
+def test_cache_is_keyed_on_normalised_text_but_embeds_the_original() -> None:
+    backend = RecordingBackend()
+    embedder = QueryEmbedder(EmbeddingService(backend=backend))
+
+    async def run() -> None:
+        first = await embedder.embed("What is Zettelkasten?")
+        second = await embedder.embed("  what is zettelkasten ")
+        assert second is first
+        assert not first.flags.writeable
+        assert first.base is None
+
+    asyncio.run(run())
+    assert backend.texts == ["What is Zettelkasten?"]
+    assert embedder.stats().hits == 1
+
+
+def test_embed_many_embeds_each_distinct_miss_once() -> None:
+    backend = RecordingBackend()
+    embedder = QueryEmbedder(EmbeddingService(backend=backend))
+
+    async def run() -> NDArray[np.float32]:
+        cached = await embedder.embed("Linking notes")
+        block = await embedder.embed_many(
+            ["linking notes", "Atomic notes", "atomic notes!", "Tags"]
+        )
+        assert np.array_equal(block[0], cached)
+        return block
+
+    block = asyncio.run(run())
+    assert sorted(backend.texts) == ["Atomic notes", "Linking notes", "Tags"]
+    assert block.shape == (4, 8)
+    assert np.array_equal(block[1], block[2])
+    assert len(embedder.cache) == 3
@@ -0,0 +1,116 @@
+"""Tests for the circuit breaker and retry policy guarding Ollama calls."""
+
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+from apps.backend.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    RetryPolicy,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def state(breaker: CircuitBreaker) -> CircuitState:
+    # Read through a call so mypy does not narrow the property between asserts
+    return breaker.state
+
+
+def test_circuit_opens_after_consecutive_failures(clock: List[float]) -> None:
+    breaker = CircuitBreaker("ollama", failure_threshold=3, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert state(breaker) == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert state(breaker) == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.seconds_until_probe() == 30.0
+
+
+def test_half_open_circuit_lets_one_probe_through(clock: List[float]) -> None:
+    breaker = CircuitBreaker("ollama", failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock[0] += 30.0
+    assert state(breaker) == CircuitState.HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed probe opens the circuit for another full timeout
+    breaker.record_failure()
+    assert state(breaker) == CircuitState.OPEN
+    clock[0] += 30.0
+    breaker.before_call()
+    breaker.record_success()
+    assert state(breaker) == CircuitState.CLOSED
+    breaker.before_call()
+
+
+def test_abandoned_probe_can_be_retried(clock: List[float]) -> None:
+    breaker = CircuitBreaker("ollama", failure_threshold=1, reset_timeout=1.0)
+    breaker.record_failure()
+    clock[0] += 1.0
+    breaker.before_call()
+    breaker.cancel_probe()
+    breaker.before_call()
+
+
+def test_backoff_is_jittered_below_an_exponential_cap() -> None:
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+    for attempt, cap in [(1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (10, 3.0)]:
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+
+
+def test_retry_stops_at_max_attempts_and_on_non_retryable_errors() -> None:
+    policy = RetryPolicy(
+        max_attempts=3,
+        base_delay=0.001,
+        max_delay=0.001,
+        is_retryable=lambda e: not isinstance(e, ValueError),
+    )
+    calls: List[int] = []
+
+    async def flaky() -> str:
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("refused")
+        return "ok"
+
+    assert asyncio.run(policy.run(flaky)) == "ok"
+    assert len(calls) == 3
+
+    calls.clear()
+
+    async def always_down() -> str:
+        calls.append(1)
+        raise ConnectionError("refused")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(policy.run(always_down))
+    assert len(calls) == 3
+
+    calls.clear()
+
+    async def bad_input() -> str:
+        calls.append(1)
+        raise ValueError("empty text")
+
+    with pytest.raises(ValueError):
+        asyncio.run(policy.run(bad_input))
+    assert len(calls) == 1
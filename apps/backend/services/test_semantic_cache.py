@@ -0,0 +1,70 @@
+"""Tests for reusing results of near-identical queries."""
+
+import time
+from typing import List
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from apps.backend.services.semantic_cache import SemanticCache
+from libs.pipeline.corpus import CorpusVersion
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def vector(*values: float) -> NDArray[np.float32]:
+    return np.array(values, dtype=np.float32)
+
+
+def test_close_query_in_the_same_scope_hits(clock: List[float]) -> None:
+    cache: SemanticCache[str] = SemanticCache(CorpusVersion(), threshold=0.95)
+    cache.put(vector(1, 0, 0), "search", "hits")
+
+    # Scale does not matter, only direction
+    assert cache.get(vector(2, 0.1, 0), "search") == "hits"
+    assert cache.get(vector(1, 1, 0), "search") is None
+    assert cache.get(vector(1, 0, 0), "answer") is None
+    assert cache.get(vector(1, 0), "search") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 3)
+
+
+def test_document_change_invalidates_every_entry(clock: List[float]) -> None:
+    version = CorpusVersion()
+    cache: SemanticCache[str] = SemanticCache(version)
+    cache.put(vector(1, 0), "search", "a")
+    cache.put(vector(0, 1), "search", "b")
+
+    version.bump()
+    assert cache.get(vector(1, 0), "search") is None
+    assert len(cache) == 0
+    assert cache.stats().invalidations == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock: List[float]) -> None:
+    cache: SemanticCache[str] = SemanticCache(CorpusVersion(), max_size=2)
+    cache.put(vector(1, 0, 0), "search", "a")
+    clock[0] += 1
+    cache.put(vector(0, 1, 0), "search", "b")
+    clock[0] += 1
+    assert cache.get(vector(1, 0, 0), "search") == "a"
+    clock[0] += 1
+    cache.put(vector(0, 0, 1), "search", "c")
+
+    assert cache.get(vector(0, 1, 0), "search") is None
+    assert cache.get(vector(1, 0, 0), "search") == "a"
+    assert cache.stats().evictions == 1
+
+
+def test_entries_expire_after_the_ttl(clock: List[float]) -> None:
+    cache: SemanticCache[str] = SemanticCache(CorpusVersion(), ttl=60.0)
+    cache.put(vector(1, 0), "search", "a")
+    clock[0] += 61.0
+    assert cache.get(vector(1, 0), "search") is None
+    assert cache.stats().expirations == 1
@@ -0,0 +1,152 @@
+"""Tests for sharing one in-flight call between concurrent callers."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from apps.backend.services.concurrency import Priority
+from apps.backend.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    async def run() -> List[str]:
+        flights: SingleFlight[str] = SingleFlight()
+        calls: List[str] = []
+
+        async def embed(priority: Priority) -> str:
+            calls.append("embed")
+            await asyncio.sleep(0.01)
+            return "vector"
+
+        results = await asyncio.gather(*(flights.do("key", embed) for _ in range(5)))
+        assert calls == ["embed"]
+        assert flights.stats().deduplicated == 4
+        assert flights.stats().in_flight == 0
+
+        # Finished calls are not cached
+        await flights.do("key", embed)
+        assert len(calls) == 2
+        return results
+
+    assert asyncio.run(run()) == ["vector"] * 5
+
+
+def test_errors_are_shared_by_every_waiter() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str] = SingleFlight()
+
+        async def fail(priority: Priority) -> str:
+            await asyncio.sleep(0.01)
+            raise ConnectionError("refused")
+
+        results = await asyncio.gather(
+            flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+        )
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_the_call_for_others() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str] = SingleFlight()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def embed(priority: Priority) -> str:
+            started.set()
+            await release.wait()
+            return "vector"
+
+        first = asyncio.create_task(flights.do("key", embed))
+        second = asyncio.create_task(flights.do("key", embed))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "vector"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+
+def test_call_is_cancelled_once_nobody_waits() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str] = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def embed(priority: Priority) -> str:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "vector"
+
+        caller = asyncio.create_task(flights.do("key", embed))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+        await asyncio.sleep(0)
+        assert flights.stats().in_flight == 0
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+
+def test_urgent_caller_promotes_the_call_to_its_lane() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str] = SingleFlight()
+        lanes: List[Priority] = []
+        bulk_queued = asyncio.Event()
+
+        async def embed(priority: Priority) -> str:
+            lanes.append(priority)
+            if priority == Priority.BULK:
+                # Queued behind a backfill
+                bulk_queued.set()
+                await asyncio.sleep(60)
+            return f"vector from {priority.name}"
+
+        bulk = asyncio.create_task(flights.do("key", embed, Priority.BULK))
+        await bulk_queued.wait()
+        query = await flights.do("key", embed, Priority.INTERACTIVE)
+
+        assert query == "vector from INTERACTIVE"
+        assert await bulk == query
+        assert lanes == [Priority.BULK, Priority.INTERACTIVE]
+        assert flights.stats().promoted == 1
+
+        # A less urgent caller joins the existing call instead
+        await asyncio.gather(
+            flights.do("other", embed, Priority.INTERACTIVE),
+            flights.do("other", embed, Priority.BULK),
+        )
+        assert lanes[2:] == [Priority.INTERACTIVE]
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+
+def test_failed_call_waits_for_a_promoted_call_still_running() -> None:
+    async def run() -> None:
+        flights: SingleFlight[str] = SingleFlight()
+        release_bulk = asyncio.Event()
+
+        async def embed(priority: Priority) -> str:
+            if priority == Priority.BULK:
+                await release_bulk.wait()
+                raise ConnectionError("refused")
+            await asyncio.sleep(0.01)
+            return "vector"
+
+        bulk = asyncio.create_task(flights.do("key", embed, Priority.BULK))
+        await asyncio.sleep(0)
+        query = asyncio.create_task(flights.do("key", embed, Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        release_bulk.set()
+        assert await query == "vector"
+        assert await bulk == "vector"
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5.0))
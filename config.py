@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import AnyHttpUrl, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -23,12 +25,71 @@ class Settings(BaseSettings):
     zk_repo_secret: str
     open_ai_api_key: str
     ollama_url: AnyHttpUrl
+    # Several Ollama instances to balance embeddings over; defaults to ollama_url
+    ollama_urls: list[AnyHttpUrl] = []
+    ollama_timeout: float = 30.0
+    # Cold model loads can take far longer than an embedding request
+    ollama_load_timeout: float = 120.0
+    # Defaults to enough connections for every endpoint at max concurrency
+    ollama_max_connections: Optional[int] = None
+    ollama_keepalive_expiry: float = 60.0
+    # How long Ollama keeps the model loaded after a request; negative pins it
+    ollama_keep_alive: str = "30m"
     llm_embeddings_model: str
+    llm_generation_model: str = "llama3.2"
+    # Ollama instance serving generation; defaults to ollama_url
+    ollama_generation_url: Optional[AnyHttpUrl] = None
+    # "ollama", or "hash" for deterministic offline embeddings (tests, benchmarks)
+    embedding_backend: str = "ollama"
+    embedding_hash_dimension: int = 768
+    embedding_initial_concurrency: int = 4
+    embedding_min_concurrency: int = 1
+    embedding_max_concurrency: int = 16
+    # Slots per endpoint kept free of bulk ingestion for query embeddings
+    embedding_interactive_reserve: int = 1
+    embedding_max_attempts: int = 4
+    embedding_retry_base_delay: float = 0.5
+    embedding_retry_max_delay: float = 10.0
+    embedding_circuit_failure_threshold: int = 5
+    embedding_circuit_reset_timeout: float = 30.0
+    query_embedding_cache_size: int = 1024
+    query_embedding_cache_ttl: float = 3600.0
+    semantic_cache_size: int = 512
+    # Minimum cosine similarity between queries to reuse a cached result
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl: float = 3600.0
+    search_latency_budget_ms: float = 300.0
+    # Candidates retrieved per requested result when re-ranking
+    search_rerank_oversample: int = 4
+    search_lexical_weight: float = 0.1
+    # Relevance vs. diversity trade-off of MMR re-ranking; 1.0 is relevance only
+    search_mmr_lambda: float = 0.7
+    search_max_chunks_per_document: Optional[int] = 2
+    search_index_refresh_interval: float = 5.0
+    # Score only chunks of this many best documents by centroid; 0 scans all
+    search_coarse_documents: int = 0
+    # Worker processes the search index is partitioned over; 0 or 1 searches
+    # in the API process
+    search_shards: int = 0
+    # Memory-mapped index snapshot shared by API workers and nodes; see
+    # libs/retrieval/snapshot.py
+    search_snapshot_path: Optional[str] = None
+    # Estimated tokens of note text packed into an answer prompt
+    answer_context_tokens: int = 3000
+    # Notes linked to or from retrieved notes added after them to the context
+    answer_linked_notes: int = 3
+    answer_cache_max_entries: int = 10000
+    # Neighbours stored per document by the related documents job
+    related_documents_k: int = 10
 
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
     )
 
+    @property
+    def ollama_endpoints(self) -> list[AnyHttpUrl]:
+        return self.ollama_urls or [self.ollama_url]
+
 
 settings = Settings()  # type: ignore
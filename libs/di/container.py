@@ -1,14 +1,28 @@
+from typing import List
+
 from apps.backend.handler.github_handler import GithubHandler
+from apps.backend.services.answer_cache import AnswerCache
+from apps.backend.services.answer_service import AnswerService
 from apps.backend.services.embedding_service import EmbeddingService
+from apps.backend.services.generation import OllamaGenerator
+from apps.backend.services.query_embedder import QueryEmbedder
+from apps.backend.services.search_service import SearchService
+from apps.backend.services.semantic_cache import SemanticCache
 from apps.backend.services.document_service import DocumentService
 from dependency_injector import containers, providers
 
 from libs.clients.github_client import GithubClient
 from libs.storage.db import get_db_session
+from libs.storage.repositories.answer_cache import AnswerCacheRepository
 from libs.storage.repositories.document import DocumentRepository
+from libs.storage.repositories.related_documents import RelatedDocumentRepository
 from libs.storage.repositories.user import UserRepository
 from libs.pipeline.pipeline import DataPipeline
 from libs.pipeline.embedder import DocumentEmbedder, SimilarityCalculator
+from libs.pipeline.corpus import CorpusVersion
+from libs.pipeline.dedup import ChunkFingerprintIndex
+from libs.models.Answer import AnswerResponse
+from libs.models.Search import SearchHit
 from libs.models.pipeline.config import PipelineConfig
 from config import settings
 
@@ -23,6 +37,13 @@ class Container(containers.DeclarativeContainer):
     # Repositories
     document_repo = providers.Singleton(DocumentRepository, session=db_session)
     user_repo = providers.Singleton(UserRepository, session=db_session)
+    answer_cache_repo = providers.Singleton(AnswerCacheRepository, session=db_session)
+    related_document_repo = providers.Singleton(
+        RelatedDocumentRepository, session=db_session
+    )
+
+    # Bumped on every document change to invalidate derived caches
+    corpus_version = providers.Singleton(CorpusVersion)
 
     # Clients
     github_client: providers.Factory[GithubClient] = providers.Factory(
@@ -33,10 +54,50 @@ class Container(containers.DeclarativeContainer):
     embedding_service: providers.Singleton[EmbeddingService] = providers.Singleton(
         EmbeddingService,
     )
+    query_embedder: providers.Singleton[QueryEmbedder] = providers.Singleton(
+        QueryEmbedder.from_settings,
+        embedding_service=embedding_service,
+    )
+    # One semantic cache per consumer, so each holds a single value type
+    search_result_cache: providers.Singleton[SemanticCache[List[SearchHit]]] = (
+        providers.Singleton(
+            SemanticCache[List[SearchHit]].from_settings,
+            corpus_version=corpus_version,
+        )
+    )
+    answer_result_cache: providers.Singleton[SemanticCache[AnswerResponse]] = (
+        providers.Singleton(
+            SemanticCache[AnswerResponse].from_settings,
+            corpus_version=corpus_version,
+        )
+    )
+    search_service: providers.Singleton[SearchService] = providers.Singleton(
+        SearchService,
+        document_repo=document_repo,
+        query_embedder=query_embedder,
+        semantic_cache=search_result_cache,
+        corpus_version=corpus_version,
+    )
+    generator: providers.Singleton[OllamaGenerator] = providers.Singleton(
+        OllamaGenerator.from_settings,
+    )
+    answer_cache: providers.Singleton[AnswerCache] = providers.Singleton(
+        AnswerCache.from_settings,
+        repository=answer_cache_repo,
+    )
+    answer_service: providers.Singleton[AnswerService] = providers.Singleton(
+        AnswerService,
+        search_service=search_service,
+        query_embedder=query_embedder,
+        semantic_cache=answer_result_cache,
+        generator=generator,
+        answer_cache=answer_cache,
+    )
     document_service: providers.Singleton[DocumentService] = providers.Singleton(
         DocumentService,
         document_repo=document_repo,
         embedding_service=embedding_service,
+        corpus_version=corpus_version,
     )
 
     # Handlers
@@ -57,9 +118,15 @@ class Container(containers.DeclarativeContainer):
         chunk_overlap=200,
     )
 
+    chunk_fingerprint_index = providers.Singleton(
+        ChunkFingerprintIndex,
+        reuse_near_duplicates=pipeline_config.provided.reuse_near_duplicate_embeddings,
+        max_distance=pipeline_config.provided.near_duplicate_max_distance,
+    )
     document_embedder = providers.Singleton(
         DocumentEmbedder,
         embedder=embedding_service,
+        fingerprint_index=chunk_fingerprint_index,
     )
     similarity_calculator = providers.Singleton(SimilarityCalculator)
 
@@ -68,6 +135,7 @@ class Container(containers.DeclarativeContainer):
         config=pipeline_config,
         document_embedder=document_embedder,
         similarity_calculator=similarity_calculator,
+        corpus_version=corpus_version,
     )
 
 
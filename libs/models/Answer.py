@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from libs.models.Search import SearchFilters
+
+
+class AnswerRequest(BaseModel):
+    question: str = Field(min_length=1, max_length=2000)
+    top_k: int = Field(
+        default=12, ge=1, le=100, description="Chunks retrieved before packing"
+    )
+    filters: Optional[SearchFilters] = None
+    context_tokens: Optional[int] = Field(
+        default=None, ge=100, description="Token budget for retrieved note text"
+    )
+    linked_notes: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=20,
+        description="Notes linked to or from retrieved notes to add to the context",
+    )
+    stream: bool = Field(
+        default=True, description="Stream server-sent events as tokens arrive"
+    )
+
+
+class Reference(BaseModel):
+    """A note quoted in the context, cited in answers as [number]."""
+
+    number: int
+    document_id: str
+    title: Optional[str] = None
+    file_path: Optional[str] = None
+    chunk_ids: List[str]
+    score: float
+
+
+class AnswerTimings(BaseModel):
+    retrieval_ms: float
+    time_to_first_token_ms: Optional[float] = None
+    took_ms: float
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class AnswerResponse(BaseModel):
+    question: str
+    answer: str
+    references: List[Reference]
+    timings: AnswerTimings
+    model: str
+    cached: bool = False
+
+
+class StoredAnswer(BaseModel):
+    """A generated answer persisted for reuse over the same note contents."""
+
+    key: str
+    model: str
+    question: str
+    chunk_hashes: List[str]
+    answer: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    created_at: datetime
+    hits: int = 0
+
+
+class AnswerTokenEvent(BaseModel):
+    type: Literal["token"] = "token"
+    text: str
+
+
+class AnswerReferencesEvent(BaseModel):
+    type: Literal["references"] = "references"
+    references: List[Reference]
+
+
+class AnswerDoneEvent(BaseModel):
+    type: Literal["done"] = "done"
+    timings: AnswerTimings
+    model: str
+    cached: bool = False
+
+
+class AnswerErrorEvent(BaseModel):
+    type: Literal["error"] = "error"
+    detail: str
+
+
+AnswerEvent = Union[
+    AnswerTokenEvent, AnswerReferencesEvent, AnswerDoneEvent, AnswerErrorEvent
+]
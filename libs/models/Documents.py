@@ -10,6 +10,8 @@ from .pipeline.metadata import DocumentMetadata, FrontmatterMetadata
 class ParsedContent(BaseModel):
     metadata: FrontmatterMetadata
     content: str
+    # Keys of linked notes, see content_parser.link_key
+    links: List[str] = []
 
 
 class TextChunk(BaseModel):
@@ -29,9 +31,10 @@ class EmbeddedChunk(TextChunk):
 
     @classmethod
     def from_text_chunk(
-        cls, text_chunk: TextChunk, embedding: Embedding
+        cls, text_chunk: TextChunk, embedding: Optional[Embedding]
     ) -> "EmbeddedChunk":
-        return cls(
+        # Both inputs are already validated models, so skip re-validation
+        return cls.model_construct(
             id=text_chunk.id,
             document_id=text_chunk.document_id,
             content=text_chunk.content,
@@ -50,17 +53,22 @@ class Document(BaseModel):
     created_at: datetime
     updated_at: datetime
     deleted_at: Optional[datetime] = None
+    links: List[str] = []
 
 
 class AnalysedDocument(Document):
     embedded_chunks: List[EmbeddedChunk] = []
+    centroid: Optional[Embedding] = None
 
     def __str__(self) -> str:
         return f"Document(id={self.id}, name={self.metadata.frontmatter_metadata.title if self.metadata.frontmatter_metadata else 'N/A'}, created_at={self.created_at})"
 
     @classmethod
     def from_document_and_embeddings(
-        cls, document: Document, embedded_chunks: List[EmbeddedChunk]
+        cls,
+        document: Document,
+        embedded_chunks: List[EmbeddedChunk],
+        centroid: Optional[Embedding] = None,
     ) -> "AnalysedDocument":
         return cls(
             id=document.id,
@@ -70,5 +78,7 @@ class AnalysedDocument(Document):
             created_at=document.created_at,
             updated_at=document.updated_at,
             deleted_at=document.deleted_at,
+            links=document.links,
             embedded_chunks=embedded_chunks,
+            centroid=centroid,
         )
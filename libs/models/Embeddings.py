@@ -1,8 +1,9 @@
-from pydantic import BaseModel
-
-
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence, cast
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
 
 
 class Embedding(BaseModel):
@@ -14,3 +15,90 @@ class Embedding(BaseModel):
 class EmbeddingsBatch(BaseModel):
     embeddings: List[Embedding]
     created_at: datetime
+
+
+class EmbeddingMatrix:
+    """Columnar batch of embeddings sharing one model and timestamp.
+
+    Vectors are held in a single C-contiguous (n, d) float32 array and rows are
+    addressed by id. `row`/`__getitem__` return views into that array, so
+    consumers (similarity, vector index, storage) never copy per embedding.
+    """
+
+    __slots__ = ("vectors", "ids", "embedding_model", "created_at", "_row_of")
+
+    def __init__(
+        self,
+        vectors: NDArray[np.float32],
+        ids: Sequence[str],
+        embedding_model: str,
+        created_at: datetime,
+    ) -> None:
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError(
+                f"Expected {len(ids)} embedding rows, got shape {vectors.shape}"
+            )
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.ids: List[str] = list(ids)
+        self.embedding_model = embedding_model
+        self.created_at = created_at
+        self._row_of: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def __getitem__(self, index: int) -> NDArray[np.float32]:
+        return cast(NDArray[np.float32], self.vectors[index])
+
+    def __iter__(self) -> Iterator[NDArray[np.float32]]:
+        return iter(self.vectors)
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+    def row_index(self, id: str) -> int:
+        if self._row_of is None:
+            self._row_of = {row_id: i for i, row_id in enumerate(self.ids)}
+        return self._row_of[id]
+
+    def row(self, id: str) -> NDArray[np.float32]:
+        """Zero-copy view of the embedding stored for `id`."""
+        return cast(NDArray[np.float32], self.vectors[self.row_index(id)])
+
+    def normalised(self) -> NDArray[np.float32]:
+        """Unit-length copy of the vectors; zero rows stay zero."""
+        norms = np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        return np.divide(
+            self.vectors, norms, out=np.zeros_like(self.vectors), where=norms > 0
+        )
+
+    def to_embedding(self, index: int) -> Embedding:
+        return Embedding.model_construct(
+            embedding=self.vectors[index].tolist(),
+            embedding_model=self.embedding_model,
+            embedding_created_at=self.created_at,
+        )
+
+    def to_embeddings_batch(self) -> EmbeddingsBatch:
+        """Row-wise pydantic representation, for API and storage boundaries."""
+        return EmbeddingsBatch.model_construct(
+            embeddings=[self.to_embedding(i) for i in range(len(self))],
+            created_at=self.created_at,
+        )
+
+    @classmethod
+    def from_embeddings_batch(
+        cls, batch: EmbeddingsBatch, ids: Sequence[str]
+    ) -> "EmbeddingMatrix":
+        if not batch.embeddings:
+            raise ValueError("Cannot build an EmbeddingMatrix from an empty batch")
+        return cls(
+            vectors=np.array(
+                [embedding.embedding for embedding in batch.embeddings],
+                dtype=np.float32,
+            ),
+            ids=ids,
+            embedding_model=batch.embeddings[0].embedding_model,
+            created_at=batch.created_at,
+        )
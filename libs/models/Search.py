@@ -0,0 +1,144 @@
+from datetime import date
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field, StringConstraints
+
+
+class DocumentSummary(BaseModel):
+    """Document metadata returned alongside search hits."""
+
+    id: str
+    title: Optional[str] = None
+    file_path: Optional[str] = None
+    author: Optional[str] = None
+    category: Optional[str] = None
+    document_type: Optional[str] = None
+    source: Optional[str] = None
+    tags: List[str] = []
+    created_on: Optional[date] = None
+
+
+class SearchFilters(BaseModel):
+    """Metadata constraints; a chunk must satisfy every filter that is set.
+
+    List filters match any of their values, ignoring case.
+    """
+
+    document_ids: Optional[List[str]] = None
+    tags: Optional[List[str]] = Field(
+        default=None, description="Match documents with any of these tags"
+    )
+    authors: Optional[List[str]] = None
+    categories: Optional[List[str]] = None
+    document_types: Optional[List[str]] = None
+    sources: Optional[List[str]] = None
+    created_after: Optional[date] = None
+    created_before: Optional[date] = None
+    path_prefix: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not any(value is not None for value in self.model_dump().values())
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=2000)
+    top_k: int = Field(default=10, ge=1, le=100)
+    filters: Optional[SearchFilters] = None
+    rerank: bool = True
+    latency_budget_ms: Optional[float] = Field(default=None, gt=0)
+    stream: bool = Field(
+        default=False,
+        description="Stream NDJSON events, sending hits before re-ranking",
+    )
+
+
+class SearchHit(BaseModel):
+    chunk_id: str
+    document_id: str
+    chunk_index: int
+    content: str
+    content_hash: Optional[str] = None
+    score: float
+    document: Optional[DocumentSummary] = None
+    linked_from: Optional[str] = Field(
+        default=None,
+        description="Retrieved document this one links to or from, for link expansion",
+    )
+
+
+class RankedChunk(BaseModel):
+    chunk_id: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
+    took_ms: float
+    cached: bool = False
+    degraded: List[str] = Field(
+        default=[], description="Stages skipped to stay within the latency budget"
+    )
+
+
+class BatchSearchRequest(BaseModel):
+    """Many queries sharing one top_k and one set of filters."""
+
+    queries: List[Annotated[str, StringConstraints(min_length=1, max_length=2000)]] = (
+        Field(min_length=1, max_length=1000)
+    )
+    top_k: int = Field(default=10, ge=1, le=100)
+    filters: Optional[SearchFilters] = None
+    rerank: bool = True
+
+
+class BatchSearchResult(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[BatchSearchResult]
+    took_ms: float
+    embed_ms: float
+    score_ms: float
+
+
+class RelatedDocument(BaseModel):
+    document_id: str
+    title: Optional[str] = None
+    file_path: Optional[str] = None
+    score: float
+    rank: int
+
+
+class DocumentLinks(BaseModel):
+    """Notes a note links to and notes linking to it."""
+
+    document_id: str
+    links: List[DocumentSummary]
+    backlinks: List[DocumentSummary]
+
+
+class SearchHitEvent(BaseModel):
+    type: Literal["hit"] = "hit"
+    rank: int
+    hit: SearchHit
+
+
+class SearchRerankEvent(BaseModel):
+    """Final order after re-ranking, with any hits not streamed before."""
+
+    type: Literal["rerank"] = "rerank"
+    ranking: List[RankedChunk]
+    hits: List[SearchHit] = []
+
+
+class SearchDoneEvent(BaseModel):
+    type: Literal["done"] = "done"
+    took_ms: float
+    cached: bool = False
+    degraded: List[str] = []
+
+
+SearchEvent = Union[SearchHitEvent, SearchRerankEvent, SearchDoneEvent]
@@ -14,13 +14,12 @@ from .models import (
     PipelineResult,
     PipelineStatus,
     PipelineCallback,
+    DedupReport,
     FileMetadata,
     FrontmatterMetadata,
-    DocumentMetadata,
     ParsedContent,
-    TextChunk,
-    EmbeddedChunk,
-    TextChunk,
+    ChunkRecord,
+    ChunkBatch,
 )
 
 __all__ = [
@@ -34,9 +33,10 @@ __all__ = [
     "PipelineResult",
     "PipelineStatus",
     "PipelineCallback",
+    "DedupReport",
     "FileMetadata",
     "FrontmatterMetadata",
-    "DocumentMetadata",
     "ParsedContent",
-    "TextChunk",
+    "ChunkRecord",
+    "ChunkBatch",
 ]
@@ -0,0 +1,89 @@
+"""Lightweight chunk representation for the pipeline hot path.
+
+Chunks travel through processing and embedding as slotted records, with the
+embeddings of a batch held in a single float32 block. Pydantic models are only
+built once the batch leaves the pipeline (callbacks, storage, API).
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from ..documents import EmbeddedChunk, TextChunk
+from ..embeddings import EmbeddingMatrix
+
+
+@dataclass(slots=True)
+class ChunkRecord:
+    id: str
+    document_id: str
+    content: str
+    content_hash: str
+    chunk_index: int
+    word_count_estimate: int
+
+    @classmethod
+    def from_text_chunk(cls, chunk: TextChunk) -> "ChunkRecord":
+        return cls(
+            id=chunk.id,
+            document_id=chunk.document_id,
+            content=chunk.content,
+            content_hash=chunk.content_hash,
+            chunk_index=chunk.chunk_index,
+            word_count_estimate=chunk.word_count_estimate,
+        )
+
+    def to_text_chunk(self) -> TextChunk:
+        # Records are built by the processor, so there is nothing to validate
+        return TextChunk.model_construct(
+            id=self.id,
+            document_id=self.document_id,
+            content=self.content,
+            content_hash=self.content_hash,
+            chunk_index=self.chunk_index,
+            word_count_estimate=self.word_count_estimate,
+        )
+
+
+class ChunkBatch:
+    """Chunk records plus one columnar embedding block keyed by chunk id."""
+
+    __slots__ = ("records", "embeddings")
+
+    def __init__(self, records: Sequence[ChunkRecord]) -> None:
+        self.records: List[ChunkRecord] = list(records)
+        self.embeddings: Optional[EmbeddingMatrix] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def ids(self) -> List[str]:
+        return [record.id for record in self.records]
+
+    @property
+    def texts(self) -> List[str]:
+        return [record.content for record in self.records]
+
+    def set_embeddings(self, embeddings: EmbeddingMatrix) -> None:
+        if embeddings.ids != self.ids:
+            raise ValueError("Embedding rows do not match the batch's chunk ids")
+        self.embeddings = embeddings
+
+    def to_embedded_chunks(self) -> List[EmbeddedChunk]:
+        """Convert to pydantic models at the pipeline boundary."""
+        return [
+            EmbeddedChunk.model_construct(
+                id=record.id,
+                document_id=record.document_id,
+                content=record.content,
+                content_hash=record.content_hash,
+                chunk_index=record.chunk_index,
+                word_count_estimate=record.word_count_estimate,
+                embedding=(
+                    self.embeddings.to_embedding(i)
+                    if self.embeddings is not None
+                    else None
+                ),
+            )
+            for i, record in enumerate(self.records)
+        ]
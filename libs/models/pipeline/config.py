@@ -1,4 +1,6 @@
 import os
+from typing import Optional
+
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -10,5 +12,12 @@ class PipelineConfig(BaseModel):
     embedding_model: str = "nomic-embed-text"
     chunk_size: int = Field(default=1000, ge=100, le=10000)
     chunk_overlap: int = Field(default=200, ge=0, le=2000)
+    reuse_near_duplicate_embeddings: bool = False
+    near_duplicate_max_distance: int = Field(default=3, ge=0, le=15)
+    max_file_retries: int = Field(default=5, ge=0)
+    retry_base_delay: float = Field(default=5.0, gt=0)
+    retry_max_delay: float = Field(default=300.0, gt=0)
+    # Ollama keep_alive while the pipeline runs; negative pins the model
+    embedding_keep_alive: Optional[str] = "-1m"
 
     model_config = ConfigDict(frozen=True)
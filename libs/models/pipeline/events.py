@@ -20,5 +20,6 @@ class FileEvent(BaseModel):
     file_path: Path
     event_type: FileEventType
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    attempt: int = 0
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
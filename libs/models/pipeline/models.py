@@ -12,7 +12,13 @@ from ..documents import (
     TextChunk,
 )
 from .metadata import FileMetadata, FrontmatterMetadata, DocumentMetadata
-from .processor import PipelineResult, PipelineStatus, PipelineCallback
+from .processor import (
+    DedupReport,
+    PipelineResult,
+    PipelineStatus,
+    PipelineCallback,
+)
+from .chunks import ChunkBatch, ChunkRecord
 from .config import PipelineConfig
 from .events import FileEvent, FileEventType
 
@@ -27,10 +33,13 @@ __all__ = [
     "PipelineResult",
     "PipelineStatus",
     "PipelineCallback",
+    "DedupReport",
     "FileMetadata",
     "FrontmatterMetadata",
     "DocumentMetadata",
     "ProcessedContent",
     "ParsedContent",
+    "ChunkRecord",
+    "ChunkBatch",
     "TextChunk",
 ]
@@ -2,9 +2,10 @@
 
 from datetime import datetime, timezone
 from typing import Awaitable, Callable, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 from ..documents import Document, EmbeddedChunk
+from ..embeddings import Embedding
 from .events import FileEventType
 
 
@@ -13,6 +14,7 @@ class PipelineResult(BaseModel):
 
     document: Optional[Document] = None
     chunks: Optional[List[EmbeddedChunk]] = None
+    centroid: Optional[Embedding] = None
     file_path: Optional[str] = None
     event_type: FileEventType
     processed_at: datetime
@@ -23,11 +25,13 @@ class PipelineResult(BaseModel):
         document: Document,
         chunks: List[EmbeddedChunk],
         event_type: FileEventType,
+        centroid: Optional[Embedding] = None,
     ) -> "PipelineResult":
         """Create a result from document processing."""
         return cls(
             document=document,
             chunks=chunks,
+            centroid=centroid,
             event_type=event_type,
             processed_at=datetime.now(timezone.utc),
         )
@@ -42,14 +46,33 @@ class PipelineResult(BaseModel):
         )
 
 
+class DedupReport(BaseModel):
+    """Running counts of duplicate chunks detected ahead of embedding."""
+
+    chunks_seen: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    near_duplicates_reused: int = 0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def embedding_calls_saved(self) -> int:
+        return self.exact_duplicates + self.near_duplicates_reused
+
+
 class PipelineStatus(BaseModel):
     """Current status of the pipeline."""
 
     is_running: bool
+    is_ready: bool = False
     watch_directory: str
     queue_size: int
     chunk_size: int
     chunk_overlap: int
+    retry_queue_size: int = 0
+    failed_files: List[str] = []
+    embedding_circuit: Optional[str] = None
+    dedup: Optional[DedupReport] = None
 
 
 PipelineCallback = Callable[[PipelineResult], Awaitable[None]]
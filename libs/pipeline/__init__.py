@@ -1,10 +1,12 @@
 from .watchers.file_watcher import FileWatcher
+from .corpus import CorpusVersion
 from .embedder import DocumentEmbedder
 from .pipeline import DataPipeline
 from .config import PipelineConfig, load_config
 
 __all__ = [
     "FileWatcher",
+    "CorpusVersion",
     "DocumentEmbedder",
     "DataPipeline",
     "PipelineConfig",
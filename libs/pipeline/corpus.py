@@ -0,0 +1,21 @@
+"""Version counter for the indexed corpus, used to invalidate derived caches."""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class CorpusVersion:
+    """Monotonic counter bumped whenever an indexed document changes.
+
+    Caches of search results and answers record the version they were
+    computed at and treat entries from older versions as stale.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0
+        self.changed_at: Optional[datetime] = None
+
+    def bump(self) -> int:
+        self.value += 1
+        self.changed_at = datetime.now(timezone.utc)
+        return self.value
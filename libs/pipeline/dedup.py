@@ -0,0 +1,145 @@
+"""Exact and near-duplicate chunk detection ahead of embedding."""
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.models.pipeline import ChunkRecord, DedupReport
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+TOKEN_PATTERN = re.compile(r"\w+")
+BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over lowercased word shingles."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) > shingle_size:
+        shingles = [
+            " ".join(tokens[i : i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        ]
+    else:
+        shingles = [" ".join(tokens)]
+
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    bits = (hashes[:, None] >> BIT_SHIFTS) & np.uint64(1)
+    weights = (bits.astype(np.int64) * 2 - 1).sum(axis=0)
+    return int(np.sum(np.uint64(1) << BIT_SHIFTS[weights > 0]))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateMatch:
+    vector: NDArray[np.float32]
+    is_exact: bool
+    distance: int
+
+
+class ChunkFingerprintIndex:
+    """Fingerprints of embedded chunks used to skip redundant Ollama calls.
+
+    Exact duplicates are found by content hash. Near duplicates are found by
+    splitting each SimHash into `max_distance + 1` bands: by the pigeonhole
+    principle two fingerprints within `max_distance` bits share at least one
+    band, so only candidates from matching band buckets are compared.
+    """
+
+    def __init__(
+        self, reuse_near_duplicates: bool = False, max_distance: int = 3
+    ) -> None:
+        self.reuse_near_duplicates = reuse_near_duplicates
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_width = FINGERPRINT_BITS // self.band_count
+        self.band_mask = (1 << self.band_width) - 1
+
+        self._by_content_hash: Dict[str, NDArray[np.float32]] = {}
+        self._fingerprints: List[int] = []
+        self._vectors: List[NDArray[np.float32]] = []
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(self.band_count)]
+        self.report = DedupReport()
+
+    def __len__(self) -> int:
+        return len(self._by_content_hash)
+
+    def lookup(self, chunk: ChunkRecord) -> Optional[DuplicateMatch]:
+        """Return a reusable embedding for the chunk, if one is known."""
+        self.report.chunks_seen += 1
+
+        vector = self._by_content_hash.get(chunk.content_hash)
+        if vector is not None:
+            self.report.exact_duplicates += 1
+            return DuplicateMatch(vector=vector, is_exact=True, distance=0)
+
+        match = self._nearest(simhash(chunk.content))
+        if match is None:
+            return None
+
+        self.report.near_duplicates += 1
+        if not self.reuse_near_duplicates:
+            return None
+
+        self.report.near_duplicates_reused += 1
+        return match
+
+    def record_exact_duplicate(self) -> None:
+        """Count a duplicate resolved by the caller, e.g. within one batch."""
+        self.report.chunks_seen += 1
+        self.report.exact_duplicates += 1
+
+    def add(self, chunk: ChunkRecord, vector: NDArray[np.float32]) -> None:
+        """Register a freshly embedded chunk."""
+        if chunk.content_hash in self._by_content_hash:
+            return
+
+        # Copy so that a single row does not keep its whole batch block alive
+        vector = np.array(vector, dtype=np.float32, copy=True)
+        self._by_content_hash[chunk.content_hash] = vector
+        fingerprint = simhash(chunk.content)
+        entry_id = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        self._vectors.append(vector)
+        for band, buckets in zip(self.__bands_of(fingerprint), self._bands):
+            buckets.setdefault(band, []).append(entry_id)
+
+    def _nearest(self, fingerprint: int) -> Optional[DuplicateMatch]:
+        best: Optional[DuplicateMatch] = None
+        for band, buckets in zip(self.__bands_of(fingerprint), self._bands):
+            for entry_id in buckets.get(band, ()):
+                distance = hamming_distance(fingerprint, self._fingerprints[entry_id])
+                if distance <= self.max_distance and (
+                    best is None or distance < best.distance
+                ):
+                    best = DuplicateMatch(
+                        vector=self._vectors[entry_id],
+                        is_exact=False,
+                        distance=distance,
+                    )
+        return best
+
+    def __bands_of(self, fingerprint: int) -> List[int]:
+        return [
+            (fingerprint >> (i * self.band_width)) & self.band_mask
+            for i in range(self.band_count)
+        ]
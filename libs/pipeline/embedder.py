@@ -1,11 +1,22 @@
 import logging
-from typing import List
-import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-from dependency_injector.wiring import inject, Provide
-from apps.backend.services.embedding_service import EmbeddingService
+import numpy as np
+from dependency_injector.wiring import Provide, inject
+from numpy.typing import NDArray
+
+from apps.backend.services.concurrency import Priority
+from apps.backend.services.embedding_service import (
+    EmbeddingBatchError,
+    EmbeddingService,
+)
 from libs.models.documents import EmbeddedChunk, TextChunk
-from libs.models.embeddings import Embedding
+from libs.models.embeddings import Embedding, EmbeddingMatrix
+from libs.models.pipeline import ChunkBatch, ChunkRecord, DedupReport
+from libs.retrieval.centroids import weighted_centroids
+
+from .dedup import ChunkFingerprintIndex
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +26,14 @@ class DocumentEmbedder:
 
     @inject
     def __init__(
-        self, embedder: EmbeddingService = Provide["Container.embedding_service"]
+        self,
+        embedder: EmbeddingService = Provide["Container.embedding_service"],
+        fingerprint_index: Optional[ChunkFingerprintIndex] = Provide[
+            "Container.chunk_fingerprint_index"
+        ],
     ) -> None:
         self.embedder = embedder
+        self.fingerprint_index = fingerprint_index
 
     async def embed_document_chunks(
         self, chunks: List[TextChunk]
@@ -26,16 +42,126 @@ class DocumentEmbedder:
         if not chunks:
             return []
 
-        texts = [chunk.content for chunk in chunks]
-        analysed_batch = await self.embedder.generate_multiple_embeddings(texts)
-
-        embedded_chunks: List[EmbeddedChunk] = []
-        for chunk, embedding in zip(chunks, analysed_batch.embeddings):
-            embedded_chunk = EmbeddedChunk.from_text_chunk(chunk, embedding)
-            embedded_chunks.append(embedded_chunk)
-
-        logger.info(f"Embedded {len(embedded_chunks)} chunks")
-        return embedded_chunks
+        batch = ChunkBatch([ChunkRecord.from_text_chunk(chunk) for chunk in chunks])
+        await self.embed_chunk_batch(batch)
+        return batch.to_embedded_chunks()
+
+    async def embed_chunk_batch(self, batch: ChunkBatch) -> ChunkBatch:
+        """Fill the batch's embedding block, reusing embeddings of duplicates."""
+        records = batch.records
+        if not records:
+            return batch
+
+        reused: Dict[int, NDArray[np.float32]] = {}
+        # content hash -> indices of the chunks waiting on that embedding
+        pending: Dict[str, List[int]] = {}
+        for i, record in enumerate(records):
+            if record.content_hash in pending:
+                pending[record.content_hash].append(i)
+                if self.fingerprint_index is not None:
+                    self.fingerprint_index.record_exact_duplicate()
+                continue
+
+            match = (
+                self.fingerprint_index.lookup(record)
+                if self.fingerprint_index is not None
+                else None
+            )
+            if match is not None:
+                reused[i] = match.vector
+            else:
+                pending[record.content_hash] = [i]
+
+        to_embed = [indices[0] for indices in pending.values()]
+        try:
+            embedded = (
+                await self.embedder.generate_embedding_matrix(
+                    [records[i].content for i in to_embed],
+                    ids=[records[i].id for i in to_embed],
+                    priority=Priority.BULK,
+                )
+                if to_embed
+                else None
+            )
+        except EmbeddingBatchError as e:
+            # Keep what succeeded so a retry only re-embeds the failed chunks
+            if e.partial is not None and self.fingerprint_index is not None:
+                records_by_id = {record.id: record for record in records}
+                for row_id, row in zip(e.partial.ids, e.partial):
+                    self.fingerprint_index.add(records_by_id[row_id], row)
+            raise
+
+        dimension = (
+            embedded.dimension
+            if embedded is not None
+            else next(iter(reused.values())).shape[0]
+        )
+        block = np.empty((len(records), dimension), dtype=np.float32)
+        for i, vector in reused.items():
+            block[i] = vector
+        if embedded is not None:
+            for row, indices in zip(embedded, pending.values()):
+                block[indices] = row
+                if self.fingerprint_index is not None:
+                    self.fingerprint_index.add(records[indices[0]], row)
+
+        batch.set_embeddings(
+            EmbeddingMatrix(
+                vectors=block,
+                ids=batch.ids,
+                embedding_model=self.embedder.model,
+                created_at=(
+                    embedded.created_at
+                    if embedded is not None
+                    else datetime.now(timezone.utc)
+                ),
+            )
+        )
+        logger.info(
+            f"Embedded {len(records)} chunks with {len(to_embed)} embedding calls"
+        )
+        return batch
+
+    @staticmethod
+    def document_centroid(batch: ChunkBatch) -> Optional[Embedding]:
+        """Length-weighted mean of a document's chunk embeddings, unit-normalised.
+
+        Used by search to rank whole documents before scoring their chunks.
+        """
+        if batch.embeddings is None or len(batch) == 0:
+            return None
+        weights = np.fromiter(
+            (len(record.content) for record in batch.records),
+            dtype=np.float32,
+            count=len(batch),
+        )
+        centroid = weighted_centroids(
+            batch.embeddings.vectors, np.zeros(len(batch), np.int64), weights, 1
+        )[0]
+        return Embedding.model_construct(
+            embedding=centroid.tolist(),
+            embedding_model=batch.embeddings.embedding_model,
+            embedding_created_at=batch.embeddings.created_at,
+        )
+
+    async def warm_up(self, keep_alive: Optional[str] = None) -> bool:
+        return await self.embedder.warm_up(keep_alive)
+
+    async def reset_keep_alive(self) -> None:
+        await self.embedder.reset_keep_alive()
+
+    async def wait_until_available(self) -> None:
+        """Wait while no embedding endpoint is accepting requests."""
+        await self.embedder.wait_until_available()
+
+    def circuit_state(self) -> str:
+        return self.embedder.state.value
+
+    def dedup_report(self) -> Optional[DedupReport]:
+        """Duplicate detection counts, including Ollama calls saved."""
+        if self.fingerprint_index is None:
+            return None
+        return self.fingerprint_index.report.model_copy()
 
     async def close(self) -> None:
         """Close the embedder."""
@@ -73,3 +199,17 @@ class SimilarityCalculator:
             similarity = await self.calculate_similarity(query_embedding, embedding)
             similarities.append(similarity)
         return similarities
+
+    def calculate_matrix_similarities(
+        self, query: NDArray[np.float32], matrix: EmbeddingMatrix
+    ) -> NDArray[np.float32]:
+        """Cosine similarity of one query vector against every row of a matrix."""
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0 or len(matrix) == 0:
+            return np.zeros(len(matrix), dtype=np.float32)
+
+        scores = matrix.vectors @ (query.astype(np.float32) / query_norm)
+        norms = np.linalg.norm(matrix.vectors, axis=1)
+        similarities: NDArray[np.float32] = np.zeros_like(scores)
+        np.divide(scores, norms, out=similarities, where=norms > 0)
+        return similarities
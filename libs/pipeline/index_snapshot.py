@@ -0,0 +1,45 @@
+"""Writing search index snapshots from the document store."""
+
+import logging
+import time
+from pathlib import Path
+from typing import Union
+
+from libs.retrieval import IndexSnapshot, VectorIndex, write_snapshot
+from libs.storage.repositories.document import DocumentRepository
+
+logger = logging.getLogger(__name__)
+
+
+def write_index_snapshot(
+    document_repo: DocumentRepository, path: Union[str, Path]
+) -> int:
+    """Build the search index from the database and snapshot it to `path`.
+
+    The fingerprint is read first, so a snapshot can only look older than
+    its contents, never newer: readers then rebuild rather than miss a
+    change. Returns the number of chunk rows written.
+    """
+    started = time.perf_counter()
+    fingerprint = document_repo.get_corpus_fingerprint()
+    matrix, chunks, documents = document_repo.get_search_corpus()
+    if matrix is None:
+        index = VectorIndex.empty()
+    else:
+        index = VectorIndex(
+            matrix,
+            chunks,
+            documents,
+            centroids=document_repo.get_document_centroids(),
+        )
+    write_snapshot(
+        path,
+        IndexSnapshot.from_index(
+            index, document_repo.get_document_links(), fingerprint
+        ),
+    )
+    logger.info(
+        f"Wrote index snapshot of {len(index)} chunks to {path} in "
+        f"{(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return len(index)
@@ -1,11 +1,13 @@
 import asyncio
 import logging
 from pathlib import Path
-from typing import Optional, Callable, Awaitable
+from typing import Dict, Optional, Callable, Awaitable
 
 from dependency_injector.wiring import inject, Provide
-from apps.backend.services.embedding_service import EmbeddingService
+from apps.backend.services.embedding_service import EmbeddingBatchError
+from apps.backend.services.resilience import RetryPolicy
 from libs.models.pipeline import (
+    ChunkBatch,
     PipelineConfig,
     FileEvent,
     FileEventType,
@@ -17,15 +19,18 @@ from libs.utils.document_processor.document_processor import DocumentProcessor
 from .watchers.file_watcher import FileWatcher
 
 from .watchers.source_watcher import SourceWatcher
+from .corpus import CorpusVersion
 from .embedder import DocumentEmbedder, SimilarityCalculator
 
 from libs.storage.db import get_db_session
 from libs.storage.repositories.document import DocumentRepository
 from libs.models.documents import AnalysedDocument
-from libs.models.pipeline.processor import PipelineResult
 
 logger = logging.getLogger(__name__)
 
+# Most recent files given up on that the pipeline status reports
+MAX_FAILED_FILES = 100
+
 
 class DataPipeline:
     """Main data pipeline that orchestrates file watching, processing, and embedding."""
@@ -38,8 +43,10 @@ class DataPipeline:
         similarity_calculator: SimilarityCalculator = Provide[
             "Container.similarity_calculator"
         ],
+        corpus_version: Optional[CorpusVersion] = None,
     ):
         self.config = config
+        self.corpus_version = corpus_version
 
         self.file_watcher: SourceWatcher = FileWatcher(self.config.watch_directory)
         self.processor = DocumentProcessor()
@@ -49,9 +56,21 @@ class DataPipeline:
         self.similarity_calculator = similarity_calculator
 
         self.is_running = False
+        self.is_ready = False
         self.processing_queue: asyncio.Queue[FileEvent] = asyncio.Queue()
         self.callback: Optional[PipelineCallback] = None
 
+        # Files whose chunks could not all be embedded, waiting to be re-queued
+        self.retry_queue: Dict[Path, FileEvent] = {}
+        # Insertion-ordered set of the files given up on, oldest first
+        self.failed_files: Dict[str, None] = {}
+        self.retry_backoff = RetryPolicy(
+            max_attempts=self.config.max_file_retries + 1,
+            base_delay=self.config.retry_base_delay,
+            max_delay=self.config.retry_max_delay,
+        )
+        self._retry_tasks: set[asyncio.Task[None]] = set()
+
     async def start(self, callback: Optional[PipelineCallback] = None) -> None:
         """Start the data pipeline."""
         if self.is_running:
@@ -60,6 +79,7 @@ class DataPipeline:
 
         self.callback = callback
         self.is_running = True
+        self.is_ready = False
 
         self.processing_task = asyncio.create_task(self._process_queue())
         self.file_watcher.start(self._on_file_change)
@@ -77,6 +97,9 @@ class DataPipeline:
         # Stop file watcher
         self.file_watcher.stop()
 
+        for task in self._retry_tasks:
+            task.cancel()
+
         # Cancel processing task
         if hasattr(self, "processing_task"):
             self.processing_task.cancel()
@@ -85,6 +108,16 @@ class DataPipeline:
             except asyncio.CancelledError:
                 pass
 
+        if self.config.embedding_keep_alive is not None:
+            try:
+                # Bounded so that an unresponsive Ollama cannot block shutdown
+                await asyncio.wait_for(
+                    self.document_embedder.reset_keep_alive(), timeout=10.0
+                )
+            except Exception as e:
+                logger.warning(f"Could not reset embedding model keep_alive: {e}")
+        self.is_ready = False
+
         # Close embedders
         await self.document_embedder.close()
 
@@ -99,13 +132,35 @@ class DataPipeline:
 
         asyncio.create_task(self.processing_queue.put(file_event))
 
+    async def _warm_up(self) -> None:
+        """Load (and pin) the embedding model before files are processed."""
+        attempt = 1
+        while self.is_running and not await self.document_embedder.warm_up(
+            self.config.embedding_keep_alive
+        ):
+            delay = self.retry_backoff.backoff(attempt)
+            logger.warning(f"Embedding model not loaded, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if self.is_running:
+            self.is_ready = True
+            logger.info("Data pipeline ready")
+
     async def _process_queue(self) -> None:
         """Process items from the queue."""
+        try:
+            await self._warm_up()
+        except asyncio.CancelledError:
+            return
+
         while self.is_running:
             try:
                 file_event = await asyncio.wait_for(
                     self.processing_queue.get(), timeout=1.0
                 )
+                # Pause ingestion while Ollama is unhealthy
+                await self.document_embedder.wait_until_available()
                 await self._process_file(file_event)
                 self.processing_queue.task_done()
 
@@ -129,29 +184,74 @@ class DataPipeline:
                 await self._handle_file_processing(
                     file_event.file_path, file_event.event_type
                 )
+            self._processed(file_event.file_path)
 
+        except EmbeddingBatchError as e:
+            logger.warning(f"Could not embed {file_event.file_path}: {e}")
+            self._schedule_retry(file_event)
         except Exception as e:
             logger.error(f"Error processing file {file_event.file_path}: {e}")
 
+    def _schedule_retry(self, file_event: FileEvent) -> None:
+        """Re-queue a file after a backoff instead of storing partial embeddings."""
+        attempt = file_event.attempt + 1
+        if attempt > self.config.max_file_retries:
+            logger.error(
+                f"Giving up on {file_event.file_path} "
+                f"after {file_event.attempt} retries"
+            )
+            self.retry_queue.pop(file_event.file_path, None)
+            failed = str(file_event.file_path)
+            self.failed_files.pop(failed, None)
+            self.failed_files[failed] = None
+            while len(self.failed_files) > MAX_FAILED_FILES:
+                del self.failed_files[next(iter(self.failed_files))]
+            return
+
+        retry_event = file_event.model_copy(update={"attempt": attempt})
+        self.retry_queue[file_event.file_path] = retry_event
+        task = asyncio.create_task(
+            self._requeue_after(retry_event, self.retry_backoff.backoff(attempt))
+        )
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    def _processed(self, file_path: Path) -> None:
+        """Forget pending retries and failures of a file that went through."""
+        self.retry_queue.pop(file_path, None)
+        self.failed_files.pop(str(file_path), None)
+
+    async def _requeue_after(self, file_event: FileEvent, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if self.retry_queue.get(file_event.file_path) is file_event:
+            del self.retry_queue[file_event.file_path]
+            await self.processing_queue.put(file_event)
+
     async def _handle_file_processing(
         self, file_path: Path, event_type: FileEventType
     ) -> PipelineResult:
         """Handle file processing (create/modify)."""
         logger.info(f"Processing file: {file_path} ({event_type})")
         processed_document = self.processor.process_document(file_path)
-        document_chunks = self.processor.extract_chunks(
+        chunk_records = self.processor.extract_chunk_records(
             processed_document.content,
             self.config.chunk_size,
             self.config.chunk_overlap,
+            document_id=processed_document.id,
         )
 
-        embedded_chunks = await self.document_embedder.embed_document_chunks(
-            document_chunks
+        chunk_batch = await self.document_embedder.embed_chunk_batch(
+            ChunkBatch(chunk_records)
         )
+        embedded_chunks = chunk_batch.to_embedded_chunks()
+        centroid = self.document_embedder.document_centroid(chunk_batch)
 
         logger.info(f"Pipelined successfully processed: {file_path} ({event_type})")
         result = PipelineResult.from_processing(
-            document=processed_document, chunks=embedded_chunks, event_type=event_type
+            document=processed_document,
+            chunks=embedded_chunks,
+            event_type=event_type,
+            centroid=centroid,
         )
 
         # Call callback if provided
@@ -160,6 +260,7 @@ class DataPipeline:
                 await self.callback(result)
             except Exception as e:
                 logger.error(f"Error in pipeline callback: {e}")
+        self._corpus_changed()
 
         logger.info(
             f"Successfully processed {file_path.name} with {len(embedded_chunks)} chunks"
@@ -177,9 +278,15 @@ class DataPipeline:
                 await self.callback(result)
             except Exception as e:
                 logger.error(f"Error in pipeline callback for deletion: {e}")
+        self._corpus_changed()
 
         logger.info(f"Handled deletion of {file_path.name}")
 
+    def _corpus_changed(self) -> None:
+        # Cached search results and answers may now be stale
+        if self.corpus_version is not None:
+            self.corpus_version.bump()
+
     async def process_single_file(self, file_path: Path) -> PipelineResult:
         """Process a single file manually."""
         return await self._handle_file_processing(file_path, FileEventType.MANUAL)
@@ -188,10 +295,15 @@ class DataPipeline:
         """Get pipeline status."""
         return PipelineStatus(
             is_running=self.is_running,
+            is_ready=self.is_ready,
             watch_directory=self.config.watch_directory,
             queue_size=self.processing_queue.qsize(),
             chunk_size=self.config.chunk_size,
             chunk_overlap=self.config.chunk_overlap,
+            retry_queue_size=len(self.retry_queue),
+            failed_files=list(self.failed_files),
+            embedding_circuit=self.document_embedder.circuit_state(),
+            dedup=self.document_embedder.dedup_report(),
         )
 
 
@@ -205,7 +317,9 @@ def pipeline_db_storage_callback_factory() -> Callable[
         # Compose a dict with all possible fields, letting Pydantic handle missing/optional ones.
         # Create Document object using proper Pydantic validation
         embedded_document = AnalysedDocument.from_document_and_embeddings(
-            document=result.document, embedded_chunks=result.chunks or []
+            document=result.document,
+            embedded_chunks=result.chunks or [],
+            centroid=result.centroid,
         )
 
         def sync_db_ops() -> None:
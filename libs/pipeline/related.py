@@ -0,0 +1,170 @@
+"""Precomputed related-document graph, maintained incrementally."""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+from libs.retrieval import VectorIndex, top_k_neighbours
+from libs.retrieval.index import SCORE_BLOCK_ELEMENTS
+from libs.storage.repositories.document import DocumentRepository
+from libs.storage.repositories.related_documents import (
+    Neighbour,
+    RelatedDocumentRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RelatedDocumentsRun(BaseModel):
+    documents: int
+    recomputed: int
+    removed: int
+    took_ms: float
+
+
+class RelatedDocumentsJob:
+    """Keeps the top-k most similar documents of every document up to date.
+
+    Documents are compared by their centroids with exact, tiled matrix
+    products (`top_k_neighbours`), and the result is stored one row per edge,
+    so serving "related notes" is a single indexed read.
+
+    Each stored list remembers the content hash of its document. An
+    incremental run recomputes only the lists that can have changed:
+
+    - documents that are new or whose content hash changed,
+    - documents listing a changed or deleted document,
+    - documents to which some changed document is now closer than their
+      current k-th neighbour.
+
+    Every other list is provably unaffected, so after a pipeline batch the
+    cost is proportional to the number of affected documents, not n². A full
+    run is needed after changing k or the embedding model.
+    """
+
+    def __init__(
+        self,
+        document_repo: DocumentRepository,
+        related_repo: RelatedDocumentRepository,
+        k: int = 10,
+        block_elements: int = SCORE_BLOCK_ELEMENTS,
+    ) -> None:
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.document_repo = document_repo
+        self.related_repo = related_repo
+        self.k = k
+        self.block_elements = block_elements
+
+    def run(self, full: bool = False) -> RelatedDocumentsRun:
+        started = time.perf_counter()
+        computed_at = datetime.now(timezone.utc).isoformat()
+
+        ids, vectors = self._document_vectors()
+        hashes = self.document_repo.get_content_hashes()
+        graph = {} if full else self.related_repo.get_graph()
+
+        current = set(ids)
+        removed = [document_id for document_id in graph if document_id not in current]
+        if graph:
+            affected = self._affected(ids, vectors, hashes, graph, set(removed))
+        else:
+            affected = np.arange(len(ids))
+
+        if full:
+            self.related_repo.clear()
+        elif removed:
+            self.related_repo.delete(removed)
+        if len(affected):
+            rows, scores = top_k_neighbours(
+                vectors[affected],
+                vectors,
+                self.k,
+                exclude=affected,
+                block_elements=self.block_elements,
+            )
+            neighbours: Dict[str, List[Neighbour]] = {
+                ids[position]: [
+                    (ids[row], float(score)) for row, score in zip(rows[i], scores[i])
+                ]
+                for i, position in enumerate(affected)
+            }
+            self.related_repo.replace(neighbours, hashes, computed_at)
+
+        run = RelatedDocumentsRun(
+            documents=len(ids),
+            recomputed=len(affected),
+            removed=len(removed),
+            took_ms=(time.perf_counter() - started) * 1000,
+        )
+        logger.info(
+            f"Related documents: recomputed {run.recomputed} of {run.documents} "
+            f"lists, removed {run.removed}, in {run.took_ms:.0f}ms"
+        )
+        return run
+
+    def _document_vectors(self) -> Tuple[List[str], NDArray[np.float32]]:
+        """Ids and unit centroids of the documents that have embedded chunks."""
+        matrix, chunks, documents = self.document_repo.get_search_corpus()
+        if matrix is None:
+            return [], np.empty((0, 0), dtype=np.float32)
+
+        index = VectorIndex(
+            matrix,
+            chunks,
+            documents,
+            centroids=self.document_repo.get_document_centroids(),
+        )
+        chunk_counts = np.bincount(index.row_documents, minlength=len(documents) + 1)
+        positions = np.flatnonzero(chunk_counts[: len(documents)])
+        return [documents[p].id for p in positions], index.centroids[positions]
+
+    def _affected(
+        self,
+        ids: List[str],
+        vectors: NDArray[np.float32],
+        hashes: Dict[str, str],
+        graph: Dict[str, Tuple[str, List[Neighbour]]],
+        removed: Set[str],
+    ) -> NDArray[np.integer[Any]]:
+        """Positions of the documents whose stored neighbour list may be stale."""
+        changed = np.fromiter(
+            (
+                document_id not in graph
+                or graph[document_id][0] != hashes.get(document_id)
+                for document_id in ids
+            ),
+            dtype=bool,
+            count=len(ids),
+        )
+        if not changed.any() and not removed:
+            return np.flatnonzero(changed)
+
+        stale = {ids[p] for p in np.flatnonzero(changed)} | removed
+        affected = changed.copy()
+        kth_score = np.full(len(ids), -np.inf, dtype=np.float32)
+        for position, document_id in enumerate(ids):
+            entry = graph.get(document_id)
+            if entry is None:
+                continue
+            neighbours = entry[1]
+            if any(related_id in stale for related_id, _ in neighbours):
+                affected[position] = True
+            elif len(neighbours) >= min(self.k, len(ids) - 1):
+                kth_score[position] = neighbours[-1][1]
+
+        # Closest changed document to every document, in the same bounded tiles
+        if changed.any():
+            _, closest = top_k_neighbours(
+                vectors,
+                vectors[changed],
+                1,
+                block_elements=self.block_elements,
+            )
+            affected |= closest[:, 0] > kth_score
+        return np.flatnonzero(affected)
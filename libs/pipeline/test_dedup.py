@@ -0,0 +1,66 @@
+"""Tests for duplicate chunk detection ahead of embedding."""
+
+import numpy as np
+
+from libs.models.pipeline import ChunkRecord
+from libs.pipeline.dedup import ChunkFingerprintIndex, hamming_distance, simhash
+
+TEXT = (
+    "The Zettelkasten method links small atomic notes together so that ideas "
+    "can be found again by following the connections between them."
+)
+
+
+def chunk(content: str, content_hash: str) -> ChunkRecord:
+    return ChunkRecord(
+        id=f"chunk-{content_hash}",
+        document_id="doc",
+        content=content,
+        content_hash=content_hash,
+        chunk_index=0,
+        word_count_estimate=len(content.split()),
+    )
+
+
+def test_simhash_is_stable_and_close_for_small_edits() -> None:
+    assert simhash(TEXT) == simhash(TEXT)
+    assert simhash(TEXT) == simhash(TEXT.upper())
+    edited = TEXT.replace("found again", "found later")
+    assert hamming_distance(simhash(TEXT), simhash(edited)) < hamming_distance(
+        simhash(TEXT), simhash("Something else entirely about cooking pasta.")
+    )
+
+
+def test_exact_duplicates_reuse_the_stored_vector() -> None:
+    index = ChunkFingerprintIndex()
+    vector = np.arange(4, dtype=np.float32)
+    index.add(chunk(TEXT, "a"), vector)
+    vector[0] = 100
+
+    match = index.lookup(chunk(TEXT, "a"))
+    assert match is not None and match.is_exact and match.distance == 0
+    assert match.vector[0] == 0
+    assert index.lookup(chunk("Unrelated text about gardening.", "b")) is None
+    assert index.report.chunks_seen == 2
+    assert index.report.exact_duplicates == 1
+
+
+def test_near_duplicates_are_only_reused_when_enabled() -> None:
+    # A text within the distance of TEXT's fingerprint but with another hash
+    near = next(
+        TEXT + suffix
+        for suffix in (" ", " again", " too", " here", " now")
+        if hamming_distance(simhash(TEXT), simhash(TEXT + suffix)) <= 3
+    )
+    vector = np.ones(4, dtype=np.float32)
+
+    strict = ChunkFingerprintIndex(reuse_near_duplicates=False, max_distance=3)
+    strict.add(chunk(TEXT, "a"), vector)
+    assert strict.lookup(chunk(near, "b")) is None
+    assert strict.report.near_duplicates == 1
+
+    reusing = ChunkFingerprintIndex(reuse_near_duplicates=True, max_distance=3)
+    reusing.add(chunk(TEXT, "a"), vector)
+    match = reusing.lookup(chunk(near, "b"))
+    assert match is not None and not match.is_exact and match.distance <= 3
+    assert reusing.report.near_duplicates_reused == 1
@@ -6,6 +6,7 @@ import tempfile
 import os
 from pathlib import Path
 
+from apps.backend.services.embedding_backends import HashEmbeddingBackend
 from apps.backend.services.embedding_service import EmbeddingService
 from libs.models.documents import Document
 from libs.models.pipeline import EmbeddedChunk, TextChunk
@@ -81,8 +82,8 @@ async def test_embedder() -> EmbeddingsBatch | None:
     print("\nTesting DocumentEmbedder...")
 
     try:
-        # Test connection to Ollama
-        embedder = EmbeddingService()
+        # Deterministic offline embeddings, so no Ollama is needed
+        embedder = EmbeddingService(backend=HashEmbeddingBackend())
 
         # Test single embedding
         test_text = "This is a test sentence for embedding."
@@ -114,7 +115,6 @@ async def test_embedder() -> EmbeddingsBatch | None:
 
     except Exception as e:
         print(f"✗ Embedder test failed: {e}")
-        print("  Make sure Ollama is running with the nomic-embed-text model")
         return None
 
 
@@ -140,7 +140,9 @@ async def test_pipeline_integration() -> bool:
                 content_hash=chunk.content_hash,
                 chunk_index=chunk.chunk_index,
                 word_count_estimate=chunk.word_count_estimate,
-                embedding=embeddings.embeddings[i] if i < len(embeddings.embeddings) else None,
+                embedding=embeddings.embeddings[i]
+                if i < len(embeddings.embeddings)
+                else None,
             )
             embedded_chunks.append(embedded_chunk)
 
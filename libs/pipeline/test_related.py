@@ -0,0 +1,115 @@
+"""Tests for keeping the related-documents graph up to date incrementally."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.models.embeddings import EmbeddingMatrix
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary
+from libs.pipeline.related import RelatedDocumentsJob
+from libs.storage.repositories.related_documents import (
+    Neighbour,
+    RelatedDocumentRepository,
+)
+from libs.storage.tables.base import Base
+from libs.storage.tables.documents import Document as DocumentDB
+from libs.storage.tables.related import RelatedDocument as RelatedDocumentDB
+
+
+class Corpus:
+    """Stands in for DocumentRepository: one chunk per document."""
+
+    def __init__(self, vectors: NDArray[np.float32]) -> None:
+        self.vectors = {f"doc-{i}": vector for i, vector in enumerate(vectors)}
+        self.hashes = {document_id: "v1" for document_id in self.vectors}
+
+    def get_search_corpus(
+        self,
+    ) -> Tuple[Optional[EmbeddingMatrix], List[ChunkRecord], List[DocumentSummary]]:
+        ids = list(self.vectors)
+        matrix = EmbeddingMatrix(
+            vectors=np.stack([self.vectors[document_id] for document_id in ids]),
+            ids=ids,
+            embedding_model="test",
+            created_at=datetime.now(timezone.utc),
+        )
+        chunks = [
+            ChunkRecord(
+                id=document_id,
+                document_id=document_id,
+                content="text",
+                content_hash=self.hashes[document_id],
+                chunk_index=0,
+                word_count_estimate=1,
+            )
+            for document_id in ids
+        ]
+        return matrix, chunks, [DocumentSummary(id=document_id) for document_id in ids]
+
+    def get_document_centroids(self) -> Optional[EmbeddingMatrix]:
+        return None
+
+    def get_content_hashes(self) -> Dict[str, str]:
+        return dict(self.hashes)
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    for table in (DocumentDB.__tablename__, RelatedDocumentDB.__tablename__):
+        Base.metadata.tables[table].create(engine)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+
+
+def job(corpus: Corpus, session: Session) -> RelatedDocumentsJob:
+    repo: Any = corpus
+    return RelatedDocumentsJob(
+        repo, RelatedDocumentRepository(session), k=3, block_elements=16
+    )
+
+
+def related_ids(graph: Dict[str, Tuple[str, List[Neighbour]]]) -> Dict[str, List[str]]:
+    return {
+        document_id: [related_id for related_id, _ in neighbours]
+        for document_id, (_, neighbours) in graph.items()
+    }
+
+
+def test_incremental_run_matches_a_full_rebuild(session: Session) -> None:
+    rng = np.random.default_rng(7)
+    corpus = Corpus(rng.standard_normal((40, 8), dtype=np.float32))
+    first = job(corpus, session).run()
+    assert (first.documents, first.recomputed) == (40, 40)
+
+    # One note is rewritten, another deleted
+    corpus.vectors["doc-0"] = corpus.vectors["doc-1"] + 0.01
+    corpus.hashes["doc-0"] = "v2"
+    del corpus.vectors["doc-5"], corpus.hashes["doc-5"]
+    incremental = job(corpus, session).run()
+    assert incremental.removed == 1
+    assert incremental.recomputed < 39
+    graph = RelatedDocumentRepository(session).get_graph()
+    assert related_ids(graph)["doc-0"][0] == "doc-1"
+    assert graph["doc-0"][0] == "v2"
+
+    job(corpus, session).run(full=True)
+    assert related_ids(RelatedDocumentRepository(session).get_graph()) == (
+        related_ids(graph)
+    )
+
+
+def test_unchanged_corpus_recomputes_nothing(session: Session) -> None:
+    corpus = Corpus(np.eye(5, dtype=np.float32))
+    job(corpus, session).run()
+    assert job(corpus, session).run().recomputed == 0
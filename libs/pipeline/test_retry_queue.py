@@ -0,0 +1,55 @@
+"""Tests for re-queueing files whose chunks could not be embedded."""
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from libs.models.pipeline import FileEvent, FileEventType, PipelineConfig
+from libs.pipeline import pipeline
+from libs.pipeline.embedder import SimilarityCalculator
+from libs.pipeline.pipeline import DataPipeline
+
+
+def make_pipeline(max_file_retries: int = 2) -> DataPipeline:
+    config = PipelineConfig(
+        watch_directory=".",
+        max_file_retries=max_file_retries,
+        retry_base_delay=60.0,
+    )
+    # Never called: these tests do not embed anything
+    embedder: Any = object()
+    return DataPipeline(
+        config,
+        document_embedder=embedder,
+        similarity_calculator=SimilarityCalculator(),
+    )
+
+
+def test_successful_reprocess_clears_pending_retry() -> None:
+    async def run() -> DataPipeline:
+        data_pipeline = make_pipeline()
+        event = FileEvent(file_path=Path("note.md"), event_type=FileEventType.MODIFIED)
+        data_pipeline._schedule_retry(event)
+        assert Path("note.md") in data_pipeline.retry_queue
+
+        # The file was edited and went through before the retry fired
+        data_pipeline._processed(Path("note.md"))
+        for task in data_pipeline._retry_tasks:
+            task.cancel()
+        return data_pipeline
+
+    data_pipeline = asyncio.run(run())
+    assert data_pipeline.retry_queue == {}
+
+
+def test_failed_files_are_unique_and_bounded(monkeypatch: Any) -> None:
+    monkeypatch.setattr(pipeline, "MAX_FAILED_FILES", 3)
+    data_pipeline = make_pipeline(max_file_retries=0)
+    for name in ["a.md", "b.md", "a.md", "c.md", "d.md"]:
+        data_pipeline._schedule_retry(
+            FileEvent(file_path=Path(name), event_type=FileEventType.CREATED)
+        )
+    assert list(data_pipeline.failed_files) == ["a.md", "c.md", "d.md"]
+
+    data_pipeline._processed(Path("c.md"))
+    assert list(data_pipeline.failed_files) == ["a.md", "d.md"]
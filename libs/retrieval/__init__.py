@@ -0,0 +1,32 @@
+from .centroids import weighted_centroids
+from .context import ContextPassage, estimate_tokens, merge_overlap, pack_context
+from .facets import FacetIndex
+from .index import Candidates, VectorIndex
+from .links import LinkGraph
+from .mmr import MMRReranker, mmr_select
+from .neighbours import top_k_neighbours
+from .rerank import LexicalReranker, Reranker
+from .sharded import ShardedVectorIndex, shard_of
+from .snapshot import IndexSnapshot, read_snapshot, write_snapshot
+
+__all__ = [
+    "Candidates",
+    "VectorIndex",
+    "Reranker",
+    "LexicalReranker",
+    "MMRReranker",
+    "mmr_select",
+    "ContextPassage",
+    "estimate_tokens",
+    "merge_overlap",
+    "pack_context",
+    "weighted_centroids",
+    "FacetIndex",
+    "top_k_neighbours",
+    "LinkGraph",
+    "ShardedVectorIndex",
+    "shard_of",
+    "IndexSnapshot",
+    "read_snapshot",
+    "write_snapshot",
+]
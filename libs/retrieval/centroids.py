@@ -0,0 +1,33 @@
+"""Pooled document embeddings for coarse-to-fine search."""
+
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def weighted_centroids(
+    vectors: NDArray[np.float32],
+    groups: NDArray[np.integer[Any]],
+    weights: NDArray[np.float32],
+    n_groups: int,
+) -> NDArray[np.float32]:
+    """Unit-normalised weighted mean of the rows in each group.
+
+    `groups[i]` is the group of row `i`, in `[0, n_groups)`. Rows are sorted
+    by group once and summed with a single `np.add.reduceat`, so the cost is
+    one pass over `vectors`. Groups without rows get a zero vector.
+    """
+    centroids = np.zeros((n_groups, vectors.shape[1]), dtype=np.float32)
+    if len(vectors) == 0:
+        return centroids
+
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    weighted = vectors[order] * weights[order, np.newaxis].astype(np.float32)
+    centroids[sorted_groups[starts]] = np.add.reduceat(weighted, starts, axis=0)
+
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    np.divide(centroids, norms, out=centroids, where=norms > 0)
+    return centroids
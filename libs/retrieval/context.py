@@ -0,0 +1,148 @@
+"""Packing retrieved chunks into an LLM context window."""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from libs.models.Search import DocumentSummary, SearchHit
+
+# Rough English average; only used to stay under the model's context size
+CHARS_PER_TOKEN = 4.0
+# Shorter shared prefixes/suffixes are treated as coincidence, not chunk overlap
+MIN_OVERLAP_CHARS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def merge_overlap(left: str, right: str, max_overlap: int = 2000) -> str:
+    """Text of `right` not already covered by the end of `left`.
+
+    Chunks are cut with a character overlap, so consecutive windows of a
+    note repeat the same sentences. The longest suffix of `left` that is a
+    prefix of `right` (up to `max_overlap` characters) is dropped.
+    """
+    if right in left:
+        return ""
+    limit = min(len(left), len(right), max_overlap)
+    if limit < MIN_OVERLAP_CHARS:
+        return right
+
+    probe = right[:MIN_OVERLAP_CHARS]
+    position = left.find(probe, len(left) - limit)
+    while position != -1:
+        if right.startswith(left[position:]):
+            return right[len(left) - position :]
+        position = left.find(probe, position + 1)
+    return right
+
+
+@dataclass(slots=True)
+class ContextPassage:
+    """Contiguous text of one document, merged from consecutive chunks."""
+
+    document_id: str
+    document: Optional[DocumentSummary]
+    chunk_ids: List[str]
+    text: str
+    score: float
+    tokens: int = 0
+
+
+@dataclass(slots=True)
+class _DocumentSelection:
+    document: Optional[DocumentSummary]
+    rank: int
+    score: float
+    chunks: Dict[int, SearchHit] = field(default_factory=dict)
+
+
+def pack_context(
+    hits: Sequence[SearchHit],
+    token_budget: int,
+    max_overlap: int = 2000,
+    passage_overhead_tokens: int = 16,
+) -> List[ContextPassage]:
+    """Best hits that fit in `token_budget`, merged into passages.
+
+    Hits are taken greedily in rank order. Consecutive chunks of the same
+    document are joined into one passage with their overlapping text removed,
+    so a neighbouring chunk only costs the tokens it adds; identical chunk
+    texts are kept once. A hit that does not fit is skipped and smaller
+    later ones are still tried. Passages come back in the rank order of their
+    document's best hit, each charged `passage_overhead_tokens` for its
+    heading.
+    """
+    selections: Dict[str, _DocumentSelection] = {}
+    costs: Dict[str, int] = {}
+    seen_contents = set()
+    used = 0
+
+    for rank, hit in enumerate(hits):
+        if hit.content in seen_contents:
+            continue
+        selection = selections.get(hit.document_id)
+        candidate = _DocumentSelection(
+            document=hit.document,
+            rank=rank,
+            score=hit.score,
+        )
+        if selection is not None:
+            candidate.rank = selection.rank
+            candidate.score = selection.score
+            candidate.chunks.update(selection.chunks)
+        candidate.chunks[hit.chunk_index] = hit
+
+        cost = sum(
+            passage.tokens + passage_overhead_tokens
+            for passage in _passages(hit.document_id, candidate, max_overlap)
+        )
+        previous = costs.get(hit.document_id, 0)
+        if used - previous + cost > token_budget:
+            continue
+
+        selections[hit.document_id] = candidate
+        costs[hit.document_id] = cost
+        used += cost - previous
+        seen_contents.add(hit.content)
+
+    ordered = sorted(selections.items(), key=lambda item: item[1].rank)
+    return [
+        passage
+        for document_id, selection in ordered
+        for passage in _passages(document_id, selection, max_overlap)
+    ]
+
+
+def _passages(
+    document_id: str, selection: _DocumentSelection, max_overlap: int
+) -> List[ContextPassage]:
+    passages: List[ContextPassage] = []
+    previous_index: Optional[int] = None
+    for index in sorted(selection.chunks):
+        hit = selection.chunks[index]
+        if previous_index is not None and index == previous_index + 1:
+            passage = passages[-1]
+            addition = merge_overlap(passage.text, hit.content, max_overlap)
+            if addition == hit.content:
+                passage.text += "\n" + addition
+            elif addition:
+                passage.text += addition
+            passage.chunk_ids.append(hit.chunk_id)
+            passage.score = max(passage.score, hit.score)
+        else:
+            passages.append(
+                ContextPassage(
+                    document_id=document_id,
+                    document=selection.document,
+                    chunk_ids=[hit.chunk_id],
+                    text=hit.content,
+                    score=hit.score,
+                )
+            )
+        previous_index = index
+
+    for passage in passages:
+        passage.tokens = estimate_tokens(passage.text)
+    return passages
@@ -0,0 +1,187 @@
+"""Precomputed metadata facets for filtering before vector scoring."""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.models.Search import DocumentSummary, SearchFilters
+
+NOT_A_DATE = np.datetime64("NaT", "D")
+
+ScalarT = TypeVar("ScalarT", bound=np.generic)
+
+
+def facet_value(value: str) -> str:
+    """Facet values match case-insensitively and ignore surrounding spaces."""
+    return value.strip().casefold()
+
+
+class FacetIndex:
+    """Per-value document bitmaps and a date array for metadata filters.
+
+    Each value of author, category, document type, source and tag has a
+    boolean array over document positions, and creation dates are held as
+    one datetime64 array. A filter is then a handful of NumPy ORs, ANDs and
+    comparisons, evaluated before any vector is scored. Documents can be
+    added, replaced or removed one at a time; arrays grow by doubling.
+    """
+
+    FACETS = ("author", "category", "document_type", "source")
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._capacity = max(capacity, 1)
+        self._size = 0
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._created_on = np.full(self._capacity, NOT_A_DATE)
+        self._bitmaps: Dict[str, Dict[str, NDArray[np.bool_]]] = {
+            facet: {} for facet in (*self.FACETS, "tags")
+        }
+        self._positions: Dict[str, int] = {}
+        self._documents: List[Optional[DocumentSummary]] = []
+        self._paths: List[str] = []
+        self._path_array: Optional[NDArray[np.str_]] = None
+
+    @classmethod
+    def build(cls, documents: Iterable[DocumentSummary]) -> "FacetIndex":
+        documents = list(documents)
+        index = cls(capacity=len(documents))
+        for document in documents:
+            index.add(document)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, document: DocumentSummary) -> int:
+        """Index a new document at the next position, which is returned."""
+        if self._size == self._capacity:
+            self._grow()
+        position = self._size
+        self._size += 1
+        self._documents.append(None)
+        self._paths.append("")
+        self.update(position, document)
+        return position
+
+    def update(self, position: int, document: DocumentSummary) -> None:
+        """Replace the facets of the document at `position`."""
+        self._clear(position)
+        self._live[position] = True
+        self._documents[position] = document
+        self._positions[document.id] = position
+        for facet in self.FACETS:
+            value = getattr(document, facet)
+            if value:
+                self._bitmap(facet, value)[position] = True
+        for tag in document.tags:
+            self._bitmap("tags", tag)[position] = True
+        if document.created_on is not None:
+            self._created_on[position] = np.datetime64(document.created_on, "D")
+        self._paths[position] = document.file_path or ""
+        self._path_array = None
+
+    def remove(self, position: int) -> None:
+        """Exclude the document at `position` from every future mask."""
+        self._clear(position)
+
+    def mask(self, filters: SearchFilters) -> NDArray[np.bool_]:
+        """Boolean mask over document positions matching every set filter."""
+        size = self._size
+        mask = self._live[:size].copy()
+        for facet, values in (
+            ("author", filters.authors),
+            ("category", filters.categories),
+            ("document_type", filters.document_types),
+            ("source", filters.sources),
+            ("tags", filters.tags),
+        ):
+            if values is not None:
+                mask &= self._any_of(facet, values)
+
+        if filters.created_after is not None or filters.created_before is not None:
+            created_on = self._created_on[:size]
+            mask &= ~np.isnat(created_on)
+            if filters.created_after is not None:
+                mask &= created_on >= _day(filters.created_after)
+            if filters.created_before is not None:
+                mask &= created_on <= _day(filters.created_before)
+
+        if filters.document_ids is not None:
+            allowed = np.zeros(size, dtype=bool)
+            positions = [
+                self._positions[document_id]
+                for document_id in filters.document_ids
+                if document_id in self._positions
+            ]
+            allowed[positions] = True
+            mask &= allowed
+
+        if filters.path_prefix is not None:
+            if self._path_array is None:
+                self._path_array = np.array(self._paths, dtype=str)
+            mask &= np.char.startswith(self._path_array, filters.path_prefix)
+        return mask
+
+    def values(self, facet: str) -> Dict[str, int]:
+        """Document count per value of a facet, e.g. for filter suggestions."""
+        live = self._live[: self._size]
+        counts = {
+            value: int(np.count_nonzero(bitmap[: self._size] & live))
+            for value, bitmap in self._bitmaps[facet].items()
+        }
+        return {value: count for value, count in counts.items() if count}
+
+    def _any_of(self, facet: str, values: Iterable[str]) -> NDArray[np.bool_]:
+        result = np.zeros(self._size, dtype=bool)
+        bitmaps = self._bitmaps[facet]
+        for value in values:
+            bitmap = bitmaps.get(facet_value(value))
+            if bitmap is not None:
+                result |= bitmap[: self._size]
+        return result
+
+    def _bitmap(self, facet: str, value: str) -> NDArray[np.bool_]:
+        key = facet_value(value)
+        bitmap = self._bitmaps[facet].get(key)
+        if bitmap is None:
+            bitmap = np.zeros(self._capacity, dtype=bool)
+            self._bitmaps[facet][key] = bitmap
+        return bitmap
+
+    def _clear(self, position: int) -> None:
+        # Only the bitmaps of the previous document's values can be set here
+        previous = self._documents[position]
+        self._live[position] = False
+        self._created_on[position] = NOT_A_DATE
+        if previous is None:
+            return
+        self._documents[position] = None
+        if self._positions.get(previous.id) == position:
+            del self._positions[previous.id]
+        for facet in self.FACETS:
+            value = getattr(previous, facet)
+            if value:
+                self._bitmap(facet, value)[position] = False
+        for tag in previous.tags:
+            self._bitmap("tags", tag)[position] = False
+
+    def _grow(self) -> None:
+        capacity = self._capacity * 2
+        self._live = _resized(self._live, capacity, False)
+        self._created_on = _resized(self._created_on, capacity, NOT_A_DATE)
+        for bitmaps in self._bitmaps.values():
+            for value, bitmap in bitmaps.items():
+                bitmaps[value] = _resized(bitmap, capacity, False)
+        self._capacity = capacity
+
+
+def _resized(array: NDArray[ScalarT], capacity: int, fill: object) -> NDArray[ScalarT]:
+    resized = np.full(capacity, fill, dtype=array.dtype)
+    resized[: len(array)] = array
+    return resized
+
+
+def _day(value: date) -> np.datetime64:
+    return np.datetime64(value, "D")
@@ -0,0 +1,398 @@
+"""In-memory vector index over chunk embeddings."""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.models.embeddings import EmbeddingMatrix
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary, SearchFilters, SearchHit
+
+from .centroids import weighted_centroids
+from .facets import FacetIndex
+from .links import LinkGraph
+
+# Upper bound on query x row scores materialised at once (64 MiB of float32)
+SCORE_BLOCK_ELEMENTS = 1 << 24
+# Below this share of passing rows, scoring a gathered copy beats masking
+GATHER_FRACTION = 0.25
+
+
+@dataclass(slots=True)
+class Candidates:
+    """Index rows ranked best first, with their current scores."""
+
+    rows: NDArray[np.integer[Any]]
+    scores: NDArray[np.float32]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def head(self, k: int) -> "Candidates":
+        return Candidates(rows=self.rows[:k], scores=self.scores[:k])
+
+
+class VectorIndex:
+    """Exact cosine search over unit-normalised chunk embeddings.
+
+    Vectors are held in one (n, d) float32 block, so a query is a single
+    matrix-vector product followed by a partial sort for the top k. Metadata
+    filters are resolved per document with precomputed facet bitmaps and
+    broadcast to chunk rows through `row_documents`, the document position
+    of every row; only rows that pass are scored.
+
+    Every document also has a centroid, the length-weighted mean of its
+    chunk vectors, which `search_coarse` uses to score only the chunks of the
+    most similar documents. Stored centroids are used where given; the rest
+    are computed from the chunk vectors.
+
+    Links between notes are held as a `LinkGraph` over document positions,
+    which `search_linked` uses to add the best chunk of notes linked to or
+    from retrieved ones.
+    """
+
+    def __init__(
+        self,
+        matrix: EmbeddingMatrix,
+        chunks: Sequence[ChunkRecord],
+        documents: Sequence[DocumentSummary],
+        centroids: Optional[EmbeddingMatrix] = None,
+        links: Iterable[Tuple[str, str]] = (),
+        normalised: bool = False,
+    ) -> None:
+        if len(chunks) != len(matrix):
+            raise ValueError(
+                f"Got {len(chunks)} chunks for {len(matrix)} embedding rows"
+            )
+        self.embedding_model = matrix.embedding_model
+        # Already unit-length rows, e.g. a mapped snapshot, are used uncopied
+        self.vectors = matrix.vectors if normalised else matrix.normalised()
+        self.chunks: List[ChunkRecord] = list(chunks)
+        self.documents: List[DocumentSummary] = list(documents)
+        self._document_position: Dict[str, int] = {
+            document.id: i for i, document in enumerate(self.documents)
+        }
+        # Chunks without a known document point at a sentinel past the end
+        self.row_documents = np.fromiter(
+            (
+                self._document_position.get(chunk.document_id, len(self.documents))
+                for chunk in self.chunks
+            ),
+            dtype=np.int64,
+            count=len(self.chunks),
+        )
+        # Rows grouped by document: rows of document i are
+        # _rows_by_document[_document_starts[i]:_document_starts[i + 1]]
+        self._rows_by_document = np.argsort(self.row_documents, kind="stable")
+        self._document_starts = np.searchsorted(
+            self.row_documents[self._rows_by_document],
+            np.arange(len(self.documents) + 2),
+        )
+        self.centroids = self._document_centroids(centroids)
+        self.facets = FacetIndex.build(self.documents)
+        self.links = LinkGraph.build(self.documents, links)
+
+    @classmethod
+    def empty(cls, embedding_model: str = "", dimension: int = 0) -> "VectorIndex":
+        return cls(
+            EmbeddingMatrix(
+                vectors=np.zeros((0, dimension), dtype=np.float32),
+                ids=[],
+                embedding_model=embedding_model,
+                created_at=datetime.now(timezone.utc),
+            ),
+            chunks=[],
+            documents=[],
+        )
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.vectors.shape[1])
+
+    def document(self, document_id: str) -> Optional[DocumentSummary]:
+        position = self._document_position.get(document_id)
+        return self.documents[position] if position is not None else None
+
+    def document_position(self, document_id: str) -> Optional[int]:
+        return self._document_position.get(document_id)
+
+    def document_rows(self, position: int) -> NDArray[np.integer[Any]]:
+        """Rows of the chunks of the document at `position`."""
+        return self._rows_by_document[
+            self._document_starts[position] : self._document_starts[position + 1]
+        ]
+
+    def search(
+        self,
+        query: NDArray[np.float32],
+        top_k: int,
+        filters: Optional[SearchFilters] = None,
+    ) -> Candidates:
+        """Top `top_k` rows by cosine similarity among rows passing `filters`."""
+        if query.ndim != 1:
+            raise ValueError(f"Expected a single query vector, got shape {query.shape}")
+        return self.search_many(query[np.newaxis, :], top_k, filters)[0]
+
+    def search_many(
+        self,
+        queries: NDArray[np.float32],
+        top_k: int,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[Candidates]:
+        """`search` for each row of a (q, d) query block.
+
+        Queries are scored together with one matrix product per block of
+        rows, sized so the (rows, n) score block stays under
+        SCORE_BLOCK_ELEMENTS, and the top k of every row is selected with a
+        single partial sort along the row axis.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return [self._no_candidates() for _ in range(len(queries))]
+        if queries.ndim != 2 or queries.shape[1] != self.dimension:
+            raise ValueError(
+                f"Queries of shape {queries.shape} do not match index dimension "
+                f"{self.dimension}"
+            )
+
+        queries = queries.astype(np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1.0)
+
+        return self._score(queries, top_k, self.row_mask(filters))
+
+    def search_coarse(
+        self,
+        query: NDArray[np.float32],
+        top_k: int,
+        documents: int,
+        filters: Optional[SearchFilters] = None,
+    ) -> Candidates:
+        """`search` restricted to the chunks of the `documents` best documents.
+
+        Documents are ranked by centroid similarity, then only their chunks
+        are scored. This trades some recall for scanning a fraction of the
+        rows; see scripts/benchmark_search.py.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return self._no_candidates()
+        if query.shape != (self.dimension,):
+            raise ValueError(
+                f"Query of shape {query.shape} does not match index dimension "
+                f"{self.dimension}"
+            )
+
+        norm = np.linalg.norm(query)
+        query = query.astype(np.float32) / (norm if norm else 1.0)
+
+        document_scores = self.centroids @ query
+        allowed = np.diff(self._document_starts[:-1]) > 0
+        mask = self.document_mask(filters)
+        if mask is not None:
+            allowed &= mask
+        document_scores[~allowed] = -np.inf
+        selected = self.top_rows(
+            document_scores, min(documents, int(np.count_nonzero(allowed)))
+        ).rows
+        if len(selected) == 0:
+            return self._no_candidates()
+
+        rows = np.concatenate([self.document_rows(i) for i in selected])
+        top = self.top_rows(self.vectors[rows] @ query, min(top_k, len(rows)))
+        return Candidates(rows=rows[top.rows], scores=top.scores)
+
+    def search_linked(
+        self,
+        query: NDArray[np.float32],
+        documents: Sequence[str],
+        limit: int,
+        filters: Optional[SearchFilters] = None,
+    ) -> Tuple[Candidates, NDArray[np.int64]]:
+        """Best chunk of up to `limit` notes linked to or from `documents`.
+
+        Only the neighbours of the given documents in the link graph are
+        looked at and only their chunks scored, so the cost grows with the
+        documents' degree, not the index. Notes in `documents` and notes
+        excluded by `filters` are skipped. Returns the chunks best first and,
+        for each, the position of the first of `documents` it is linked with.
+        """
+        seeds = [
+            position
+            for position in map(self._document_position.get, documents)
+            if position is not None
+        ]
+        if len(self) == 0 or limit <= 0 or not seeds:
+            return self._no_candidates(), np.empty(0, np.int64)
+
+        linked: Dict[int, int] = {}
+        excluded = set(seeds)
+        for seed in seeds:
+            for neighbour in self.links.neighbours(seed).tolist():
+                if neighbour not in excluded:
+                    linked.setdefault(neighbour, seed)
+        mask = self.document_mask(filters)
+        candidates = [
+            document
+            for document in linked
+            if (mask is None or mask[document]) and len(self.document_rows(document))
+        ]
+        if not candidates:
+            return self._no_candidates(), np.empty(0, np.int64)
+
+        norm = np.linalg.norm(query)
+        query = query.astype(np.float32) / (norm if norm else 1.0)
+        document_rows = [self.document_rows(document) for document in candidates]
+        rows = np.concatenate(document_rows)
+        scores = self.vectors[rows] @ query
+        # Best chunk of each candidate document, then the best documents
+        starts = np.cumsum([0] + [len(found) for found in document_rows[:-1]])
+        best = np.array(
+            [
+                start + int(np.argmax(scores[start : start + len(found)]))
+                for start, found in zip(starts, document_rows)
+            ]
+        )
+        top = self.top_rows(scores[best], min(limit, len(best)))
+        picked = best[top.rows]
+        sources = np.array([linked[candidates[i]] for i in top.rows], dtype=np.int64)
+        return Candidates(rows=rows[picked], scores=top.scores), sources
+
+    def document_mask(
+        self, filters: Optional[SearchFilters]
+    ) -> Optional[NDArray[np.bool_]]:
+        """Boolean mask over documents, or None when nothing is filtered out."""
+        if filters is None or filters.is_empty():
+            return None
+        return self.facets.mask(filters)
+
+    def row_mask(self, filters: Optional[SearchFilters]) -> Optional[NDArray[np.bool_]]:
+        """Boolean mask over rows, or None when nothing is filtered out."""
+        allowed = self.document_mask(filters)
+        if allowed is None:
+            return None
+        return np.append(allowed, False)[self.row_documents]
+
+    @staticmethod
+    def top_rows(scores: NDArray[np.float32], k: int) -> Candidates:
+        return VectorIndex.top_rows_many(scores[np.newaxis, :], k)[0]
+
+    @staticmethod
+    def top_rows_many(scores: NDArray[np.float32], k: int) -> List[Candidates]:
+        """Best `k` columns of every row of a (q, n) score block, best first."""
+        if k <= 0:
+            return [VectorIndex._no_candidates() for _ in range(len(scores))]
+        if k < scores.shape[1]:
+            rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            rows = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        top = np.take_along_axis(scores, rows, axis=1)
+        order = np.argsort(-top, axis=1, kind="stable")
+        rows = np.take_along_axis(rows, order, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return [Candidates(rows=rows[i], scores=top[i]) for i in range(len(rows))]
+
+    def hit(self, row: int, score: float) -> SearchHit:
+        chunk = self.chunks[row]
+        return SearchHit(
+            chunk_id=chunk.id,
+            document_id=chunk.document_id,
+            chunk_index=chunk.chunk_index,
+            content=chunk.content,
+            content_hash=chunk.content_hash,
+            score=float(score),
+            document=self.document(chunk.document_id),
+        )
+
+    def _document_centroids(
+        self, stored: Optional[EmbeddingMatrix]
+    ) -> NDArray[np.float32]:
+        centroids: Optional[NDArray[np.float32]] = None
+        missing = np.ones(len(self.documents), dtype=bool)
+        if (
+            stored is not None
+            and stored.embedding_model == self.embedding_model
+            and stored.dimension == self.dimension
+        ):
+            centroids = np.zeros((len(self.documents), self.dimension), np.float32)
+            for document_id, vector in zip(stored.ids, stored.normalised()):
+                position = self._document_position.get(document_id)
+                if position is not None:
+                    centroids[position] = vector
+                    missing[position] = False
+        if centroids is not None and not missing.any():
+            return centroids
+
+        computed = weighted_centroids(
+            self.vectors,
+            self.row_documents,
+            np.fromiter(
+                (len(chunk.content) for chunk in self.chunks),
+                dtype=np.float32,
+                count=len(self.chunks),
+            ),
+            len(self.documents) + 1,
+        )[: len(self.documents)]
+        if centroids is not None:
+            computed[~missing] = centroids[~missing]
+        return computed
+
+    def _score(
+        self,
+        queries: NDArray[np.float32],
+        top_k: int,
+        mask: Optional[NDArray[np.bool_]],
+    ) -> List[Candidates]:
+        return score_rows(self.vectors, queries, top_k, mask)
+
+    @staticmethod
+    def _no_candidates() -> Candidates:
+        return Candidates(np.empty(0, np.int64), np.empty(0, np.float32))
+
+    def hits(self, candidates: Candidates) -> List[SearchHit]:
+        return [
+            self.hit(int(row), float(score))
+            for row, score in zip(candidates.rows, candidates.scores)
+        ]
+
+
+def score_rows(
+    vectors: NDArray[np.float32],
+    queries: NDArray[np.float32],
+    top_k: int,
+    mask: Optional[NDArray[np.bool_]] = None,
+) -> List[Candidates]:
+    """Top `top_k` rows of `vectors` for each normalised query, best first.
+
+    Rows outside `mask` are never returned. Queries are scored in blocks
+    that keep the score matrix under SCORE_BLOCK_ELEMENTS.
+    """
+    rows: Optional[NDArray[np.integer[Any]]] = None
+    available = len(vectors)
+    if mask is not None:
+        available = int(np.count_nonzero(mask))
+        if available <= GATHER_FRACTION * len(vectors):
+            # Selective filter: copy out and score only the passing rows
+            rows = np.flatnonzero(mask)
+            vectors = vectors[rows]
+            mask = None
+    k = min(top_k, available)
+    if k == 0:
+        return [VectorIndex._no_candidates() for _ in range(len(queries))]
+
+    block_rows = max(1, SCORE_BLOCK_ELEMENTS // len(vectors))
+    results: List[Candidates] = []
+    for start in range(0, len(queries), block_rows):
+        scores = queries[start : start + block_rows] @ vectors.T
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+        results.extend(VectorIndex.top_rows_many(scores, k))
+    if rows is not None:
+        results = [
+            Candidates(rows=rows[found.rows], scores=found.scores) for found in results
+        ]
+    return results
@@ -0,0 +1,86 @@
+"""Link and backlink adjacency between notes."""
+
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.models.Search import DocumentSummary
+from libs.utils.document_processor.content_parser import link_key
+
+
+def document_keys(document: DocumentSummary) -> Tuple[Optional[str], Optional[str]]:
+    """Link keys a document answers to: its file name and its title."""
+    file_key = (
+        link_key(PurePosixPath(document.file_path).name) if document.file_path else None
+    )
+    title_key = document.title.strip().casefold() if document.title else None
+    return file_key, title_key or None
+
+
+class LinkGraph:
+    """Resolved links between document positions, in both directions.
+
+    Edges are held as two compressed sparse row arrays, one sorted by source
+    (links) and one by target (backlinks), so the neighbours of a document
+    are one slice: O(degree) with no scans. Link targets are note names and
+    resolve to the document with that file name, or failing that that
+    title; unresolved links and self-links are dropped.
+    """
+
+    def __init__(
+        self, size: int, sources: NDArray[np.int64], targets: NDArray[np.int64]
+    ) -> None:
+        self.size = size
+        by_source = np.lexsort((targets, sources))
+        self._link_targets: NDArray[np.int64] = targets[by_source]
+        self._link_starts = np.searchsorted(sources[by_source], np.arange(size + 1))
+        by_target = np.lexsort((sources, targets))
+        self._backlink_sources: NDArray[np.int64] = sources[by_target]
+        self._backlink_starts = np.searchsorted(targets[by_target], np.arange(size + 1))
+
+    @classmethod
+    def build(
+        cls, documents: Sequence[DocumentSummary], links: Iterable[Tuple[str, str]]
+    ) -> "LinkGraph":
+        """Graph over `documents` from (source document id, target key) pairs."""
+        positions = {document.id: i for i, document in enumerate(documents)}
+        keys = [document_keys(document) for document in documents]
+        # File names take precedence over titles; the first document wins ties
+        resolved: Dict[str, int] = {}
+        for i, (file_key, _) in enumerate(keys):
+            if file_key is not None:
+                resolved.setdefault(file_key, i)
+        for i, (_, title_key) in enumerate(keys):
+            if title_key is not None:
+                resolved.setdefault(title_key, i)
+
+        edges = {
+            (positions[source_id], resolved[key])
+            for source_id, key in links
+            if source_id in positions
+            and key in resolved
+            and resolved[key] != positions[source_id]
+        }
+        pairs = np.array(sorted(edges), dtype=np.int64).reshape(-1, 2)
+        return cls(len(documents), pairs[:, 0], pairs[:, 1])
+
+    def __len__(self) -> int:
+        return len(self._link_targets)
+
+    def links(self, position: int) -> NDArray[np.int64]:
+        """Positions of the documents `position` links to."""
+        return self._link_targets[
+            self._link_starts[position] : self._link_starts[position + 1]
+        ]
+
+    def backlinks(self, position: int) -> NDArray[np.int64]:
+        """Positions of the documents linking to `position`."""
+        return self._backlink_sources[
+            self._backlink_starts[position] : self._backlink_starts[position + 1]
+        ]
+
+    def neighbours(self, position: int) -> NDArray[np.int64]:
+        """Documents linked to or from `position`, each once."""
+        return np.union1d(self.links(position), self.backlinks(position))
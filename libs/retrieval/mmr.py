@@ -0,0 +1,104 @@
+"""Maximal Marginal Relevance diversification of search candidates."""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .index import Candidates, VectorIndex
+from .rerank import Reranker
+
+
+def mmr_select(
+    vectors: NDArray[np.float32],
+    relevance: NDArray[np.float32],
+    k: int,
+    lambda_: float = 0.7,
+    groups: Optional[NDArray[np.integer[Any]]] = None,
+    max_per_group: Optional[int] = None,
+) -> NDArray[np.int64]:
+    """Positions of up to `k` rows picked greedily by MMR, in pick order.
+
+    Each step picks the row maximising
+    `lambda_ * relevance - (1 - lambda_) * max similarity to rows picked so
+    far`. `vectors` must be unit-normalised. The running maximum similarity
+    is updated with one matrix-vector product per pick, so the cost is
+    O(k * m * d) with no per-pair Python work. Once a group (e.g. a
+    document) has `max_per_group` picks, its remaining rows are excluded.
+    """
+    m = len(relevance)
+    k = min(k, m)
+    picked = np.empty(k, dtype=np.int64)
+    if k == 0:
+        return picked
+
+    max_similarity = np.full(m, -np.inf, dtype=np.float32)
+    available = np.ones(m, dtype=bool)
+    counts: Dict[int, int] = {}
+    redundancy_weight = 1.0 - lambda_
+
+    for step in range(k):
+        if step == 0:
+            scores = relevance.astype(np.float32, copy=True)
+        else:
+            scores = lambda_ * relevance - redundancy_weight * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        if not available[best]:
+            return picked[:step]
+
+        picked[step] = best
+        available[best] = False
+        np.maximum(max_similarity, vectors @ vectors[best], out=max_similarity)
+
+        if groups is not None and max_per_group is not None:
+            group = groups[best]
+            counts[group] = counts.get(group, 0) + 1
+            if counts[group] >= max_per_group:
+                available &= groups != group
+    return picked
+
+
+class MMRReranker(Reranker):
+    """Diversifies results so near-duplicate chunks do not crowd out others.
+
+    Overlapping chunk windows of one note tend to score almost identically,
+    filling the top k with the same passage. MMR trades relevance against
+    similarity to results already chosen (`lambda_` = 1 is plain relevance
+    order) and `max_per_document` caps chunks taken from one note. Returns at
+    most `top_k` candidates, so it should be the last stage.
+    """
+
+    name = "mmr"
+
+    def __init__(
+        self, lambda_: float = 0.7, max_per_document: Optional[int] = None
+    ) -> None:
+        if not 0.0 <= lambda_ <= 1.0:
+            raise ValueError("lambda_ must be between 0 and 1")
+        if max_per_document is not None and max_per_document < 1:
+            raise ValueError("max_per_document must be at least 1")
+        self.lambda_ = lambda_
+        self.max_per_document = max_per_document
+
+    def rerank(
+        self,
+        index: VectorIndex,
+        query: str,
+        query_vector: NDArray[np.float32],
+        candidates: Candidates,
+        top_k: int,
+    ) -> Candidates:
+        if len(candidates) == 0:
+            return candidates
+        picked = mmr_select(
+            index.vectors[candidates.rows],
+            candidates.scores,
+            top_k,
+            lambda_=self.lambda_,
+            groups=index.row_documents[candidates.rows],
+            max_per_group=self.max_per_document,
+        )
+        return Candidates(
+            rows=candidates.rows[picked], scores=candidates.scores[picked]
+        )
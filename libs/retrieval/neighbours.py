@@ -0,0 +1,70 @@
+"""Exact k-nearest-neighbour search in bounded-memory tiles."""
+
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .index import SCORE_BLOCK_ELEMENTS
+
+
+def top_k_neighbours(
+    queries: NDArray[np.float32],
+    vectors: NDArray[np.float32],
+    k: int,
+    exclude: Optional[NDArray[np.integer[Any]]] = None,
+    block_elements: int = SCORE_BLOCK_ELEMENTS,
+) -> Tuple[NDArray[np.int64], NDArray[np.float32]]:
+    """Rows of `vectors` most similar to each query, best first.
+
+    Both inputs must be unit-normalised. Similarities are computed one
+    (query block x vector tile) matrix product at a time, each holding at
+    most `block_elements` scores, and a running top k per query is merged
+    with every tile by a partial sort. `exclude[i]` is a row never returned
+    for query i, typically the query's own row.
+
+    Returns (rows, scores), both of shape (len(queries), k') with
+    k' = min(k, available rows).
+    """
+    n = len(vectors)
+    k = min(k, n - (1 if exclude is not None else 0))
+    if k <= 0 or len(queries) == 0:
+        return (
+            np.empty((len(queries), 0), dtype=np.int64),
+            np.empty((len(queries), 0), dtype=np.float32),
+        )
+
+    tile = min(n, block_elements)
+    block = max(1, block_elements // tile)
+    all_rows = np.empty((len(queries), k), dtype=np.int64)
+    all_scores = np.empty((len(queries), k), dtype=np.float32)
+
+    for start in range(0, len(queries), block):
+        query_block = queries[start : start + block]
+        size = len(query_block)
+        best_rows = np.empty((size, 0), dtype=np.int64)
+        best_scores = np.empty((size, 0), dtype=np.float32)
+
+        for tile_start in range(0, n, tile):
+            scores = query_block @ vectors[tile_start : tile_start + tile].T
+            if exclude is not None:
+                own = exclude[start : start + size] - tile_start
+                inside = (own >= 0) & (own < scores.shape[1])
+                scores[np.flatnonzero(inside), own[inside]] = -np.inf
+
+            rows = np.broadcast_to(
+                np.arange(tile_start, tile_start + scores.shape[1]), scores.shape
+            )
+            best_scores = np.hstack([best_scores, scores])
+            best_rows = np.hstack([best_rows, rows])
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        all_rows[start : start + size] = np.take_along_axis(best_rows, order, axis=1)
+        all_scores[start : start + size] = np.take_along_axis(
+            best_scores, order, axis=1
+        )
+    return all_rows, all_scores
@@ -0,0 +1,76 @@
+"""Re-ranking stages applied to first-stage vector search candidates."""
+
+import re
+from abc import ABC, abstractmethod
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .index import Candidates, VectorIndex
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Reranker(ABC):
+    """One optional stage after vector retrieval.
+
+    Stages receive more candidates than requested (see the search
+    oversampling setting) and return them re-ordered, best first. They may
+    be skipped when the request's latency budget runs out, so each stage
+    must only refine an already usable ranking.
+    """
+
+    name: str
+
+    @abstractmethod
+    def rerank(
+        self,
+        index: VectorIndex,
+        query: str,
+        query_vector: NDArray[np.float32],
+        candidates: Candidates,
+        top_k: int,
+    ) -> Candidates:
+        pass
+
+
+class LexicalReranker(Reranker):
+    """Boosts candidates containing the query's terms.
+
+    Dense embeddings can miss exact names, numbers and rare words. The score
+    becomes `cosine + weight * coverage`, where coverage is the fraction of
+    distinct query terms found in the chunk.
+    """
+
+    name = "lexical"
+
+    def __init__(self, weight: float = 0.1) -> None:
+        self.weight = weight
+
+    def rerank(
+        self,
+        index: VectorIndex,
+        query: str,
+        query_vector: NDArray[np.float32],
+        candidates: Candidates,
+        top_k: int,
+    ) -> Candidates:
+        terms = set(TOKEN_PATTERN.findall(query.lower()))
+        if not terms or len(candidates) == 0:
+            return candidates
+
+        coverage = np.fromiter(
+            (
+                len(
+                    terms
+                    & set(TOKEN_PATTERN.findall(index.chunks[row].content.lower()))
+                )
+                / len(terms)
+                for row in candidates.rows
+            ),
+            dtype=np.float32,
+            count=len(candidates),
+        )
+        scores = candidates.scores + self.weight * coverage
+        order = np.argsort(-scores, kind="stable")
+        return Candidates(rows=candidates.rows[order], scores=scores[order])
@@ -0,0 +1,215 @@
+"""Vector index whose scoring is spread over worker processes."""
+
+import hashlib
+import os
+import tempfile
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.models.embeddings import EmbeddingMatrix
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary
+
+from .index import Candidates, VectorIndex, score_rows
+
+# tmpfs where available, so the vector block lives in memory, not on disk
+SHARED_DIRECTORY = "/dev/shm" if os.path.isdir("/dev/shm") else None
+# Vector blocks a worker keeps open; older ones belong to replaced indexes
+WORKER_OPEN_BLOCKS = 2
+# Vector block files are named after the process that owns them
+BLOCK_PREFIX = "zk-index-"
+
+_open_blocks: "OrderedDict[str, NDArray[np.float32]]" = OrderedDict()
+
+
+def shard_of(document_id: str, shards: int) -> int:
+    """Shard of a document, stable across processes and restarts."""
+    digest = hashlib.blake2b(document_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % shards
+
+
+class ShardedVectorIndex(VectorIndex):
+    """`VectorIndex` whose searches are scattered over worker processes.
+
+    Documents are assigned to `shards` partitions by a hash of their id and
+    rows are reordered so each shard is a contiguous slice. The normalised
+    vectors are written once to a memory-mapped file on tmpfs that every
+    worker maps read-only, so shards share the same physical pages and no
+    vectors are copied per query. A search sends the query block to every
+    shard through `executor`, each worker returns its own top k, and the
+    results are merged with one partial sort.
+
+    Everything else, including filters, coarse search, link expansion and
+    re-ranking, reads the same mapped vectors in this process. The
+    executor's workers must not share this process's interpreter lock,
+    e.g. a `ProcessPoolExecutor` with one worker per shard.
+    """
+
+    def __init__(
+        self,
+        matrix: EmbeddingMatrix,
+        chunks: Sequence[ChunkRecord],
+        documents: Sequence[DocumentSummary],
+        executor: Executor,
+        shards: int,
+        centroids: Optional[EmbeddingMatrix] = None,
+        links: Iterable[Tuple[str, str]] = (),
+    ) -> None:
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if len(chunks) != len(matrix):
+            raise ValueError(
+                f"Got {len(chunks)} chunks for {len(matrix)} embedding rows"
+            )
+        chunk_shards = np.fromiter(
+            (shard_of(chunk.document_id, shards) for chunk in chunks),
+            dtype=np.int64,
+            count=len(chunks),
+        )
+        order = np.argsort(chunk_shards, kind="stable")
+        matrix = EmbeddingMatrix(
+            vectors=matrix.vectors[order],
+            ids=[matrix.ids[i] for i in order],
+            embedding_model=matrix.embedding_model,
+            created_at=matrix.created_at,
+        )
+        super().__init__(
+            matrix,
+            [chunks[i] for i in order],
+            documents,
+            centroids=centroids,
+            links=links,
+        )
+
+        self.executor = executor
+        self.shard_starts = np.searchsorted(chunk_shards[order], np.arange(shards + 1))
+        self.path = self._share(self.vectors)
+        self.vectors = np.memmap(
+            self.path, dtype=np.float32, mode="r", shape=self.vectors.shape
+        )
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    @property
+    def shards(self) -> int:
+        return len(self.shard_starts) - 1
+
+    def close(self) -> None:
+        """Delete the shared vector file now rather than when collected."""
+        self._finalizer()
+
+    def _score(
+        self,
+        queries: NDArray[np.float32],
+        top_k: int,
+        mask: Optional[NDArray[np.bool_]],
+    ) -> List[Candidates]:
+        futures = [
+            self.executor.submit(
+                _search_shard,
+                self.path,
+                self.vectors.shape,
+                int(start),
+                int(stop),
+                queries,
+                top_k,
+                mask[start:stop] if mask is not None else None,
+            )
+            for start, stop in zip(self.shard_starts[:-1], self.shard_starts[1:])
+            if stop > start
+        ]
+        found = [future.result() for future in futures]
+        rows = np.hstack([shard_rows for shard_rows, _ in found])
+        scores = np.hstack([shard_scores for _, shard_scores in found])
+        return [
+            Candidates(rows=rows[i, top.rows], scores=top.scores)
+            for i, top in enumerate(self.top_rows_many(scores, top_k))
+        ]
+
+    @staticmethod
+    def _share(vectors: NDArray[np.float32]) -> str:
+        directory = SHARED_DIRECTORY or tempfile.gettempdir()
+        remove_stale_blocks(directory)
+        descriptor, path = tempfile.mkstemp(
+            prefix=f"{BLOCK_PREFIX}{os.getpid()}-", suffix=".f32", dir=directory
+        )
+        os.close(descriptor)
+        shared = np.memmap(path, dtype=np.float32, mode="w+", shape=vectors.shape)
+        shared[:] = vectors
+        shared.flush()
+        del shared
+        return path
+
+
+def remove_stale_blocks(directory: str) -> int:
+    """Delete vector blocks left behind by processes that no longer run.
+
+    A block is normally removed when its index is closed or collected, but
+    not when the owning process is killed, and tmpfs keeps it in memory
+    until reboot. Returns the number of files removed.
+    """
+    removed = 0
+    for entry in os.scandir(directory):
+        if not (entry.name.startswith(BLOCK_PREFIX) and entry.name.endswith(".f32")):
+            continue
+        owner = entry.name[len(BLOCK_PREFIX) :].split("-", 1)[0]
+        if not owner.isdigit() or _is_running(int(owner)):
+            continue
+        _remove(entry.path)
+        removed += 1
+    return removed
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+
+def _search_shard(
+    path: str,
+    shape: Tuple[int, int],
+    start: int,
+    stop: int,
+    queries: NDArray[np.float32],
+    top_k: int,
+    mask: Optional[NDArray[np.bool_]],
+) -> Tuple[NDArray[np.int64], NDArray[np.float32]]:
+    """Top k of one shard for each query as (rows, scores), in a worker."""
+    vectors = _open_block(path, shape)[start:stop]
+    found = score_rows(vectors, queries, top_k, mask)
+    k = min((len(candidates) for candidates in found), default=0)
+    rows = np.empty((len(found), k), dtype=np.int64)
+    scores = np.empty((len(found), k), dtype=np.float32)
+    for i, candidates in enumerate(found):
+        rows[i] = candidates.rows[:k] + start
+        scores[i] = candidates.scores[:k]
+    return rows, scores
+
+
+def _open_block(path: str, shape: Tuple[int, int]) -> NDArray[np.float32]:
+    vectors = _open_blocks.get(path)
+    if vectors is None:
+        vectors = np.memmap(path, dtype=np.float32, mode="r", shape=shape)
+        _open_blocks[path] = vectors
+        while len(_open_blocks) > WORKER_OPEN_BLOCKS:
+            _open_blocks.popitem(last=False)
+    else:
+        _open_blocks.move_to_end(path)
+    return vectors
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
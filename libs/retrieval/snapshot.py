@@ -0,0 +1,322 @@
+"""Memory-mapped snapshots of the search index.
+
+A snapshot is one file:
+
+    magic (8 bytes) | header length (uint64 LE) | JSON header | sections
+
+The header names the embedding model, the shape of the vectors and the
+corpus fingerprint the snapshot was built from, and gives the offset and
+length of every section, each aligned to 64 bytes:
+
+- vectors: unit-normalised chunk embeddings, (rows, dimension) float32
+- centroids: document centroids, (documents, dimension) float32
+- chunks: JSON table of chunk ids, document ids and texts, in row order
+- documents: JSON document metadata, the source of the facet index
+- links: JSON (source document id, target key) pairs
+
+The float32 blocks are opened with `np.memmap`, so loading does not read
+the vectors at all and processes mapping the same file share its pages.
+Loading is still linear in the corpus: the chunk, document and link
+tables are decoded, and the index built from them regroups rows by
+document and rebuilds its facet bitmaps and link graph.
+Snapshots are written to a temporary file and renamed over the old one,
+so readers only ever see complete snapshots and a file can be copied to
+another node as is.
+"""
+
+import json
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.models.embeddings import EmbeddingMatrix
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary
+
+from .index import VectorIndex
+
+loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is not built for PyPy
+    loads = json.loads
+
+MAGIC = b"ZKINDEX1"
+ALIGNMENT = 64
+_LENGTH = struct.Struct("<Q")
+
+
+class SnapshotError(ValueError):
+    """The file is not a readable index snapshot."""
+
+
+class StaleSnapshotError(SnapshotError):
+    """The snapshot was built from a different corpus than expected."""
+
+
+def snapshot_fingerprint(fingerprint: Sequence[object]) -> List[Optional[str]]:
+    """Corpus fingerprint in the JSON-safe form stored in snapshot headers."""
+    return [None if value is None else str(value) for value in fingerprint]
+
+
+@dataclass(slots=True)
+class IndexSnapshot:
+    """Everything a VectorIndex is built from, with unit-length vectors."""
+
+    matrix: EmbeddingMatrix
+    chunks: List[ChunkRecord]
+    documents: List[DocumentSummary]
+    centroids: EmbeddingMatrix
+    links: List[Tuple[str, str]]
+    fingerprint: List[Optional[str]]
+
+    @classmethod
+    def from_index(
+        cls,
+        index: VectorIndex,
+        links: Sequence[Tuple[str, str]],
+        fingerprint: Sequence[object],
+    ) -> "IndexSnapshot":
+        created_at = datetime.now(timezone.utc)
+        return cls(
+            matrix=EmbeddingMatrix(
+                vectors=index.vectors,
+                ids=[chunk.id for chunk in index.chunks],
+                embedding_model=index.embedding_model,
+                created_at=created_at,
+            ),
+            chunks=index.chunks,
+            documents=index.documents,
+            centroids=EmbeddingMatrix(
+                vectors=index.centroids,
+                ids=[document.id for document in index.documents],
+                embedding_model=index.embedding_model,
+                created_at=created_at,
+            ),
+            links=list(links),
+            fingerprint=snapshot_fingerprint(fingerprint),
+        )
+
+    def to_index(self) -> VectorIndex:
+        return VectorIndex(
+            self.matrix,
+            self.chunks,
+            self.documents,
+            centroids=self.centroids,
+            links=self.links,
+            normalised=True,
+        )
+
+
+def write_snapshot(path: Union[str, Path], snapshot: IndexSnapshot) -> None:
+    """Write `snapshot` to `path`, atomically replacing any previous one."""
+    path = Path(path)
+    sections: Dict[str, Union[bytes, NDArray[np.float32]]] = {
+        "vectors": _float32(snapshot.matrix.vectors),
+        "centroids": _float32(snapshot.centroids.vectors),
+        "chunks": _json_bytes(
+            [
+                [
+                    chunk.id,
+                    chunk.document_id,
+                    chunk.chunk_index,
+                    chunk.content_hash,
+                    chunk.word_count_estimate,
+                    chunk.content,
+                ]
+                for chunk in snapshot.chunks
+            ]
+        ),
+        "documents": _json_bytes(
+            [document.model_dump(mode="json") for document in snapshot.documents]
+        ),
+        "links": _json_bytes(snapshot.links),
+    }
+    header: Dict[str, Any] = {
+        "embedding_model": snapshot.matrix.embedding_model,
+        "created_at": snapshot.matrix.created_at.isoformat(),
+        "rows": len(snapshot.matrix),
+        "dimension": snapshot.matrix.dimension,
+        "documents": len(snapshot.centroids),
+        "fingerprint": snapshot.fingerprint,
+    }
+
+    # Offsets depend on the header length, which depends on the offsets;
+    # sizing the header with placeholder offsets first settles both
+    header["sections"] = {name: [0, 0] for name in sections}
+    reserved = len(_json_bytes(header)) + 64 * len(sections)
+    offset = _aligned(len(MAGIC) + _LENGTH.size + reserved)
+    for name, data in sections.items():
+        length = data.nbytes if isinstance(data, np.ndarray) else len(data)
+        header["sections"][name] = [offset, length]
+        offset = _aligned(offset + length)
+    header_bytes = _json_bytes(header)
+    if len(header_bytes) > reserved:
+        raise ValueError(
+            f"Snapshot header of {len(header_bytes)} bytes overflows the "
+            f"{reserved} reserved for it"
+        )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(MAGIC)
+            file.write(_LENGTH.pack(len(header_bytes)))
+            file.write(header_bytes)
+            for name, data in sections.items():
+                file.seek(header["sections"][name][0])
+                file.write(memoryview(data))
+            file.truncate(offset)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    _fsync_directory(path.parent)
+
+
+def read_snapshot_header(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, "rb") as file:
+        return _read_header(file, path)
+
+
+def read_snapshot(
+    path: Union[str, Path], fingerprint: Optional[Sequence[object]] = None
+) -> IndexSnapshot:
+    """Open a snapshot, mapping its vectors and centroids read-only.
+
+    Everything is read through one open file, so a snapshot renamed over
+    `path` meanwhile cannot mix into the result. With `fingerprint`, a
+    snapshot of another corpus raises `StaleSnapshotError` before any of
+    it is decoded.
+    """
+    with open(path, "rb") as file:
+        header = _read_header(file, path)
+        if (
+            fingerprint is not None
+            and header["fingerprint"] != snapshot_fingerprint(fingerprint)
+        ):
+            raise StaleSnapshotError(f"{path} was built from another corpus")
+
+        def section(name: str) -> bytes:
+            offset, length = header["sections"][name]
+            file.seek(offset)
+            return file.read(length)
+
+        chunks = [
+            ChunkRecord(
+                id=chunk_id,
+                document_id=document_id,
+                content=content,
+                content_hash=content_hash,
+                chunk_index=chunk_index,
+                word_count_estimate=word_count_estimate,
+            )
+            for (
+                chunk_id,
+                document_id,
+                chunk_index,
+                content_hash,
+                word_count_estimate,
+                content,
+            ) in loads(section("chunks"))
+        ]
+        documents = [
+            DocumentSummary.model_validate(document)
+            for document in loads(section("documents"))
+        ]
+        links = [(source, target) for source, target in loads(section("links"))]
+        vectors = _mapped(file, path, header, "vectors", header["rows"])
+        centroids = _mapped(file, path, header, "centroids", header["documents"])
+
+    created_at = datetime.fromisoformat(header["created_at"])
+    model = header["embedding_model"]
+    return IndexSnapshot(
+        matrix=EmbeddingMatrix(
+            vectors=vectors,
+            ids=[chunk.id for chunk in chunks],
+            embedding_model=model,
+            created_at=created_at,
+        ),
+        chunks=chunks,
+        documents=documents,
+        centroids=EmbeddingMatrix(
+            vectors=centroids,
+            ids=[document.id for document in documents],
+            embedding_model=model,
+            created_at=created_at,
+        ),
+        links=links,
+        fingerprint=header["fingerprint"],
+    )
+
+
+def _read_header(file: BinaryIO, path: Union[str, Path]) -> Dict[str, Any]:
+    if file.read(len(MAGIC)) != MAGIC:
+        raise SnapshotError(f"{path} is not an index snapshot")
+    (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+    header: Dict[str, Any] = loads(file.read(length))
+    return header
+
+
+def _mapped(
+    file: BinaryIO,
+    path: Union[str, Path],
+    header: Dict[str, Any],
+    name: str,
+    rows: int,
+) -> NDArray[np.float32]:
+    offset, length = header["sections"][name]
+    shape = (rows, header["dimension"])
+    if length != rows * header["dimension"] * 4:
+        raise SnapshotError(f"Section {name} of {path} does not match {shape}")
+    if length == 0:
+        return np.zeros(shape, dtype=np.float32)
+    # The mapping outlives the file object, which may be closed afterwards
+    return np.memmap(file, dtype=np.float32, mode="r", offset=offset, shape=shape)
+
+
+def _float32(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    return np.ascontiguousarray(vectors, dtype="<f4")
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,68 @@
+"""Tests for metadata filtering with precomputed facet bitmaps."""
+
+from datetime import date
+from typing import List
+
+from libs.models.Search import DocumentSummary, SearchFilters
+from libs.retrieval.facets import FacetIndex
+
+DOCUMENTS = [
+    DocumentSummary(
+        id="a",
+        file_path="notes/zettel.md",
+        author="Luhmann",
+        category="Method",
+        tags=["zettelkasten", "Writing"],
+        created_on=date(2024, 1, 10),
+    ),
+    DocumentSummary(
+        id="b",
+        file_path="notes/para.md",
+        author="Forte",
+        category="method",
+        tags=["organisation"],
+        created_on=date(2024, 6, 1),
+    ),
+    DocumentSummary(id="c", file_path="journal/today.md", tags=["writing"]),
+]
+
+
+def matching(index: FacetIndex, filters: SearchFilters) -> List[str]:
+    return [DOCUMENTS[i].id for i in index.mask(filters).nonzero()[0]]
+
+
+def test_list_filters_match_any_value_ignoring_case() -> None:
+    index = FacetIndex.build(DOCUMENTS)
+    assert matching(index, SearchFilters(tags=["WRITING"])) == ["a", "c"]
+    assert matching(index, SearchFilters(authors=[" forte", "nobody"])) == ["b"]
+    assert matching(index, SearchFilters(categories=["METHOD"])) == ["a", "b"]
+    assert index.values("category") == {"method": 2}
+
+
+def test_filters_combine_with_and() -> None:
+    index = FacetIndex.build(DOCUMENTS)
+    filters = SearchFilters(tags=["writing"], path_prefix="notes/")
+    assert matching(index, filters) == ["a"]
+    assert matching(index, SearchFilters(document_ids=["c", "missing"])) == ["c"]
+
+
+def test_date_range_skips_undated_documents() -> None:
+    index = FacetIndex.build(DOCUMENTS)
+    assert matching(index, SearchFilters(created_after=date(2024, 1, 1))) == [
+        "a",
+        "b",
+    ]
+    assert matching(index, SearchFilters(created_before=date(2024, 3, 1))) == ["a"]
+
+
+def test_update_and_remove_change_later_masks() -> None:
+    index = FacetIndex(capacity=1)
+    for document in DOCUMENTS:
+        index.add(document)
+    assert len(index) == 3
+
+    index.update(0, DOCUMENTS[0].model_copy(update={"tags": ["archive"]}))
+    assert matching(index, SearchFilters(tags=["writing"])) == ["c"]
+    index.remove(2)
+    assert matching(index, SearchFilters(tags=["writing"])) == []
+    assert index.values("tags") == {"archive": 1, "organisation": 1}
@@ -0,0 +1,49 @@
+"""Tests for Maximal Marginal Relevance diversification."""
+
+from typing import List
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from libs.retrieval.mmr import MMRReranker, mmr_select
+
+
+def unit_rows(*rows: List[float]) -> NDArray[np.float32]:
+    vectors = np.array(rows, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+VECTORS = unit_rows([1, 0, 0], [1, 0.05, 0], [0, 1, 0], [0, 0, 1])
+RELEVANCE = np.array([1.0, 0.99, 0.8, 0.5], dtype=np.float32)
+
+
+def test_lambda_one_is_plain_relevance_order() -> None:
+    picked = mmr_select(VECTORS, RELEVANCE, 3, lambda_=1.0)
+    assert picked.tolist() == [0, 1, 2]
+
+
+def test_near_duplicate_is_passed_over() -> None:
+    picked = mmr_select(VECTORS, RELEVANCE, 3, lambda_=0.5)
+    assert picked.tolist() == [0, 2, 3]
+
+
+def test_group_cap_excludes_the_rest_of_a_group() -> None:
+    groups = np.array([0, 0, 0, 1])
+    picked = mmr_select(
+        VECTORS, RELEVANCE, 4, lambda_=1.0, groups=groups, max_per_group=2
+    )
+    assert picked.tolist() == [0, 1, 3]
+
+
+def test_k_is_clipped_to_the_candidates() -> None:
+    assert mmr_select(VECTORS, RELEVANCE, 0).tolist() == []
+    assert len(mmr_select(VECTORS, RELEVANCE, 10)) == 4
+
+
+def test_reranker_rejects_invalid_settings() -> None:
+    with pytest.raises(ValueError):
+        MMRReranker(lambda_=1.5)
+    with pytest.raises(ValueError):
+        MMRReranker(max_per_document=0)
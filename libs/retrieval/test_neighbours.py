@@ -0,0 +1,37 @@
+"""Tests for exact k-nearest-neighbour search in bounded tiles."""
+
+import numpy as np
+from numpy.typing import NDArray
+
+from libs.retrieval.neighbours import top_k_neighbours
+
+
+def random_unit_rows(n: int, d: int, seed: int = 0) -> NDArray[np.float32]:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, d), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def test_tiled_search_matches_brute_force() -> None:
+    vectors = random_unit_rows(50, 8)
+    own = np.arange(50)
+    scores = vectors @ vectors.T
+    scores[own, own] = -np.inf
+    expected = np.argsort(-scores, axis=1, kind="stable")[:, :5]
+
+    # Tiles far smaller than the corpus exercise the running top-k merge
+    rows, found = top_k_neighbours(vectors, vectors, 5, exclude=own, block_elements=7)
+    assert np.array_equal(rows, expected)
+    assert np.allclose(found, np.take_along_axis(scores, expected, axis=1))
+    assert np.all(np.diff(found, axis=1) <= 0)
+
+
+def test_k_is_clipped_to_the_other_rows() -> None:
+    vectors = random_unit_rows(3, 4)
+    rows, scores = top_k_neighbours(vectors, vectors, 10, exclude=np.arange(3))
+    assert rows.shape == scores.shape == (3, 2)
+    assert all(i not in rows[i] for i in range(3))
+
+    rows, _ = top_k_neighbours(vectors[:0], vectors, 10)
+    assert rows.shape == (0, 0)
@@ -0,0 +1,87 @@
+"""Tests for the vector index whose scoring is spread over shards."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from libs.models.embeddings import EmbeddingMatrix
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary, SearchFilters
+from libs.retrieval import sharded
+from libs.retrieval.index import Candidates, VectorIndex
+from libs.retrieval.sharded import ShardedVectorIndex, remove_stale_blocks
+
+
+@pytest.fixture
+def executor() -> Iterator[ThreadPoolExecutor]:
+    # Threads suffice here: the worker function only needs a path and rows
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        yield executor
+
+
+def corpus(
+    documents: int = 12, chunks_per_document: int = 4
+) -> Tuple[EmbeddingMatrix, List[ChunkRecord], List[DocumentSummary]]:
+    rng = np.random.default_rng(3)
+    chunks = [
+        ChunkRecord(
+            id=f"doc-{i}-{j}",
+            document_id=f"doc-{i}",
+            content="text",
+            content_hash=f"{i}-{j}",
+            chunk_index=j,
+            word_count_estimate=1,
+        )
+        for i in range(documents)
+        for j in range(chunks_per_document)
+    ]
+    matrix = EmbeddingMatrix(
+        vectors=rng.standard_normal((len(chunks), 8), dtype=np.float32),
+        ids=[chunk.id for chunk in chunks],
+        embedding_model="test",
+        created_at=datetime.now(timezone.utc),
+    )
+    summaries = [
+        DocumentSummary(id=f"doc-{i}", tags=["even" if i % 2 == 0 else "odd"])
+        for i in range(documents)
+    ]
+    return matrix, chunks, summaries
+
+
+def chunk_ids(index: VectorIndex, found: Candidates) -> List[str]:
+    return [index.chunks[row].id for row in found.rows]
+
+
+def test_sharded_search_matches_flat_search(executor: ThreadPoolExecutor) -> None:
+    matrix, chunks, documents = corpus()
+    flat = VectorIndex(matrix, chunks, documents)
+    index = ShardedVectorIndex(matrix, chunks, documents, executor, shards=3)
+    try:
+        queries = np.random.default_rng(5).standard_normal((4, 8), dtype=np.float32)
+        for filters in (None, SearchFilters(tags=["odd"])):
+            expected = flat.search_many(queries, 7, filters)
+            for want, got in zip(expected, index.search_many(queries, 7, filters)):
+                assert chunk_ids(index, got) == chunk_ids(flat, want)
+                assert np.allclose(got.scores, want.scores)
+    finally:
+        index.close()
+    assert not os.path.exists(index.path)
+
+
+def test_blocks_of_exited_processes_are_removed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(sharded, "_is_running", lambda pid: pid == os.getpid())
+    own = tmp_path / f"zk-index-{os.getpid()}-abc.f32"
+    stale = tmp_path / "zk-index-1-def.f32"
+    unrelated = tmp_path / "zk-index-notes.txt"
+    for path in (own, stale, unrelated):
+        path.touch()
+
+    assert remove_stale_blocks(str(tmp_path)) == 1
+    assert own.exists() and unrelated.exists() and not stale.exists()
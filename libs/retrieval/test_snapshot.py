@@ -0,0 +1,86 @@
+"""Tests for memory-mapped search index snapshots."""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from libs.models.embeddings import EmbeddingMatrix
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary
+from libs.retrieval.index import VectorIndex
+from libs.retrieval.snapshot import (
+    IndexSnapshot,
+    SnapshotError,
+    StaleSnapshotError,
+    read_snapshot,
+    read_snapshot_header,
+    write_snapshot,
+)
+
+FINGERPRINT = (3, datetime(2026, 1, 1, tzinfo=timezone.utc))
+LINKS = [("a", "b")]
+
+
+def index() -> VectorIndex:
+    chunks = [
+        ChunkRecord(
+            id=f"{document_id}-{i}",
+            document_id=document_id,
+            content=f"Chunk {i} of {document_id} ✓",
+            content_hash=f"{document_id}{i}",
+            chunk_index=i,
+            word_count_estimate=4,
+        )
+        for document_id in ("a", "b")
+        for i in range(2)
+    ]
+    matrix = EmbeddingMatrix(
+        vectors=np.random.default_rng(1).standard_normal((4, 6), dtype=np.float32),
+        ids=[chunk.id for chunk in chunks],
+        embedding_model="test",
+        created_at=datetime.now(timezone.utc),
+    )
+    documents = [
+        DocumentSummary(id="a", title="Zettel", tags=["method"]),
+        DocumentSummary(id="b", file_path="notes/b.md"),
+    ]
+    return VectorIndex(matrix, chunks, documents, links=LINKS)
+
+
+def test_round_trip_restores_the_index(tmp_path: Path) -> None:
+    original = index()
+    path = tmp_path / "index.snapshot"
+    write_snapshot(path, IndexSnapshot.from_index(original, LINKS, FINGERPRINT))
+
+    snapshot = read_snapshot(path, FINGERPRINT)
+    # Mapped from the file rather than read into memory
+    assert isinstance(snapshot.matrix.vectors.base, np.memmap)
+    assert np.array_equal(snapshot.matrix.vectors, original.vectors)
+    assert np.array_equal(snapshot.centroids.vectors, original.centroids)
+    assert snapshot.chunks == original.chunks
+    assert snapshot.documents == original.documents
+    assert snapshot.links == LINKS
+
+    restored = snapshot.to_index()
+    query = original.vectors[2]
+    assert np.array_equal(
+        restored.search(query, 3).rows, original.search(query, 3).rows
+    )
+
+
+def test_snapshot_of_another_corpus_is_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "index.snapshot"
+    write_snapshot(path, IndexSnapshot.from_index(index(), LINKS, FINGERPRINT))
+
+    assert read_snapshot_header(path)["fingerprint"] == ["3", str(FINGERPRINT[1])]
+    with pytest.raises(StaleSnapshotError):
+        read_snapshot(path, (4, FINGERPRINT[1]))
+
+
+def test_other_files_are_not_read_as_snapshots(tmp_path: Path) -> None:
+    path = tmp_path / "index.snapshot"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
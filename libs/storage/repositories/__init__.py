@@ -1,4 +1,11 @@
+from .answer_cache import AnswerCacheRepository
 from .document import DocumentRepository
+from .related_documents import RelatedDocumentRepository
 from .user import UserRepository
 
-__all__ = ["UserRepository", "DocumentRepository"]
+__all__ = [
+    "UserRepository",
+    "DocumentRepository",
+    "AnswerCacheRepository",
+    "RelatedDocumentRepository",
+]
@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from libs.models.Answer import StoredAnswer
+from libs.storage.tables.answers import CachedAnswer as CachedAnswerDB
+
+
+class AnswerCacheRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, key: str) -> Optional[StoredAnswer]:
+        """Stored answer for `key`, marking it as recently used."""
+        try:
+            entry = self.session.get(CachedAnswerDB, key)
+            if entry is None:
+                return None
+            entry.last_used_at = datetime.now(timezone.utc)
+            entry.hits += 1
+            self.session.commit()
+            return self._to_model(entry)
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error reading cached answer: {e}")
+
+    def put(self, answer: StoredAnswer) -> None:
+        try:
+            self.session.merge(
+                CachedAnswerDB(
+                    key=answer.key,
+                    model=answer.model,
+                    question=answer.question,
+                    chunk_hashes=json.dumps(answer.chunk_hashes),
+                    answer=answer.answer,
+                    prompt_tokens=answer.prompt_tokens,
+                    completion_tokens=answer.completion_tokens,
+                    created_at=answer.created_at,
+                    last_used_at=answer.created_at,
+                    hits=answer.hits,
+                )
+            )
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error caching answer: {e}")
+
+    def count(self) -> int:
+        return self.session.execute(
+            select(func.count()).select_from(CachedAnswerDB)
+        ).scalar_one()
+
+    def evict_least_recently_used(self, max_entries: int) -> int:
+        """Delete all but the `max_entries` most recently used answers."""
+        try:
+            stale = (
+                select(CachedAnswerDB.key)
+                .order_by(CachedAnswerDB.last_used_at.desc())
+                .offset(max_entries)
+            )
+            result = self.session.execute(
+                delete(CachedAnswerDB).where(CachedAnswerDB.key.in_(stale)),
+                execution_options={"synchronize_session": False},
+            )
+            self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error evicting cached answers: {e}")
+
+    def clear(self) -> int:
+        try:
+            result = self.session.execute(delete(CachedAnswerDB))
+            self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error clearing cached answers: {e}")
+
+    @staticmethod
+    def _to_model(entry: CachedAnswerDB) -> StoredAnswer:
+        return StoredAnswer(
+            key=entry.key,
+            model=entry.model,
+            question=entry.question,
+            chunk_hashes=json.loads(entry.chunk_hashes),
+            answer=entry.answer,
+            prompt_tokens=entry.prompt_tokens,
+            completion_tokens=entry.completion_tokens,
+            created_at=entry.created_at,
+            hits=entry.hits,
+        )
@@ -1,7 +1,20 @@
-from typing import List, Optional
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from libs.models.documents import AnalysedDocument, Document, EmbeddedChunk
+from libs.models.embeddings import EmbeddingMatrix
+from numpy.typing import NDArray
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary
+from libs.storage.tables.centroids import DocumentCentroid as DocumentCentroidDB
 from libs.storage.tables.documents import Document as DocumentDB
-from libs.models.documents import AnalysedDocument, EmbeddedChunk, Document
+from libs.storage.tables.documents import DocumentChunk as DocumentChunkDB
+from libs.storage.tables.links import DocumentLink as DocumentLinkDB
 
 
 class DocumentRepository:
@@ -34,12 +47,31 @@ class DocumentRepository:
 
     def create_document(self, document: AnalysedDocument) -> AnalysedDocument:
         try:
-            doc_data = document.model_dump(exclude_unset=True, exclude={"chunks"})
+            doc_data = document.model_dump(
+                exclude_unset=True, exclude={"chunks", "centroid", "links"}
+            )
             doc = DocumentDB(**doc_data)
             self.session.add(doc)
             self.session.commit()
             self.session.refresh(doc)
 
+            if document.centroid is not None:
+                self.session.merge(
+                    DocumentCentroidDB(
+                        document_id=doc.id,
+                        embedding=json.dumps(document.centroid.embedding),
+                        embedding_model=document.centroid.embedding_model,
+                    )
+                )
+                self.session.commit()
+
+            if document.links:
+                self.session.add_all(
+                    DocumentLinkDB(source_document_id=doc.id, target_key=key)
+                    for key in document.links
+                )
+                self.session.commit()
+
             if document.embedded_chunks:
                 for chunk_data in document.embedded_chunks:
                     self._create_chunk(chunk_data)
@@ -70,9 +102,140 @@ class DocumentRepository:
     def get_chunks_by_document_id(self, doc_id: str) -> List[EmbeddedChunk]:
         raise NotImplementedError
 
+    def get_document_centroids(self) -> Optional[EmbeddingMatrix]:
+        """Stored document centroids as one matrix keyed by document id."""
+        rows = self.session.query(
+            DocumentCentroidDB.document_id,
+            DocumentCentroidDB.embedding,
+            DocumentCentroidDB.embedding_model,
+        ).all()
+        if not rows:
+            return None
+
+        vectors = self._decode_vectors([row.embedding for row in rows])
+        return EmbeddingMatrix(
+            vectors=vectors,
+            ids=[row.document_id for row in rows],
+            embedding_model=rows[0].embedding_model,
+            created_at=datetime.now(timezone.utc),
+        )
+
+    def get_document_links(self) -> List[Tuple[str, str]]:
+        """Every stored link as (source document id, target key)."""
+        rows = self.session.query(
+            DocumentLinkDB.source_document_id, DocumentLinkDB.target_key
+        ).all()
+        return [(row.source_document_id, row.target_key) for row in rows]
+
+    def get_search_corpus(
+        self,
+    ) -> Tuple[Optional[EmbeddingMatrix], List[ChunkRecord], List[DocumentSummary]]:
+        """Chunk embeddings, chunk texts and document metadata for the search index.
+
+        Rows of the matrix and the chunk records are in the same order.
+        """
+        rows = (
+            self.session.query(
+                DocumentChunkDB.id,
+                DocumentChunkDB.document_id,
+                DocumentChunkDB.content,
+                DocumentChunkDB.content_hash,
+                DocumentChunkDB.chunk_index,
+                DocumentChunkDB.estimated_tokens,
+                DocumentChunkDB.embedding,
+                DocumentChunkDB.embedding_model,
+            )
+            .filter(DocumentChunkDB.embedding.is_not(None))
+            .order_by(DocumentChunkDB.document_id, DocumentChunkDB.chunk_index)
+            .all()
+        )
+        documents = [
+            self._to_document_summary(doc)
+            for doc in self.session.query(DocumentDB).all()
+        ]
+        if not rows:
+            return None, [], documents
+
+        vectors = self._decode_vectors([row.embedding for row in rows])
+        chunks = [
+            ChunkRecord(
+                id=row.id,
+                document_id=row.document_id,
+                content=row.content,
+                content_hash=row.content_hash,
+                chunk_index=row.chunk_index,
+                word_count_estimate=row.estimated_tokens or 0,
+            )
+            for row in rows
+        ]
+        matrix = EmbeddingMatrix(
+            vectors=vectors,
+            ids=[row.id for row in rows],
+            embedding_model=rows[0].embedding_model,
+            created_at=datetime.now(timezone.utc),
+        )
+        return matrix, chunks, documents
+
+    def get_corpus_fingerprint(self) -> Tuple[int, int, Optional[str], Optional[str]]:
+        """Cheap summary that changes whenever documents or chunks change."""
+        document_count, last_processed = self.session.query(
+            func.count(DocumentDB.id), func.max(DocumentDB.processed_at)
+        ).one()
+        chunk_count, last_embedded = self.session.query(
+            func.count(DocumentChunkDB.id),
+            func.max(DocumentChunkDB.embedding_created_at),
+        ).one()
+        return document_count, chunk_count, last_processed, last_embedded
+
+    def get_content_hashes(self) -> Dict[str, str]:
+        """Current content hash of every document, keyed by document id."""
+        rows = self.session.query(DocumentDB.id, DocumentDB.content_hash).all()
+        return {row.id: row.content_hash for row in rows}
+
     def delete_document(self, doc_id: str) -> None:
         raise NotImplementedError
 
+    @staticmethod
+    def _decode_vectors(embeddings: Sequence[str]) -> NDArray[np.float32]:
+        """Decode JSON-encoded embeddings into one (n, d) float32 block."""
+        first = json.loads(embeddings[0])
+        vectors = np.empty((len(embeddings), len(first)), dtype=np.float32)
+        vectors[0] = first
+        for i, embedding in enumerate(embeddings[1:], start=1):
+            vectors[i] = json.loads(embedding)
+        return vectors
+
+    @staticmethod
+    def _to_document_summary(doc: DocumentDB) -> DocumentSummary:
+        tags: List[str] = []
+        if doc.tags:
+            try:
+                parsed = json.loads(doc.tags)
+                tags = [str(tag) for tag in parsed] if isinstance(parsed, list) else []
+            except json.JSONDecodeError:
+                tags = [tag.strip() for tag in doc.tags.split(",") if tag.strip()]
+
+        try:
+            created_on = (
+                datetime.fromisoformat(doc.created_on).date()
+                if doc.created_on
+                else None
+            )
+        except ValueError:
+            created_on = None
+
+        return DocumentSummary(
+            id=doc.id,
+            title=doc.title,
+            file_path=doc.file_path,
+            author=doc.author,
+            category=doc.category,
+            document_type=doc.document_type,
+            source=doc.source,
+            tags=tags,
+            created_on=created_on,
+        )
+
     def _sync_document_chunks(
         self, new_chunks: list[EmbeddedChunk], current_chunks: list[EmbeddedChunk]
     ) -> None:
@@ -104,4 +267,19 @@ class DocumentRepository:
         raise NotImplementedError
 
     def _create_chunk(self, chunk_data: EmbeddedChunk) -> None:
-        raise NotImplementedError
+        embedding = chunk_data.embedding
+        self.session.add(
+            DocumentChunkDB(
+                id=chunk_data.id,
+                document_id=chunk_data.document_id,
+                content=chunk_data.content,
+                content_hash=chunk_data.content_hash,
+                chunk_index=chunk_data.chunk_index,
+                estimated_tokens=chunk_data.word_count_estimate,
+                embedding=json.dumps(embedding.embedding) if embedding else None,
+                embedding_model=embedding.embedding_model if embedding else None,
+                embedding_created_at=(
+                    embedding.embedding_created_at.isoformat() if embedding else None
+                ),
+            )
+        )
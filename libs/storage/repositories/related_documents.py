@@ -0,0 +1,109 @@
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from libs.models.Search import RelatedDocument
+from libs.storage.tables.documents import Document as DocumentDB
+from libs.storage.tables.related import RelatedDocument as RelatedDocumentDB
+
+# related document id, similarity
+Neighbour = Tuple[str, float]
+
+
+class RelatedDocumentRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_related(self, document_id: str, limit: int = 10) -> List[RelatedDocument]:
+        """Stored neighbours of a document, best first, in one indexed read."""
+        rows = self.session.execute(
+            select(
+                RelatedDocumentDB.related_document_id,
+                RelatedDocumentDB.score,
+                RelatedDocumentDB.rank,
+                DocumentDB.title,
+                DocumentDB.file_path,
+            )
+            .outerjoin(
+                DocumentDB, DocumentDB.id == RelatedDocumentDB.related_document_id
+            )
+            .where(RelatedDocumentDB.document_id == document_id)
+            .order_by(RelatedDocumentDB.rank)
+            .limit(limit)
+        ).all()
+        return [
+            RelatedDocument(
+                document_id=row.related_document_id,
+                title=row.title,
+                file_path=row.file_path,
+                score=row.score,
+                rank=row.rank,
+            )
+            for row in rows
+        ]
+
+    def get_graph(self) -> Dict[str, Tuple[str, List[Neighbour]]]:
+        """Every stored neighbour list with the document hash it was computed for."""
+        graph: Dict[str, Tuple[str, List[Neighbour]]] = {}
+        rows = self.session.execute(
+            select(RelatedDocumentDB).order_by(
+                RelatedDocumentDB.document_id, RelatedDocumentDB.rank
+            )
+        ).scalars()
+        for row in rows:
+            _, neighbours = graph.setdefault(row.document_id, (row.document_hash, []))
+            neighbours.append((row.related_document_id, row.score))
+        return graph
+
+    def replace(
+        self,
+        neighbours: Mapping[str, Sequence[Neighbour]],
+        document_hashes: Mapping[str, str],
+        computed_at: str,
+    ) -> None:
+        """Overwrite the neighbour lists of the given documents."""
+        try:
+            self._delete(neighbours.keys())
+            self.session.add_all(
+                RelatedDocumentDB(
+                    document_id=document_id,
+                    rank=rank,
+                    related_document_id=related_id,
+                    score=score,
+                    document_hash=document_hashes[document_id],
+                    computed_at=computed_at,
+                )
+                for document_id, related in neighbours.items()
+                for rank, (related_id, score) in enumerate(related)
+            )
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error storing related documents: {e}")
+
+    def delete(self, document_ids: Iterable[str]) -> None:
+        try:
+            self._delete(document_ids)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error deleting related documents: {e}")
+
+    def clear(self) -> None:
+        try:
+            self.session.execute(delete(RelatedDocumentDB))
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            raise ValueError(f"Error clearing related documents: {e}")
+
+    def _delete(self, document_ids: Iterable[str]) -> None:
+        document_ids = list(document_ids)
+        # Chunked to stay under database bound-parameter limits
+        for start in range(0, len(document_ids), 500):
+            self.session.execute(
+                delete(RelatedDocumentDB).where(
+                    RelatedDocumentDB.document_id.in_(document_ids[start : start + 500])
+                )
+            )
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from libs.storage.tables.base import Base
+
+
+class CachedAnswer(Base):
+    __tablename__ = "answer_cache"
+
+    # sha256 of (model, prompt version, normalised question, chunk hashes)
+    key: Mapped[str] = mapped_column(primary_key=True)
+    model: Mapped[str] = mapped_column(nullable=False)
+    question: Mapped[str] = mapped_column(nullable=False)
+    chunk_hashes: Mapped[str] = mapped_column(Text, nullable=False)  # JSON list
+    answer: Mapped[str] = mapped_column(Text, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(nullable=True)
+    completion_tokens: Mapped[int] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(nullable=False, index=True)
+    hits: Mapped[int] = mapped_column(nullable=False, default=0)
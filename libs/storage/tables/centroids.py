@@ -0,0 +1,20 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from libs.storage.tables.base import Base
+
+
+class DocumentCentroid(Base):
+    """Length-weighted mean of a document's chunk embeddings.
+
+    Held in its own table rather than as columns of documents, so that
+    init_db's create_all adds it to databases created before centroids.
+    """
+
+    __tablename__ = "document_centroids"
+
+    document_id: Mapped[str] = mapped_column(
+        ForeignKey("documents.id"), primary_key=True
+    )
+    embedding: Mapped[str] = mapped_column(nullable=False)  # JSON, like chunks
+    embedding_model: Mapped[str] = mapped_column(nullable=False)
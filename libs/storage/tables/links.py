@@ -0,0 +1,20 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from libs.storage.tables.base import Base
+
+
+class DocumentLink(Base):
+    """A link from a note to another note's name (see content_parser.link_key).
+
+    Targets are stored by name rather than document id so links to notes
+    that do not exist yet resolve once they are added.
+    """
+
+    __tablename__ = "document_links"
+
+    source_document_id: Mapped[str] = mapped_column(
+        ForeignKey("documents.id"), primary_key=True
+    )
+    # Indexed for backlinks: which notes link to this name
+    target_key: Mapped[str] = mapped_column(primary_key=True, index=True)
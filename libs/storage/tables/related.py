@@ -0,0 +1,18 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from libs.storage.tables.base import Base
+
+
+class RelatedDocument(Base):
+    """One edge of the precomputed related-notes k-NN graph."""
+
+    __tablename__ = "related_documents"
+
+    # The primary key index serves "neighbours of X in rank order" directly
+    document_id: Mapped[str] = mapped_column(primary_key=True)
+    rank: Mapped[int] = mapped_column(primary_key=True)
+    related_document_id: Mapped[str] = mapped_column(nullable=False)
+    score: Mapped[float] = mapped_column(nullable=False)
+    # content_hash of document_id when computed, to find stale lists
+    document_hash: Mapped[str] = mapped_column(nullable=False)
+    computed_at: Mapped[str] = mapped_column(nullable=False)
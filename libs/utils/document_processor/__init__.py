@@ -1,9 +1,12 @@
 from .document_processor import DocumentProcessor
 from .metadata_extractor import MetadataValidator
-from .content_parser import MarkdownParser
+from .content_parser import MarkdownParser, link_key
+from .frontmatter_parser import FrontmatterParser
 
 __all__ = [
     "DocumentProcessor",
     "MetadataValidator",
     "MarkdownParser",
+    "FrontmatterParser",
+    "link_key",
 ]
@@ -1,12 +1,47 @@
 import re
 import logging
-import frontmatter  # type: ignore
+from pathlib import PurePosixPath
+from typing import List, Optional
+from urllib.parse import unquote, urlsplit
 
 from libs.models.documents import ParsedContent
+from .frontmatter_parser import FrontmatterParser
 from .metadata_extractor import MetadataValidator
 
 logger = logging.getLogger(__name__)
 
+FENCED_CODE = re.compile(r"^(```|~~~).*?^\1[^\n]*$", re.MULTILINE | re.DOTALL)
+INLINE_CODE = re.compile(r"`[^`\n]*`")
+# [[Target]], [[Target|alias]], [[Target#Heading]] and ![[embeds]]
+WIKILINK = re.compile(r"\[\[([^\[\]\n]+?)\]\]")
+# [text](target) and [text](<target with spaces> "title"); images are skipped
+MARKDOWN_LINK = re.compile(r"(?<!!)\[[^\]\n]*\]\(\s*(<[^>\n]*>|[^)\s]+)[^)\n]*\)")
+NOTE_EXTENSIONS = {".md", ".markdown"}
+ATTACHMENT_EXTENSIONS = frozenset(
+    ".png .jpg .jpeg .gif .svg .webp .bmp .pdf .mp3 .wav .m4a .mp4 .webm .mov "
+    ".canvas .csv .zip".split()
+)
+
+
+def link_key(target: str) -> Optional[str]:
+    """Normalised name a link refers to, or None if it is not a note link.
+
+    Like Obsidian, links resolve by file name: folders, headings, block
+    references (`#^id`), aliases and the .md extension are dropped and case is
+    ignored, so `[[Folder/My Note#Intro|see]]` and `[x](../My%20Note.md)`
+    both give "my note". Documents are matched on the same key of their
+    file name and title.
+    """
+    target = target.split("|", 1)[0].split("#", 1)[0].strip()
+    if not target:
+        return None
+    path = PurePosixPath(target.replace("\\", "/"))
+    suffix = path.suffix.lower()
+    if suffix in ATTACHMENT_EXTENSIONS:
+        return None
+    name = path.stem if suffix in NOTE_EXTENSIONS else path.name
+    return name.strip().casefold() or None
+
 
 class MarkdownParser:
     """Parses and cleans markdown content."""
@@ -17,9 +52,7 @@ class MarkdownParser:
     ) -> ParsedContent:
         """Parse markdown content and extract frontmatter and content."""
         try:
-            post = frontmatter.loads(content)
-            metadata = dict(post.metadata) if post.metadata else {}
-            clean_content = post.content
+            metadata, clean_content = FrontmatterParser.parse(content)
 
         except Exception as e:
             logger.warning(f"Could not parse frontmatter: {e}")
@@ -31,8 +64,32 @@ class MarkdownParser:
         return ParsedContent(
             metadata=metadata_validator.validate_metadata(metadata, processed_content),
             content=processed_content,
+            links=MarkdownParser.extract_links(processed_content),
         )
 
+    @staticmethod
+    def extract_links(content: str) -> List[str]:
+        """Keys of the notes linked from `content`, once each in order.
+
+        Wikilinks and markdown links to local notes count; external URLs,
+        in-page anchors, attachments and anything inside code are ignored.
+        """
+        content = INLINE_CODE.sub("", FENCED_CODE.sub("", content))
+        keys: List[str] = []
+        for match in WIKILINK.finditer(content):
+            key = link_key(match.group(1))
+            if key is not None:
+                keys.append(key)
+        for match in MARKDOWN_LINK.finditer(content):
+            target = match.group(1).strip("<>")
+            url = urlsplit(target)
+            if url.scheme or url.netloc:
+                continue
+            key = link_key(unquote(url.path))
+            if key is not None:
+                keys.append(key)
+        return list(dict.fromkeys(keys))
+
     @staticmethod
     def clean_content(content: str) -> str:
         # Remove excessive whitespace
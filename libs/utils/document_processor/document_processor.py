@@ -2,10 +2,11 @@ import hashlib
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import logging
 
 from libs.models.documents import TextChunk, Document
+from libs.models.pipeline.chunks import ChunkRecord
 from libs.models.pipeline.metadata import DocumentMetadata
 from .metadata_extractor import MetadataValidator
 from .content_parser import MarkdownParser
@@ -42,6 +43,7 @@ class DocumentProcessor:
                 created_at=datetime.now(timezone.utc),
                 updated_at=datetime.now(timezone.utc),
                 deleted_at=None,
+                links=parsed_content.links,
             )
 
             logger.info(f"Processed document: {file_path.name}")
@@ -52,14 +54,33 @@ class DocumentProcessor:
             raise
 
     def extract_chunks(
-        self, content: str, chunk_size: int = 1000, overlap: int = 200
+        self,
+        content: str,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        document_id: Optional[str] = None,
     ) -> List[TextChunk]:
-        chunks: List[TextChunk] = []
+        return [
+            record.to_text_chunk()
+            for record in self.extract_chunk_records(
+                content, chunk_size, overlap, document_id
+            )
+        ]
+
+    def extract_chunk_records(
+        self,
+        content: str,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        document_id: Optional[str] = None,
+    ) -> List[ChunkRecord]:
+        """Split content into overlapping line-based chunks for the pipeline."""
+        chunks: List[ChunkRecord] = []
         lines = content.split("\n")
         current_chunk: List[str] = []
         current_length = 0
 
-        document_id = uuid.uuid4().hex
+        document_id = document_id or uuid.uuid4().hex
 
         for line in lines:
             line_length = len(line) + 1  # +1 for newline
@@ -70,16 +91,8 @@ class DocumentProcessor:
                 current_length += line_length
             else:
                 # Else finalise the current chunk and start a new one
-                chunk_text = "\n".join(current_chunk)
                 chunks.append(
-                    TextChunk(
-                        id=uuid.uuid4().hex,
-                        document_id=document_id,
-                        content=chunk_text,
-                        content_hash=self.__calculate_content_hash(chunk_text),
-                        chunk_index=len(chunks),
-                        word_count_estimate=len(chunk_text.split()),
-                    )
+                    self.__build_chunk(document_id, current_chunk, len(chunks))
                 )
 
                 # Start new chunk with overlap
@@ -100,19 +113,22 @@ class DocumentProcessor:
 
         # Add final chunk if there's remaining content
         if current_chunk:
-            chunk_text = "\n".join(current_chunk)
-            chunks.append(
-                TextChunk(
-                    id=uuid.uuid4().hex,
-                    document_id=document_id,
-                    content=chunk_text,
-                    content_hash=self.__calculate_content_hash(chunk_text),
-                    chunk_index=len(chunks),
-                    word_count_estimate=len(chunk_text.split()),
-                )
-            )
+            chunks.append(self.__build_chunk(document_id, current_chunk, len(chunks)))
 
         return chunks
 
+    def __build_chunk(
+        self, document_id: str, lines: List[str], chunk_index: int
+    ) -> ChunkRecord:
+        chunk_text = "\n".join(lines)
+        return ChunkRecord(
+            id=uuid.uuid4().hex,
+            document_id=document_id,
+            content=chunk_text,
+            content_hash=self.__calculate_content_hash(chunk_text),
+            chunk_index=chunk_index,
+            word_count_estimate=len(chunk_text.split()),
+        )
+
     def __calculate_content_hash(self, content: str) -> str:
         return hashlib.sha256(content.encode("utf-8")).hexdigest()
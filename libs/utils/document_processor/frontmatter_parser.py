@@ -0,0 +1,149 @@
+import re
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import yaml
+
+# libyaml's loader where it is compiled in, else the pure Python one
+YamlLoader: "Type[yaml.SafeLoader] | Type[yaml.CSafeLoader]" = getattr(
+    yaml, "CSafeLoader", yaml.SafeLoader
+)
+
+logger = logging.getLogger(__name__)
+
+# Same delimiter rule as python-frontmatter's YAMLHandler
+FM_BOUNDARY = re.compile(r"^-{3,}\s*$", re.MULTILINE)
+
+KEY_LINE = re.compile(r"^([A-Za-z_][\w ]*?) *:(?: +(.*?))? *$")
+LIST_ITEM_LINE = re.compile(r"^ *- +(.*?) *$")
+FLOW_LIST = re.compile(r"^\[(.*)\]$")
+DATE_SCALAR = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+INT_SCALAR = re.compile(r"^[-+]?(?:0|[1-9][0-9]*)$")
+# Plain scalars that YAML can only resolve to a string: starts with a letter,
+# no flow indicators, quotes or comments, and colons only inside words (URLs).
+STR_SCALAR = re.compile(r"^[A-Za-z](?:[^:#\[\]{},\"'\n]|:(?=\S))*$")
+
+BOOL_VALUES = {
+    **{v: True for v in ("yes", "Yes", "YES", "true", "True", "TRUE")},
+    **{v: True for v in ("on", "On", "ON")},
+    **{v: False for v in ("no", "No", "NO", "false", "False", "FALSE")},
+    **{v: False for v in ("off", "Off", "OFF")},
+}
+NULL_VALUES = {"", "~", "null", "Null", "NULL"}
+
+
+class UnsupportedFrontmatter(Exception):
+    """Raised when frontmatter falls outside the fast-path grammar."""
+
+
+class FrontmatterParser:
+    """Splits and parses YAML frontmatter, mirroring `frontmatter.loads`.
+
+    Our notes only use flat `key: value` pairs and lists of plain scalars, which
+    are parsed here with a handful of compiled regexes. Anything else (nested
+    mappings, quoting, anchors, multi-line strings...) is handed to the C YAML
+    loader so the result is always what PyYAML would have produced.
+    """
+
+    @staticmethod
+    def parse(text: str) -> Tuple[Dict[str, Any], str]:
+        """Return the frontmatter metadata and the remaining content."""
+        text = text.strip()
+        if not FM_BOUNDARY.match(text):
+            return {}, text
+
+        parts = FM_BOUNDARY.split(text, 2)
+        if len(parts) < 3:
+            return {}, text
+        _, fm, content = parts
+
+        try:
+            metadata: Any = FrontmatterParser.parse_fast(fm)
+        except UnsupportedFrontmatter as e:
+            logger.debug(f"Falling back to YAML loader for frontmatter: {e}")
+            metadata = yaml.load(fm, Loader=YamlLoader)
+
+        return (metadata if isinstance(metadata, dict) else {}), content.strip()
+
+    @staticmethod
+    def parse_fast(fm: str) -> Dict[str, Any]:
+        """Parse the flat key/list subset of YAML used in our notes."""
+        metadata: Dict[str, Any] = {}
+        current_list: Optional[List[Any]] = None
+
+        for line in fm.split("\n"):
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+
+            item = LIST_ITEM_LINE.match(line)
+            if item:
+                if current_list is None:
+                    raise UnsupportedFrontmatter(f"Unexpected list item: {line!r}")
+                current_list.append(FrontmatterParser.parse_scalar(item.group(1)))
+                continue
+
+            entry = KEY_LINE.match(line)
+            if not entry:
+                raise UnsupportedFrontmatter(f"Unsupported line: {line!r}")
+
+            key, raw_value = entry.group(1), entry.group(2) or ""
+            if key in BOOL_VALUES or key in NULL_VALUES:
+                raise UnsupportedFrontmatter(f"Non-string key: {key!r}")
+            current_list = None
+
+            if not raw_value:
+                # Either a null value or the header of a block list
+                current_list = []
+                metadata[key] = _BlockList(current_list)
+            elif flow := FLOW_LIST.match(raw_value):
+                metadata[key] = FrontmatterParser.parse_flow_list(flow.group(1))
+            else:
+                metadata[key] = FrontmatterParser.parse_scalar(raw_value)
+
+        return {
+            key: (value.resolve() if isinstance(value, _BlockList) else value)
+            for key, value in metadata.items()
+        }
+
+    @staticmethod
+    def parse_flow_list(raw_items: str) -> List[Any]:
+        if not raw_items.strip():
+            return []
+        items = [item.strip() for item in raw_items.split(",")]
+        if items[-1] == "":
+            items.pop()  # YAML allows a trailing comma
+        if "" in items:
+            raise UnsupportedFrontmatter(f"Empty flow list item: [{raw_items}]")
+        return [FrontmatterParser.parse_scalar(item) for item in items]
+
+    @staticmethod
+    def parse_scalar(raw: str) -> Any:
+        """Resolve a plain scalar the way YAML's implicit resolvers would."""
+        if raw in NULL_VALUES:
+            return None
+        if raw in BOOL_VALUES:
+            return BOOL_VALUES[raw]
+        if DATE_SCALAR.match(raw):
+            try:
+                return date.fromisoformat(raw)
+            except ValueError as e:
+                raise UnsupportedFrontmatter(f"Invalid date: {raw!r}") from e
+        if INT_SCALAR.match(raw):
+            return int(raw)
+        if STR_SCALAR.match(raw):
+            return raw
+        raise UnsupportedFrontmatter(f"Unsupported scalar: {raw!r}")
+
+
+class _BlockList:
+    """Placeholder for a key whose value is either null or a block list."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: List[Any]) -> None:
+        self.items = items
+
+    def resolve(self) -> Optional[List[Any]]:
+        return self.items if self.items else None
@@ -0,0 +1,134 @@
+"""Parity tests for the fast-path frontmatter parser against python-frontmatter."""
+
+import frontmatter  # type: ignore
+
+from libs.models.pipeline import FrontmatterMetadata
+from libs.utils.document_processor import (
+    FrontmatterParser,
+    MarkdownParser,
+    MetadataValidator,
+    link_key,
+)
+from libs.utils.document_processor.frontmatter_parser import UnsupportedFrontmatter
+
+FAST_PATH_NOTES = [
+    "---\nlast updated: 2025-05-25\ncreated_on: 2025-05-24\n---\n\n# Title\n",
+    """---
+author:
+  - Greg McKeown
+type:
+  - reference
+category:
+  - book
+created_on: 2025-05-08
+last updated: 2025-05-14
+source:
+checked: false
+---
+Essentialism notes.
+""",
+    """---
+author: [Gene Kim, Kevin Behr]
+category: [book, devops,]
+type: reference
+tags: []
+title: The Phoenix Project
+source: https://itrevolution.com/phoenix
+rating: 4
+---
+
+Body with --- inside it
+---
+and a trailing rule
+""",
+    "---\n# a comment\nauthor:\n- Someone\ntags: ~\n---\ntext",
+]
+
+FALLBACK_NOTES = [
+    '---\ntitle: "Quoted: title"\nauthor: [Gene Kim]\n---\nBody',
+    "---\nsource: >\n  folded\n  text\n---\nBody",
+    "---\nmeta:\n  nested: true\n---\nBody",
+    "---\ntitle: 'Book: A Subtitle'\nchecked: yes please\n---\nBody",
+    "---\ncreated_on: 2024-01-01 10:00:00\nrating: 0o17\n---\nBody",
+]
+
+OTHER_NOTES = [
+    "No frontmatter at all\n",
+    "---\nunterminated: frontmatter\n",
+    "---\n- just\n- a list\n---\nBody",
+]
+
+
+def _reference_parse(content: str, validator: MetadataValidator) -> FrontmatterMetadata:
+    post = frontmatter.loads(content)
+    metadata = dict(post.metadata) if post.metadata else {}
+    return validator.validate_metadata(metadata, post.content)
+
+
+def test_fast_path_covers_typical_notes() -> None:
+    for note in FAST_PATH_NOTES:
+        fm = FrontmatterParser.parse(note)
+        assert fm == frontmatter.parse(note)
+        _, frontmatter_block, _ = note.split("---\n", 2)
+        FrontmatterParser.parse_fast(frontmatter_block)
+
+
+def test_fallback_matches_yaml() -> None:
+    for note in FALLBACK_NOTES:
+        _, frontmatter_block, _ = note.split("---\n", 2)
+        try:
+            FrontmatterParser.parse_fast(frontmatter_block)
+        except UnsupportedFrontmatter:
+            pass
+        else:
+            raise AssertionError(f"Expected fallback for {note!r}")
+        assert FrontmatterParser.parse(note) == frontmatter.parse(note)
+
+
+def test_non_mapping_frontmatter_matches_library() -> None:
+    for note in OTHER_NOTES:
+        assert FrontmatterParser.parse(note) == frontmatter.parse(note)
+
+
+def test_normalised_metadata_parity() -> None:
+    validator = MetadataValidator()
+    for note in FAST_PATH_NOTES + FALLBACK_NOTES + OTHER_NOTES:
+        parsed = MarkdownParser.parse_content(note, validator)
+        assert parsed.metadata == _reference_parse(note, validator)
+        assert parsed.content == MarkdownParser.clean_content(
+            frontmatter.loads(note).content
+        )
+
+
+def test_list_normalisation_from_fast_path() -> None:
+    note = FAST_PATH_NOTES[2]
+    metadata = MarkdownParser.parse_content(note, MetadataValidator()).metadata
+    assert metadata.author == ["Gene Kim", "Kevin Behr"]
+    assert metadata.category == ["book", "devops"]
+    assert metadata.type == ["reference"]
+    assert metadata.tags == []
+    assert metadata.title == "The Phoenix Project"
+
+
+def test_extract_links() -> None:
+    note = """---
+title: Links
+---
+See [[Deep Work]], [[notes/Essentialism#Summary|the book]] and ![[Diagram.png]].
+Also [the project](../books/The%20Phoenix%20Project.md), [a site](https://example.com),
+[an anchor](#intro), [[deep work]] again and `[[Not A Link]]`.
+
+```
+[[Inside Code]]
+```
+"""
+    parsed = MarkdownParser.parse_content(note, MetadataValidator())
+    assert parsed.links == ["deep work", "essentialism", "the phoenix project"]
+
+
+def test_link_key() -> None:
+    assert link_key("Folder/My Note#Heading|alias") == "my note"
+    assert link_key("My Note.md") == "my note"
+    assert link_key("Release v1.2") == "release v1.2"
+    assert link_key("photo.JPG") is None
+    assert link_key("#only-a-heading") is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Benchmark decoding of Ollama embedding responses into float32 rows."""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from apps.backend.services.embedding_decoder import decode_embedding
+
+DIMENSIONS = [768, 1536]
+BATCH_SIZE = 64
+REPEATS = 20
+
+
+def make_body(dimension: int, rng: np.random.Generator) -> bytes:
+    vector = rng.standard_normal(dimension).astype(np.float32)
+    return json.dumps({"embedding": [float(x) for x in vector]}).encode("utf-8")
+
+
+def decode_with_float_lists(bodies: List[bytes]) -> NDArray[np.float32]:
+    """The previous path: json, a list of Python floats per row, then NumPy."""
+    rows = [[float(x) for x in json.loads(body)["embedding"]] for body in bodies]
+    return np.array(rows, dtype=np.float32)
+
+
+def decode_into_preallocated(
+    bodies: List[bytes], dimension: int
+) -> NDArray[np.float32]:
+    matrix = np.empty((len(bodies), dimension), dtype=np.float32)
+    for i, body in enumerate(bodies):
+        decode_embedding(body, out=matrix[i])
+    return matrix
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    for dimension in DIMENSIONS:
+        bodies = [make_body(dimension, rng) for _ in range(BATCH_SIZE)]
+        assert np.array_equal(
+            decode_with_float_lists(bodies),
+            decode_into_preallocated(bodies, dimension),
+        )
+
+        baseline = min(
+            timeit.repeat(
+                lambda: decode_with_float_lists(bodies), number=1, repeat=REPEATS
+            )
+        )
+        fast = min(
+            timeit.repeat(
+                lambda: decode_into_preallocated(bodies, dimension),
+                number=1,
+                repeat=REPEATS,
+            )
+        )
+        per_row = 1e6 / BATCH_SIZE
+        print(
+            f"d={dimension}: float lists {baseline * per_row:.1f} us/row, "
+            f"preallocated {fast * per_row:.1f} us/row ({baseline / fast:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark pipeline throughput on synthetic notes, without a live model.
+
+By default embeddings come from the deterministic hash backend, which
+measures processing, dedup and batching overhead alone. Point --ollama-url at
+scripts/fake_ollama.py (or a real Ollama) to include HTTP, concurrency
+control and retries:
+
+    python scripts/benchmark_pipeline.py --notes 500
+    python scripts/benchmark_pipeline.py --ollama-url http://localhost:11435
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from pydantic import AnyHttpUrl
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import settings
+from apps.backend.services.embedding_service import EmbeddingService
+from libs.models.pipeline import PipelineConfig
+from libs.pipeline.dedup import ChunkFingerprintIndex
+from libs.pipeline.embedder import DocumentEmbedder, SimilarityCalculator
+from libs.pipeline.pipeline import DataPipeline
+
+VOCABULARY_SIZE = 5000
+TEMPLATE = "Related notes are linked from the daily review template."
+
+
+def write_notes(directory: Path, count: int, words_per_note: int) -> List[Path]:
+    """Synthetic markdown notes with frontmatter and a shared template chunk."""
+    rng = np.random.default_rng(0)
+    vocabulary = [f"word{i}" for i in range(VOCABULARY_SIZE)]
+    paths = []
+    for i in range(count):
+        words = rng.choice(vocabulary, size=words_per_note)
+        paragraphs = [" ".join(words[j : j + 60]) for j in range(0, len(words), 60)]
+        path = directory / f"note-{i:05d}.md"
+        path.write_text(
+            f"---\ntitle: Note {i}\ntags: [benchmark, synthetic]\n"
+            f"created_on: 2024-01-01\n---\n\n# Note {i}\n\n"
+            + "\n\n".join(paragraphs)
+            + f"\n\n{TEMPLATE}\n",
+            encoding="utf-8",
+        )
+        paths.append(path)
+    return paths
+
+
+async def run(
+    notes: int, words_per_note: int, chunk_size: int, concurrency: int
+) -> None:
+    service = EmbeddingService()
+    embedder = DocumentEmbedder(
+        embedder=service, fingerprint_index=ChunkFingerprintIndex()
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_notes(Path(directory), notes, words_per_note)
+        pipeline = DataPipeline(
+            PipelineConfig(
+                watch_directory=directory, chunk_size=chunk_size, chunk_overlap=0
+            ),
+            document_embedder=embedder,
+            similarity_calculator=SimilarityCalculator(),
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+        chunk_counts: List[int] = []
+
+        async def process(path: Path) -> None:
+            async with semaphore:
+                result = await pipeline.process_single_file(path)
+                chunk_counts.append(len(result.chunks or []))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(process(path) for path in paths))
+        elapsed = time.perf_counter() - started
+
+    await service.close()
+    chunks = sum(chunk_counts)
+    report = embedder.dedup_report()
+    print(
+        f"{settings.embedding_backend}: {notes} notes, {chunks} chunks in "
+        f"{elapsed:.2f}s ({notes / elapsed:.1f} notes/s, "
+        f"{chunks / elapsed:.1f} chunks/s)"
+    )
+    print(
+        f"embedding calls: {service.stats().coalescing.calls}, "
+        f"saved by dedup: {report.embedding_calls_saved if report else 0}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--words-per-note", type=int, default=600)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8, help="files at once")
+    parser.add_argument(
+        "--ollama-url",
+        action="append",
+        help="embed over HTTP instead of the hash backend (repeatable)",
+    )
+    args = parser.parse_args()
+
+    ollama_urls: Optional[List[str]] = args.ollama_url
+    if ollama_urls:
+        settings.embedding_backend = "ollama"
+        settings.ollama_urls = [AnyHttpUrl(url) for url in ollama_urls]
+    else:
+        settings.embedding_backend = "hash"
+
+    asyncio.run(run(args.notes, args.words_per_note, args.chunk_size, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark coarse-to-fine (document centroid) search against flat search.
+
+Builds a synthetic index whose chunk vectors cluster by topic and by
+document, like notes do, then compares latency and recall@k of
+VectorIndex.search_coarse at several document counts with exact flat search:
+
+    python scripts/benchmark_search.py --documents 5000 --coarse 32 64 128
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from libs.models.embeddings import EmbeddingMatrix
+
+from libs.models.pipeline import ChunkRecord
+from libs.models.Search import DocumentSummary
+from libs.retrieval import Candidates, VectorIndex
+
+
+def build_corpus(
+    documents: int, chunks_per_document: int, dimension: int, topics: int
+) -> Tuple[EmbeddingMatrix, List[ChunkRecord], List[DocumentSummary]]:
+    """Chunk vectors = topic + document + chunk noise."""
+    rng = np.random.default_rng(0)
+    topic_vectors = rng.standard_normal((topics, dimension), dtype=np.float32)
+    document_topics = rng.integers(0, topics, size=documents)
+    document_vectors = topic_vectors[document_topics] + 0.8 * rng.standard_normal(
+        (documents, dimension), dtype=np.float32
+    )
+
+    rows = documents * chunks_per_document
+    row_documents = np.repeat(np.arange(documents), chunks_per_document)
+    vectors = document_vectors[row_documents] + 0.8 * rng.standard_normal(
+        (rows, dimension), dtype=np.float32
+    )
+
+    chunks = [
+        ChunkRecord(
+            id=f"chunk-{i}",
+            document_id=f"doc-{row_documents[i]}",
+            content="x" * int(rng.integers(200, 1000)),
+            content_hash=str(i),
+            chunk_index=i % chunks_per_document,
+            word_count_estimate=0,
+        )
+        for i in range(rows)
+    ]
+    matrix = EmbeddingMatrix(
+        vectors=vectors,
+        ids=[chunk.id for chunk in chunks],
+        embedding_model="synthetic",
+        created_at=datetime.now(timezone.utc),
+    )
+    summaries = [DocumentSummary(id=f"doc-{i}") for i in range(documents)]
+    return matrix, chunks, summaries
+
+
+def build_index(
+    documents: int, chunks_per_document: int, dimension: int, topics: int
+) -> VectorIndex:
+    return VectorIndex(*build_corpus(documents, chunks_per_document, dimension, topics))
+
+
+def make_queries(index: VectorIndex, count: int) -> NDArray[np.float32]:
+    """Perturbed chunk vectors, so every query has a clear neighbourhood."""
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, len(index), size=count)
+    noise = rng.standard_normal((count, index.dimension), dtype=np.float32)
+    queries: NDArray[np.float32] = index.vectors[rows] + 0.05 * noise
+    return queries
+
+
+def timed(
+    search: Callable[[NDArray[np.float32]], Candidates], queries: NDArray[np.float32]
+) -> Tuple[List[NDArray[np.integer[Any]]], float]:
+    results = []
+    started = time.perf_counter()
+    for query in queries:
+        results.append(search(query).rows)
+    return results, (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--chunks-per-document", type=int, default=8)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--coarse",
+        type=int,
+        nargs="+",
+        default=[16, 32, 64, 128, 256],
+        help="documents kept by the centroid stage",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build_index(
+        args.documents, args.chunks_per_document, args.dimension, args.topics
+    )
+    print(
+        f"index: {len(index)} chunks, {len(index.documents)} documents, "
+        f"{args.dimension} dimensions (built in {time.perf_counter() - started:.1f}s)"
+    )
+
+    queries = make_queries(index, args.queries)
+    exact, flat_ms = timed(lambda q: index.search(q, args.top_k), queries)
+    print(f"flat:        {flat_ms:7.2f} ms/query  recall@{args.top_k} 1.000")
+
+    for documents in args.coarse:
+        results, coarse_ms = timed(
+            lambda q: index.search_coarse(q, args.top_k, documents), queries
+        )
+        recall = np.mean(
+            [
+                len(np.intersect1d(found, truth)) / len(truth)
+                for found, truth in zip(results, exact)
+            ]
+        )
+        print(
+            f"coarse {documents:>4}: {coarse_ms:7.2f} ms/query  "
+            f"recall@{args.top_k} {recall:.3f}  speedup {flat_ms / coarse_ms:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
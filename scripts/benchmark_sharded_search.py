@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark search throughput of a sharded index against one process.
+
+Builds the synthetic index of benchmark_search.py, then measures queries
+per second with several concurrent clients, first on a VectorIndex in this
+process and then on ShardedVectorIndex over each number of worker
+processes, checking that both return the same results:
+
+    python scripts/benchmark_sharded_search.py --documents 20000 --shards 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmark_search import build_corpus
+
+from libs.retrieval import ShardedVectorIndex, VectorIndex
+
+
+def queries_per_second(
+    index: VectorIndex, queries: NDArray[np.float32], top_k: int, clients: int
+) -> float:
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(lambda query: index.search(query, top_k), queries[:clients]))
+        started = time.perf_counter()
+        list(pool.map(lambda query: index.search(query, top_k), queries))
+    return len(queries) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--chunks-per-document", type=int, default=8)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    matrix, chunks, documents = build_corpus(
+        args.documents, args.chunks_per_document, args.dimension, args.topics
+    )
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+
+    flat = VectorIndex(matrix, chunks, documents)
+    print(
+        f"index: {len(flat)} chunks, {len(documents)} documents, "
+        f"{args.dimension} dimensions, {args.clients} clients"
+    )
+    expected = [
+        [flat.chunks[row].id for row in flat.search(query, args.top_k).rows]
+        for query in queries[:20]
+    ]
+    baseline = queries_per_second(flat, queries, args.top_k, args.clients)
+    print(f"1 process:   {baseline:8.1f} queries/s")
+
+    for shards in args.shards:
+        with ProcessPoolExecutor(
+            max_workers=shards, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            index = ShardedVectorIndex(
+                matrix, chunks, documents, executor=executor, shards=shards
+            )
+            found = [
+                [index.chunks[row].id for row in index.search(query, args.top_k).rows]
+                for query in queries[:20]
+            ]
+            if found != expected:
+                raise SystemExit(f"{shards} shards returned different results")
+            qps = queries_per_second(index, queries, args.top_k, args.clients)
+            index.close()
+        print(f"{shards} shards: {qps:10.1f} queries/s  speedup {qps / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Write a memory-mapped snapshot of the search index.
+
+API workers open the snapshot instead of loading every chunk from the
+database; copy the file to other nodes to start them warm:
+
+    python scripts/build_index_snapshot.py [path]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import settings
+from libs.pipeline.index_snapshot import write_index_snapshot
+from libs.storage.db import get_db_session, init_db
+from libs.storage.repositories.document import DocumentRepository
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=settings.search_snapshot_path,
+        help="snapshot file (default: SEARCH_SNAPSHOT_PATH)",
+    )
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("no path given and SEARCH_SNAPSHOT_PATH is not set")
+
+    init_db()
+    session = next(get_db_session())
+    try:
+        rows = write_index_snapshot(DocumentRepository(session), args.path)
+        print(f"Wrote {rows} chunks to {args.path}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
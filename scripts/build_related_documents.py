@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Build or incrementally update the related documents graph.
+
+Run after pipeline batches; only neighbour lists that the changes can have
+affected are recomputed. Use --full after changing k or the embedding model:
+
+    python scripts/build_related_documents.py [--full] [--k 10]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import settings
+from libs.pipeline.related import RelatedDocumentsJob
+from libs.storage.db import get_db_session, init_db
+from libs.storage.repositories.document import DocumentRepository
+from libs.storage.repositories.related_documents import RelatedDocumentRepository
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--full", action="store_true", help="recompute every neighbour list"
+    )
+    parser.add_argument("--k", type=int, default=settings.related_documents_k)
+    args = parser.parse_args()
+
+    init_db()
+    session = next(get_db_session())
+    try:
+        job = RelatedDocumentsJob(
+            DocumentRepository(session), RelatedDocumentRepository(session), k=args.k
+        )
+        run = job.run(full=args.full)
+        print(
+            f"{run.recomputed} of {run.documents} neighbour lists recomputed, "
+            f"{run.removed} removed, in {run.took_ms:.0f}ms"
+        )
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
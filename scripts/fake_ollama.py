@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Local stand-in for Ollama's API, for load tests without a model.
+
+Serves /api/embeddings, /api/embed, /api/version and /api/tags with
+deterministic hash-seeded vectors, and /api/generate streaming words of the
+prompt back at a fixed token rate. Latency, a per-server concurrency limit
+and error injection make it possible to exercise the client's adaptive
+concurrency, retries and circuit breaking:
+
+    python scripts/fake_ollama.py --port 11435 --latency-ms 30 --error-rate 0.02
+    python scripts/benchmark_pipeline.py --ollama-url http://localhost:11435
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from apps.backend.services.embedding_backends import HashEmbeddingBackend
+
+
+class EmbeddingsRequest(BaseModel):
+    model: str
+    prompt: str
+
+
+class EmbedRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+
+
+class GenerateRequest(BaseModel):
+    model: str
+    prompt: str
+    system: Optional[str] = None
+    stream: bool = True
+
+
+def create_app(
+    dimension: int = 768,
+    latency_ms: float = 20.0,
+    jitter_ms: float = 5.0,
+    capacity: int = 4,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    first_token_ms: float = 150.0,
+    token_ms: float = 20.0,
+    completion_tokens: int = 64,
+) -> FastAPI:
+    """Fake Ollama whose latency grows once `capacity` requests are running."""
+    app = FastAPI(title="Fake Ollama")
+    backend = HashEmbeddingBackend(dimension=dimension)
+    slots = asyncio.Semaphore(capacity)
+
+    async def simulate(texts: int) -> None:
+        if random.random() < error_rate:
+            raise HTTPException(status_code=error_status, detail="injected error")
+        async with slots:
+            delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+            await asyncio.sleep(max(0.0, delay) * texts / 1000)
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: EmbeddingsRequest) -> Dict[str, Any]:
+        await simulate(1)
+        vector = backend.embed_text(request.prompt, request.model)
+        return {"embedding": vector.tolist()}
+
+    @app.post("/api/embed")
+    async def embed(request: EmbedRequest) -> Dict[str, Any]:
+        texts = [request.input] if isinstance(request.input, str) else request.input
+        await simulate(len(texts))
+        return {
+            "model": request.model,
+            "embeddings": [
+                backend.embed_text(text, request.model).tolist() for text in texts
+            ],
+        }
+
+    @app.post("/api/generate")
+    async def generate(request: GenerateRequest) -> Any:
+        await simulate(0)
+        words = request.prompt.split() or ["..."]
+        tokens = [f"{random.choice(words)} " for _ in range(completion_tokens)]
+
+        async def lines() -> AsyncIterator[bytes]:
+            await asyncio.sleep(first_token_ms / 1000)
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                line = {"model": request.model, "response": token, "done": False}
+                yield json.dumps(line).encode() + b"\n"
+            done = {
+                "model": request.model,
+                "response": "",
+                "done": True,
+                "prompt_eval_count": len(words),
+                "eval_count": len(tokens),
+            }
+            yield json.dumps(done).encode() + b"\n"
+
+        if not request.stream:
+            await asyncio.sleep((first_token_ms + token_ms * len(tokens)) / 1000)
+            return {"model": request.model, "response": "".join(tokens), "done": True}
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/api/version")
+    async def version() -> Dict[str, str]:
+        return {"version": "0.0.0-fake"}
+
+    @app.get("/api/tags")
+    async def tags() -> Dict[str, Any]:
+        return {"models": []}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=4,
+        help="requests served at once; further requests queue",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of failed requests"
+    )
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--first-token-ms", type=float, default=150.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--completion-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    app = create_app(
+        dimension=args.dimension,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        capacity=args.capacity,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        first_token_ms=args.first_token_ms,
+        token_ms=args.token_ms,
+        completion_tokens=args.completion_tokens,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ import sys
 import asyncio
 import logging
 import os
+import time
 from pathlib import Path
+from typing import Optional
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
@@ -13,9 +15,11 @@ from libs.models.documents import AnalysedDocument
 from libs.models.pipeline import FileEventType
 from libs.pipeline import DataPipeline
 from libs.models.pipeline import PipelineConfig, PipelineResult
+from libs.pipeline.index_snapshot import write_index_snapshot
 from libs.storage.repositories.document import DocumentRepository
 from libs.storage.db import get_db_session
 from libs.di.container import container
+from config import settings
 
 
 logging.basicConfig(
@@ -24,23 +28,27 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Seconds between search index snapshots while documents keep changing
+SNAPSHOT_INTERVAL = 30.0
 
-async def store_pipeline_results_to_db(result: PipelineResult) -> None:
+
+async def store_pipeline_results_to_db(result: PipelineResult) -> bool:
+    """Store a processed document; returns whether anything was written."""
     if result.event_type == FileEventType.DELETED:
         logger.info(f"File deleted: {result.file_path}")
         # TODO: Implement document deletion from database
-        return
+        return False
 
     if not result.document or not result.chunks:
         logger.warning(f"No document or chunks found for file: {result.file_path}")
-        return
+        return False
 
     session = next(get_db_session())
     doc_repo = DocumentRepository(session)
 
     try:
         mapped_document = AnalysedDocument.from_document_and_embeddings(
-            result.document, result.chunks
+            result.document, result.chunks, centroid=result.centroid
         )
         stored_document = doc_repo.create_document(mapped_document)
         title = (
@@ -52,6 +60,7 @@ async def store_pipeline_results_to_db(result: PipelineResult) -> None:
         logger.info(
             f'Stored {len(stored_document.embedded_chunks)} chunks for document "{title}"'
         )
+        return True
 
     except Exception as e:
         logger.error(f"Error storing pipeline results to database: {e}")
@@ -63,6 +72,41 @@ async def store_pipeline_results_to_db(result: PipelineResult) -> None:
             session.close()
 
 
+class SnapshotWriter:
+    """Snapshots the search index for the API after documents change.
+
+    Writes at most once per `interval` seconds, so a burst of changes
+    costs one snapshot rather than one per document.
+    """
+
+    def __init__(self, path: Optional[str], interval: float) -> None:
+        self.path = path
+        self.interval = interval
+        self.pending = False
+        self._written_at = float("-inf")
+
+    def mark_changed(self) -> None:
+        # Nothing to write without a configured snapshot path
+        self.pending = bool(self.path)
+
+    def due(self) -> bool:
+        return self.pending and time.monotonic() - self._written_at >= self.interval
+
+    def write(self) -> None:
+        if not self.path:
+            return
+        self.pending = False
+        self._written_at = time.monotonic()
+        session = next(get_db_session())
+        try:
+            write_index_snapshot(DocumentRepository(session), self.path)
+        except Exception as e:
+            logger.error(f"Error writing search index snapshot: {e}")
+            self.pending = True
+        finally:
+            session.close()
+
+
 EMBEDDING_MODEL = "nomic-embed-text"
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 WATCH_DIRECTORY = "assets"
@@ -79,6 +123,11 @@ async def main() -> None:
 
     # Get the pipeline from the DI container (dependencies auto-injected)
     pipeline = container.pipeline()
+    snapshots = SnapshotWriter(settings.search_snapshot_path, SNAPSHOT_INTERVAL)
+
+    async def store_and_schedule_snapshot(result: PipelineResult) -> None:
+        if await store_pipeline_results_to_db(result):
+            snapshots.mark_changed()
 
     try:
         logger.info("Starting data pipeline...")
@@ -87,12 +136,14 @@ async def main() -> None:
         logger.info(f"Using embedding model: {EMBEDDING_MODEL}")
 
         # Start the pipeline with database storage callback
-        await pipeline.start(callback=store_pipeline_results_to_db)
+        await pipeline.start(callback=store_and_schedule_snapshot)
 
         # Keep running until interrupted
         logger.info("Pipeline is running. Press Ctrl+C to stop.")
         while True:
             await asyncio.sleep(1)
+            if snapshots.due():
+                await asyncio.to_thread(snapshots.write)
 
     except KeyboardInterrupt:
         logger.info("Received interrupt signal, stopping pipeline...")